@@ -0,0 +1,9 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：__init__
+# @Date   ：2026/10/19 15:02
+# @Author ：leemysw
+
+# 2026/10/19 15:02   Create
+# =====================================================
@@ -0,0 +1,82 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：api_admin
+# @Date   ：2026/10/19 15:02
+# @Author ：leemysw
+
+# 2026/10/19 15:02   Create
+# =====================================================
+
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from agent.service.db.analytics import analytics_engine
+from agent.shared.server.common import resp
+from agent.utils.metrics import registry
+
+router = APIRouter(tags=["admin"])
+
+
+@router.get("/admin/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus 文本格式的进程内指标"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+# ==================== 统计分析 ====================
+
+async def _analytics(func, start: Optional[date], end: Optional[date], **kwargs):
+    """日期(UTC，包含两端)转换为 [start, end) 后在线程池中执行 DuckDB 查询"""
+    if not analytics_engine.available:
+        raise HTTPException(status_code=503, detail="duckdb is not installed")
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="start must not be later than end")
+    start_at = datetime.combine(start, time.min) if start is not None else None
+    end_at = datetime.combine(end + timedelta(days=1), time.min) if end is not None else None
+    data = await run_in_threadpool(func, start_at, end_at, **kwargs)
+    return resp.ok(resp.Resp(data=data))
+
+
+@router.get("/admin/analytics/usage")
+async def get_analytics_usage(
+        start: Optional[date] = Query(default=None, description="开始日期(UTC)，包含"),
+        end: Optional[date] = Query(default=None, description="结束日期(UTC)，包含"),
+        by_model: bool = Query(default=False, description="是否按模型拆分"),
+):
+    """按日期汇总 token、费用和耗时"""
+    return await _analytics(analytics_engine.usage_by_day, start, end, by_model=by_model)
+
+
+@router.get("/admin/analytics/tools")
+async def get_analytics_tools(
+        start: Optional[date] = Query(default=None, description="开始日期(UTC)，包含"),
+        end: Optional[date] = Query(default=None, description="结束日期(UTC)，包含"),
+        limit: int = Query(default=50, ge=1, le=1000, description="最多返回的工具数"),
+):
+    """按工具统计调用次数、失败率和耗时"""
+    return await _analytics(analytics_engine.tool_stats, start, end, limit=limit)
+
+
+@router.get("/admin/analytics/errors")
+async def get_analytics_errors(
+        start: Optional[date] = Query(default=None, description="开始日期(UTC)，包含"),
+        end: Optional[date] = Query(default=None, description="结束日期(UTC)，包含"),
+):
+    """按日期统计轮次出错率"""
+    return await _analytics(analytics_engine.error_rates, start, end)
+
+
+@router.post("/admin/analytics/snapshot")
+async def create_analytics_snapshot():
+    """立即导出 Parquet 快照"""
+    if not analytics_engine.available:
+        raise HTTPException(status_code=503, detail="duckdb is not installed")
+    if analytics_engine.snapshot_interval <= 0:
+        raise HTTPException(status_code=400, detail="analytics snapshots are disabled")
+    await run_in_threadpool(analytics_engine.snapshot)
+    return resp.ok(resp.Resp(data={"success": True}))
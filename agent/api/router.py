@@ -10,8 +10,10 @@
 
 from fastapi import APIRouter, Depends
 
+from agent.api.admin.api_admin import router as admin_router
 from agent.api.chat_ws.websocket_server import router as websocket_router
 from agent.api.session.api_session import router as session_router
+from agent.api.usage.api_usage import router as usage_router
 from agent.core.config import settings
 from agent.shared.server.common.base_depends import extract_request_id
 
@@ -21,3 +23,7 @@ api_router = APIRouter(dependencies=[Depends(extract_request_id)], prefix=settin
 api_router.include_router(websocket_router, prefix="/v1")
 # Include the history router
 api_router.include_router(session_router, prefix="/v1")
+# Include the admin router
+api_router.include_router(admin_router, prefix="/v1")
+# Include the usage router
+api_router.include_router(usage_router, prefix="/v1")
@@ -10,10 +10,11 @@
 
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+import orjson
+from fastapi import APIRouter, Header, HTTPException, Query
 from pydantic import BaseModel
 
-from agent.service.schema.model_message import AMessage
+from agent.service.schema.model_message import AMessage, ARound
 from agent.service.schema.model_session import ASession
 from agent.service.session_manager import session_manager
 from agent.service.session_store import session_store
@@ -40,14 +41,53 @@ class UpdateSessionRequest(BaseModel):
 # ==================== API 端点 ====================
 
 @router.get("/sessions", response_model=List[ASession])
-async def get_sessions():
-    """获取所有会话列表"""
+async def get_sessions(if_none_match: Optional[str] = Header(default=None)):
+    """获取所有会话列表，支持 If-None-Match"""
+    version = await session_store.get_sessions_version()
+    etag = resp.make_etag("sessions", version) if version is not None else None
+    if etag is not None and resp.etag_matches(if_none_match, etag):
+        return resp.not_modified(etag)
+
     sessions = await session_store.get_all_sessions()
     data = []
     for session in sessions:
         data.append(session.model_dump())
 
     response = resp.Resp(data=data)
+    return resp.with_etag(resp.ok(response), etag) if etag is not None else resp.ok(response)
+
+
+@router.get("/search")
+async def search_messages(
+        q: str = Query(..., min_length=1, max_length=256, description="检索词，空格分隔的多个词需同时匹配"),
+        limit: int = Query(default=20, ge=1, le=100, description="每页条数"),
+        offset: int = Query(default=0, ge=0, le=10000, description="偏移量"),
+        agent_id: Optional[str] = Query(default=None, description="只检索该会话"),
+):
+    """全文检索所有会话的历史消息，按相关度排序，返回高亮片段"""
+    result = await session_store.search_messages(q, limit=limit, offset=offset, agent_id=agent_id)
+    if result is None:
+        raise HTTPException(status_code=503, detail="Search is unavailable")
+    hits, has_more = result
+    response = resp.Resp(data={
+        "results": [hit.model_dump() for hit in hits],
+        "offset": offset,
+        "has_more": has_more,
+    })
+    return resp.ok(response)
+
+
+@router.get("/sessions/changes")
+async def get_session_changes(
+        since: int = Query(default=0, ge=0, description="上次返回的 cursor"),
+        limit: int = Query(default=200, ge=1, le=1000),
+):
+    """获取游标之后变更或删除的会话，用于多标签页增量同步"""
+    changes = await session_store.get_session_changes(since, limit)
+    if changes is None:
+        raise HTTPException(status_code=500, detail="Failed to get session changes")
+
+    response = resp.Resp(data=changes)
     return resp.ok(response)
 
 
@@ -114,15 +154,73 @@ async def update_session(agent_id: str, request: UpdateSessionRequest):
 
 
 @router.get("/sessions/{agent_id}/messages", response_model=List[AMessage])
-async def get_session_messages(agent_id: str):
-    """获取指定会话的所有消息"""
-    messages = await session_store.get_session_messages(agent_id)
-    data = []
-    for message in messages:
-        data.append(message.model_dump())
-
-    response = resp.Resp(data=data)
-    return resp.ok(response)
+async def get_session_messages(
+        agent_id: str,
+        rounds: Optional[int] = Query(default=None, ge=1, description="只返回最近的若干轮，默认全部"),
+        before: Optional[str] = Query(default=None, description="只返回该 round_id 之前的轮次，用于向前翻页"),
+        since: Optional[int] = Query(default=None, ge=0, description="增量同步游标，返回 seq 大于该值的消息"),
+        limit: int = Query(default=500, ge=1, le=5000, description="增量同步最多返回条数"),
+        if_none_match: Optional[str] = Header(default=None),
+):
+    """获取指定会话的消息，最近的轮次从内存缓存返回，支持 If-None-Match
+
+    传入 since 时返回 {"cursor", "reset", "has_more", "messages"}，只包含游标之后新增或更新的消息
+    """
+    version = await session_store.get_session_version(agent_id)
+    etag = None
+    message_seq = None
+    if version is not None:
+        last_activity, message_seq = version
+        etag = resp.make_etag(
+            "messages", agent_id, last_activity.isoformat(), message_seq, rounds, before, since, limit)
+        if resp.etag_matches(if_none_match, etag):
+            return resp.not_modified(etag)
+
+    response = resp.Resp(data=[])
+    if since is not None:
+        delta = await session_store.get_messages_since(agent_id, since, limit)
+        if delta is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        messages = delta.pop("messages")
+        result = resp.ok_serialized(
+            response, orjson.dumps(delta)[:-1] + b',"messages":[' + b",".join(messages) + b"]}")
+    else:
+        # 缓存的版本与本次读取的 message_seq 一致时才使用，响应内容与 ETag 对应同一版本
+        messages = await session_store.get_serialized_messages(
+            agent_id, rounds=rounds, before_round_id=before, message_seq=message_seq)
+        result = resp.ok_serialized(response, b"[" + b",".join(messages) + b"]")
+    return resp.with_etag(result, etag) if etag is not None else result
+
+
+@router.get("/sessions/{agent_id}/rounds", response_model=List[ARound])
+async def get_session_rounds(
+        agent_id: str,
+        limit: Optional[int] = Query(default=None, ge=1, description="只返回最近的若干轮，默认全部"),
+        before: Optional[str] = Query(default=None, description="只返回该 round_id 之前的轮次，用于向前翻页"),
+        if_none_match: Optional[str] = Header(default=None),
+):
+    """获取会话的轮次摘要，按开始时间升序，支持 If-None-Match"""
+    version = await session_store.get_session_version(agent_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    last_activity, message_seq = version
+    etag = resp.make_etag("rounds", agent_id, last_activity.isoformat(), message_seq, limit, before)
+    if resp.etag_matches(if_none_match, etag):
+        return resp.not_modified(etag)
+
+    rounds = await session_store.get_rounds(agent_id, limit=limit, before_round_id=before)
+    response = resp.Resp(data=[item.model_dump() for item in rounds])
+    return resp.with_etag(resp.ok(response), etag)
+
+
+@router.get("/sessions/{agent_id}/rounds/{round_id}/messages", response_model=List[AMessage])
+async def get_round_messages(agent_id: str, round_id: str):
+    """获取一轮对话的所有消息"""
+    version = await session_store.get_session_version(agent_id)
+    message_seq = version[1] if version is not None else None
+    messages = await session_store.get_serialized_round(agent_id, round_id, message_seq=message_seq)
+    response = resp.Resp(data=[])
+    return resp.ok_serialized(response, b"[" + b",".join(messages) + b"]")
 
 
 @router.delete("/sessions/{agent_id}")
@@ -0,0 +1,84 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：api_usage
+# @Date   ：2026/10/19 22:50
+# @Author ：leemysw
+
+# 2026/10/19 22:50   Create
+# 轮次用量统计接口
+# =====================================================
+
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query
+
+from agent.service.schema.model_message import AUsage
+from agent.service.session_store import session_store
+from agent.shared.server.common import resp
+
+router = APIRouter(tags=["usage"])
+
+
+def _date_range(start: Optional[date], end: Optional[date]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """日期(UTC，包含两端)转换为 [start, end) 时间范围"""
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="start must not be later than end")
+    return (
+        datetime.combine(start, time.min) if start is not None else None,
+        datetime.combine(end + timedelta(days=1), time.min) if end is not None else None,
+    )
+
+
+async def _grouped_usage(group_by: str, start: Optional[date], end: Optional[date]):
+    start_at, end_at = _date_range(start, end)
+    usage = await session_store.get_usage(group_by=group_by, start=start_at, end=end_at)
+    response = resp.Resp(data=[item.model_dump() for item in usage])
+    return resp.ok(response)
+
+
+@router.get("/sessions/{agent_id}/usage")
+async def get_session_usage(
+        agent_id: str,
+        limit: Optional[int] = Query(default=50, ge=1, le=1000, description="返回最近若干轮的明细"),
+):
+    """获取会话的用量汇总和最近若干轮的明细"""
+    session = await session_store.get_session_info(agent_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    usage = await session_store.get_usage(agent_id=agent_id)
+    rounds = await session_store.get_round_usages(agent_id, limit=limit)
+    response = resp.Resp(data={
+        "summary": (usage[0] if usage else AUsage()).model_copy(update={"key": agent_id}).model_dump(),
+        "rounds": [item.model_dump() for item in rounds],
+    })
+    return resp.ok(response)
+
+
+@router.get("/usage/sessions", response_model=List[AUsage])
+async def get_usage_by_session(
+        start: Optional[date] = Query(default=None, description="开始日期(UTC)，包含"),
+        end: Optional[date] = Query(default=None, description="结束日期(UTC)，包含"),
+):
+    """按会话汇总用量"""
+    return await _grouped_usage("agent_id", start, end)
+
+
+@router.get("/usage/daily", response_model=List[AUsage])
+async def get_usage_by_day(
+        start: Optional[date] = Query(default=None, description="开始日期(UTC)，包含"),
+        end: Optional[date] = Query(default=None, description="结束日期(UTC)，包含"),
+):
+    """按日期(UTC)汇总用量"""
+    return await _grouped_usage("day", start, end)
+
+
+@router.get("/usage/models", response_model=List[AUsage])
+async def get_usage_by_model(
+        start: Optional[date] = Query(default=None, description="开始日期(UTC)，包含"),
+        end: Optional[date] = Query(default=None, description="结束日期(UTC)，包含"),
+):
+    """按模型汇总用量"""
+    return await _grouped_usage("model", start, end)
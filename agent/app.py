@@ -8,6 +8,7 @@
 # 2024/2/23 09:55   Create
 # =====================================================
 
+import asyncio
 import gc
 from contextlib import asynccontextmanager
 
@@ -15,6 +16,7 @@ from fastapi import FastAPI
 
 from agent.api.router import api_router
 from agent.core.config import settings
+from agent.shared.http_client.session_pool import http_session_pool
 from agent.shared.server.register import register_exception, register_hook, register_middleware
 from agent.utils.logger import logger
 
@@ -28,12 +30,30 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Failed to connect to database: {e}")
 
+        if settings.MAINTENANCE_ENABLED:
+            from agent.service.maintenance import register_maintenance_jobs
+            from agent.shared.server.common.base_scheduler import maintenance_scheduler
+            register_maintenance_jobs(maintenance_scheduler)
+            maintenance_scheduler.start()
+
         gc.collect()
         gc.freeze()
 
         yield
 
     finally:
+        from agent.shared.server.common.base_scheduler import maintenance_scheduler
+        await maintenance_scheduler.stop()
+
+        try:
+            await http_session_pool.close()
+        except Exception as e:
+            logger.error(f"Failed to close http sessions: {e}")
+
+        # 等待进行中的缓存 I/O 完成，在线程中等待，不阻塞事件循环
+        from agent.shared.cacher.io_executor import shutdown_cache_io_executor
+        await asyncio.to_thread(shutdown_cache_io_executor)
+
         logger.info("Model shutdown complete.")
 
 
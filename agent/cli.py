@@ -101,5 +101,27 @@ def run(
         WSGIApplication("%(prog)s [OPTIONS] [APP_MODULE]", prog=None).run()
 
 
+@client.command("rebuild-search")
+def rebuild_search(
+        batch_size: Annotated[
+            int,
+            typer.Option("--batch-size", "-b", help="Number of messages read per batch.")
+        ] = 1000,
+):
+    """
+    Rebuild the full-text search index from existing messages. 🔎
+
+    Run after upgrading an existing database or changing [bold]SEARCH_TOKENIZER[/bold].
+    """
+    import asyncio
+
+    from agent.service.db.search_index import rebuild_search_index
+    from agent.shared.database.get_db import get_db
+
+    get_db(db_type=settings.MAIN_DB)
+    count = asyncio.run(rebuild_search_index(batch_size=batch_size))
+    typer.echo(f"Indexed {count} messages.")
+
+
 def main() -> None:
     client()
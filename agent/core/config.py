@@ -67,8 +67,59 @@ class Settings(BaseSettings):
     ACCESS_TOKEN: Optional[str] = None
 
     # 缓存配置
+    ENABLE_CACHE: bool = True
     CACHE_FILE_DIR: str = os.path.abspath(os.path.join(os.getcwd(), "cache"))
     DEFAULT_CACHE_TTL_DAYS: int = 7
+    # FileCache 内存层，条目数为 0 时关闭；内存层 TTL 决定多进程写入后的最大不一致时间
+    FILE_CACHE_MEMORY_MAX_ENTRIES: int = 0
+    FILE_CACHE_MEMORY_MAX_BYTES: int = 64 * 1024 * 1024
+    FILE_CACHE_MEMORY_TTL: int = 60
+    # 每次清理最多处理的过期缓存文件数，每日清理分批摊到后续请求中
+    FILE_CACHE_CLEANUP_BATCH: int = 500
+    # 缓存异步接口使用的 I/O 线程数
+    CACHE_IO_WORKERS: int = 4
+    # FileCache 中超过该大小(字节)的缓存值使用 mmap 读取
+    FILE_CACHE_MMAP_THRESHOLD: int = 1024 * 1024
+    # FileCache 每个命名空间的磁盘配额，0 表示不限制；超出后按 lru / lfu 淘汰
+    FILE_CACHE_MAX_BYTES: int = 0
+    FILE_CACHE_MAX_ENTRIES: int = 0
+    FILE_CACHE_EVICTION_POLICY: str = "lru"
+    # 文件指纹算法：xxh3 / blake2b / hashlib 算法名，为空时安装了 xxhash 用 xxh3，否则用 blake2b
+    FILE_FINGERPRINT_ALGORITHM: str = ""
+    # 文件指纹按 inode + 大小 + 修改时间记忆的条目数
+    FILE_FINGERPRINT_MEMO_SIZE: int = 4096
+
+    # 维护任务配置，启用后缓存清理由后台调度器执行，不再占用请求
+    MAINTENANCE_ENABLED: bool = True
+    CACHE_SWEEP_INTERVAL: int = 3600
+    TEMP_FILE_SWEEP_INTERVAL: int = 1800
+    # FileCache / TempFile 是否在请求中清理过期文件，为空时维护任务启用则关闭，否则开启；实例可单独指定
+    CACHE_INLINE_CLEANUP: Optional[bool] = None
+    # 会话保留天数，0 表示不清理
+    SESSION_RETENTION_DAYS: int = 0
+    SESSION_RETENTION_INTERVAL: int = 24 * 3600
+    # 会话元数据缓存，条目数为 0 时关闭；多 worker 部署可开启 SESSION_CACHE_SHARED 通过 Redis 共享并广播失效
+    SESSION_CACHE_TTL: int = 60
+    SESSION_CACHE_MAX_ENTRIES: int = 4096
+    SESSION_CACHE_SHARED: bool = False
+    # 活跃会话最近若干轮消息的内存缓存，所有会话共享字节上限，为 0 时关闭
+    CONVERSATION_CACHE_ROUNDS: int = 20
+    CONVERSATION_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # 统计分析使用 DuckDB 只读挂载 SQLite；快照间隔大于 0 时定期导出 Parquet 快照，查询读快照不再访问 SQLite
+    ANALYTICS_SNAPSHOT_INTERVAL: int = 0
+    ANALYTICS_THREADS: int = 2
+    ANALYTICS_MEMORY_LIMIT: str = "1GB"
+    # 全文检索分词器，trigram 支持中文子串匹配（少于 3 个字的词退化为 LIKE 扫描），修改后需执行 agent-kit rebuild-search
+    SEARCH_TOKENIZER: str = "trigram"
+    # 每条消息写入索引的最大字符数，超长的工具结果只索引开头部分
+    SEARCH_MAX_TEXT_LENGTH: int = 32 * 1024
+
+    # HTTP 客户端配置
+    HTTP_TIMEOUT: int = 60
+    HTTP_POOL_LIMIT: int = 100
+    HTTP_POOL_LIMIT_PER_HOST: int = 20
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_KEEPALIVE_TIMEOUT: float = 30
 
     # ==============================================================
     MAIN_DB:str = "async_sqlite"
@@ -0,0 +1,266 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：analytics
+# @Date   ：2026/10/19 23:10
+# @Author ：leemysw
+
+# 2026/10/19 23:10   Create
+# 基于 DuckDB 的统计分析
+# =====================================================
+
+import importlib.util
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent.core.config import settings
+from agent.shared.database.get_db import get_db
+from agent.utils.logger import logger
+from agent.utils.utils import cache_path
+
+_ALIAS = "agent_kit"
+
+# 只取统计需要的列，JSON 字段在这里展开，快照中不保存消息内容。
+# 挂载时开启 sqlite_all_varchar，所有列都按字符串读出，再显式转换类型
+_SOURCES = {
+    "messages": f"""
+        SELECT
+            agent_id,
+            round_id,
+            message_type,
+            block_type,
+            TRY_CAST(timestamp AS TIMESTAMP) AS ts,
+            CASE WHEN block_type = 'tool_use'
+                THEN json_extract_string(message, '$.content[0].name') END AS tool_name,
+            CASE WHEN block_type = 'tool_use' THEN json_extract_string(message, '$.content[0].id')
+                 WHEN block_type = 'tool_result' THEN json_extract_string(message, '$.content[0].tool_use_id')
+                END AS tool_use_id,
+            CASE WHEN block_type = 'tool_result'
+                THEN coalesce(TRY_CAST(json_extract_string(message, '$.content[0].is_error') AS BOOLEAN), false)
+                END AS tool_is_error
+        FROM {_ALIAS}.messages
+    """,
+    "rounds": f"""
+        SELECT
+            agent_id,
+            round_id,
+            model,
+            TRY_CAST(started_at AS TIMESTAMP) AS started_at,
+            TRY_CAST(ttft_ms AS BIGINT) AS ttft_ms,
+            TRY_CAST(duration_ms AS BIGINT) AS duration_ms,
+            coalesce(TRY_CAST(input_tokens AS BIGINT), 0) AS input_tokens,
+            coalesce(TRY_CAST(output_tokens AS BIGINT), 0) AS output_tokens,
+            coalesce(TRY_CAST(cache_creation_input_tokens AS BIGINT), 0) AS cache_creation_input_tokens,
+            coalesce(TRY_CAST(cache_read_input_tokens AS BIGINT), 0) AS cache_read_input_tokens,
+            coalesce(TRY_CAST(total_cost_usd AS DOUBLE), 0) AS total_cost_usd,
+            subtype,
+            coalesce(TRY_CAST(is_error AS BOOLEAN), false) AS is_error
+        FROM {_ALIAS}.rounds
+    """,
+}
+# 快照按时间排序写入，Parquet 行组的最小/最大值可以跳过时间范围之外的数据
+_SNAPSHOT_ORDER = {"messages": "ts", "rounds": "started_at"}
+
+
+def _sqlite_path(database_url: str) -> str:
+    """sqlite+aiosqlite:///path -> path"""
+    if not database_url.startswith("sqlite"):
+        raise ValueError(f"统计分析只支持 SQLite 数据库: {database_url}")
+    return database_url.split(":///", 1)[1]
+
+
+def _time_filter(column: str, start: Optional[datetime], end: Optional[datetime]) -> Tuple[str, List[Any]]:
+    clauses, params = ["TRUE"], []
+    if start is not None:
+        clauses.append(f"{column} >= ?")
+        params.append(start)
+    if end is not None:
+        clauses.append(f"{column} < ?")
+        params.append(end)
+    return " AND ".join(clauses), params
+
+
+class AnalyticsEngine:
+    """DuckDB 统计分析引擎。
+
+    - 使用 get_db("duckdb") 的内存连接，只读挂载 SQLite 数据库，列式聚合不占用 SQLite 写连接
+    - snapshot_interval > 0 时由维护任务定期把 messages / rounds 导出为 Parquet，
+      查询改读快照，完全不访问 SQLite；快照不存在时回退到挂载的 SQLite
+    - 每次查询使用独立游标，在线程池中执行，不阻塞事件循环
+    """
+
+    def __init__(self, database_url: str, snapshot_interval: int = 0, threads: int = 2, memory_limit: str = "1GB"):
+        self.database_url = database_url
+        self.snapshot_interval = snapshot_interval
+        self.threads = threads
+        self.memory_limit = memory_limit
+        self._conn = None
+        self._source: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return importlib.util.find_spec("duckdb") is not None
+
+    @property
+    def snapshot_dir(self) -> str:
+        return cache_path(settings.CACHE_FILE_DIR, "analytics")
+
+    def _snapshot_file(self, table: str) -> str:
+        return os.path.join(self.snapshot_dir, f"{table}.parquet")
+
+    def _has_snapshot(self) -> bool:
+        return self.snapshot_interval > 0 and all(os.path.isfile(self._snapshot_file(table)) for table in _SOURCES)
+
+    # ---------------- 连接 ----------------
+
+    def _connection(self):
+        """返回已挂载数据库并建好视图的连接，快照首次生成后切换到快照"""
+        if self._conn is not None and (self._source == "parquet" or not self._has_snapshot()):
+            return self._conn
+        with self._lock:
+            if self._conn is None:
+                conn = get_db(db_type="duckdb")
+                conn.execute(f"SET threads = {int(self.threads)}")
+                conn.execute(f"SET memory_limit = '{self.memory_limit}'")
+                conn.execute("INSTALL sqlite")
+                conn.execute("LOAD sqlite")
+                conn.execute("SET GLOBAL sqlite_all_varchar = true")
+                conn.execute(f"ATTACH '{_sqlite_path(self.database_url)}' AS {_ALIAS} (TYPE sqlite, READ_ONLY)")
+                for table, sql in _SOURCES.items():
+                    conn.execute(f"CREATE OR REPLACE VIEW src_{table} AS {sql}")
+                self._conn = conn
+            self._create_views()
+        return self._conn
+
+    def _create_views(self) -> None:
+        source = "parquet" if self._has_snapshot() else "sqlite"
+        if source == self._source:
+            return
+        for table in _SOURCES:
+            if source == "parquet":
+                target = f"read_parquet('{self._snapshot_file(table)}')"
+            else:
+                target = f"src_{table}"
+            self._conn.execute(f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM {target}")
+        self._source = source
+        logger.info(f"【Analytics】查询数据源: {source}")
+
+    def query(self, sql: str, params: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        cursor = self._connection().cursor()
+        try:
+            cursor.execute(sql, params or [])
+            columns = [item[0] for item in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def snapshot(self) -> None:
+        """导出 Parquet 快照，先写临时文件再原子替换，查询中的其他进程不受影响"""
+        conn = self._connection()
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        cursor = conn.cursor()
+        try:
+            for table, order in _SNAPSHOT_ORDER.items():
+                path = self._snapshot_file(table)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                cursor.execute(
+                    f"COPY (SELECT * FROM src_{table} ORDER BY {order}) "
+                    f"TO '{tmp}' (FORMAT parquet, COMPRESSION zstd)")
+                os.replace(tmp, path)
+        finally:
+            cursor.close()
+        with self._lock:
+            self._create_views()
+        logger.info(f"【Analytics】已导出快照: {self.snapshot_dir}")
+
+    # ---------------- 统计 ----------------
+
+    def usage_by_day(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                     by_model: bool = False) -> List[Dict[str, Any]]:
+        """按日期(UTC)汇总轮次数、token、费用和耗时，by_model 时再按模型拆分"""
+        where, params = _time_filter("started_at", start, end)
+        model = "model," if by_model else ""
+        return self.query(f"""
+            SELECT
+                CAST(started_at AS DATE) AS day,
+                {model}
+                count(*) AS rounds,
+                sum(input_tokens) AS input_tokens,
+                sum(output_tokens) AS output_tokens,
+                sum(cache_creation_input_tokens) AS cache_creation_input_tokens,
+                sum(cache_read_input_tokens) AS cache_read_input_tokens,
+                sum(total_cost_usd) AS total_cost_usd,
+                avg(ttft_ms) AS avg_ttft_ms,
+                quantile_cont(ttft_ms, 0.95) AS p95_ttft_ms,
+                avg(duration_ms) AS avg_duration_ms,
+                quantile_cont(duration_ms, 0.95) AS p95_duration_ms
+            FROM rounds
+            WHERE {where}
+            GROUP BY ALL
+            ORDER BY ALL
+        """, params)
+
+    def tool_stats(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   limit: int = 50) -> List[Dict[str, Any]]:
+        """按工具统计调用次数、失败率和从调用到结果的耗时"""
+        where, params = _time_filter("ts", start, end)
+        return self.query(f"""
+            WITH uses AS (
+                SELECT tool_use_id, tool_name, ts FROM messages
+                WHERE block_type = 'tool_use' AND {where}
+            ),
+            results AS (
+                SELECT tool_use_id, min(ts) AS ts, bool_or(tool_is_error) AS is_error FROM messages
+                WHERE block_type = 'tool_result' AND {where}
+                GROUP BY tool_use_id
+            ),
+            calls AS (
+                SELECT u.tool_name, r.tool_use_id IS NOT NULL AS completed, r.is_error,
+                       date_diff('millisecond', u.ts, r.ts) AS latency_ms
+                FROM uses u LEFT JOIN results r USING (tool_use_id)
+            )
+            SELECT
+                tool_name,
+                count(*) AS calls,
+                count(*) FILTER (WHERE completed) AS completed,
+                count(*) FILTER (WHERE is_error) AS errors,
+                count(*) FILTER (WHERE is_error) / greatest(count(*) FILTER (WHERE completed), 1) AS error_rate,
+                avg(latency_ms) AS avg_latency_ms,
+                quantile_cont(latency_ms, 0.5) AS p50_latency_ms,
+                quantile_cont(latency_ms, 0.95) AS p95_latency_ms
+            FROM calls
+            GROUP BY tool_name
+            ORDER BY calls DESC, tool_name
+            LIMIT ?
+        """, params + params + [limit])
+
+    def error_rates(self, start: Optional[datetime] = None,
+                    end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """按日期(UTC)统计轮次的成功、出错、中断数量和出错率"""
+        where, params = _time_filter("started_at", start, end)
+        return self.query(f"""
+            SELECT
+                CAST(started_at AS DATE) AS day,
+                count(*) AS rounds,
+                count(*) FILTER (WHERE subtype = 'success') AS success,
+                count(*) FILTER (WHERE is_error AND subtype IS DISTINCT FROM 'interrupted') AS errors,
+                count(*) FILTER (WHERE subtype = 'interrupted') AS interrupted,
+                count(*) FILTER (WHERE subtype IS NULL) AS unfinished,
+                count(*) FILTER (WHERE is_error AND subtype IS DISTINCT FROM 'interrupted') / count(*) AS error_rate
+            FROM rounds
+            WHERE {where}
+            GROUP BY ALL
+            ORDER BY ALL
+        """, params)
+
+
+# 全局实例
+analytics_engine = AnalyticsEngine(
+    database_url=settings.DATABASE_URL,
+    snapshot_interval=settings.ANALYTICS_SNAPSHOT_INTERVAL,
+    threads=settings.ANALYTICS_THREADS,
+    memory_limit=settings.ANALYTICS_MEMORY_LIMIT,
+)
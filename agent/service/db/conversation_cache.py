@@ -0,0 +1,271 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：conversation_cache
+# @Date   ：2026/10/19 21:50
+# @Author ：leemysw
+
+# 2026/10/19 21:50   Create
+# 活跃会话最近若干轮消息的内存缓存
+# =====================================================
+
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from agent.core.config import settings
+from agent.service.schema.model_message import AMessage
+from agent.shared.cacher.memory_cache import LRUCache
+
+
+def serialize_message(message: AMessage) -> bytes:
+    """序列化为与 JSONResponse(jsonable_encoder(message.model_dump())) 相同的 JSON"""
+    return orjson.dumps(message.model_dump(), default=jsonable_encoder)
+
+
+class _Tail:
+    """单个会话的尾部缓存，rounds 按轮次开始顺序排列，每轮内按写入顺序排列"""
+
+    __slots__ = ("rounds", "complete", "size", "updated", "message_seq")
+
+    def __init__(self, complete: bool, message_seq: Optional[int]):
+        self.rounds: "OrderedDict[str, OrderedDict[str, bytes]]" = OrderedDict()
+        # 为 True 时缓存包含会话的全部消息，可以直接返回完整历史
+        self.complete = complete
+        self.size = 0
+        self.updated = 0
+        # 缓存内容对应的会话 message_seq，None 表示未知，读取时不命中
+        self.message_seq = message_seq
+
+
+class ConversationTailCache:
+    """缓存每个活跃会话最近 max_rounds 轮已序列化的消息。
+
+    - 消息写入、删除轮次、删除会话时由 SessionRepository 同步更新
+    - 历史接口优先从这里取，缓存无法覆盖请求范围时回退数据库，并用查询结果回填
+    - 每个会话记录缓存内容对应的 message_seq，读取时与数据库中的版本比较，
+      其他 worker 写入过消息时版本不一致，不使用本进程的旧缓存
+    - 所有会话共享 max_bytes 的内存上限，超出后按最近最少访问淘汰整个会话
+    - 只在事件循环线程中调用，不加锁
+    """
+
+    def __init__(self, max_rounds: int, max_bytes: int):
+        self.max_rounds = max_rounds
+        self.max_bytes = max_bytes
+        self.enabled = max_rounds > 0 and max_bytes > 0
+        self._tails: "OrderedDict[str, _Tail]" = OrderedDict()
+        self._bytes = 0
+        # 每次修改递增，回填前比较，避免查询数据库期间发生的写入被旧结果覆盖
+        self._clock = 0
+        self._stamps = LRUCache(max_entries=8192)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ---------------- 内部 ----------------
+
+    def _touch(self, agent_id: str) -> None:
+        self._clock += 1
+        self._stamps.set(agent_id, self._clock)
+        tail = self._tails.get(agent_id)
+        if tail is not None:
+            tail.updated = self._clock
+
+    def _resize(self, tail: _Tail, delta: int) -> None:
+        tail.size += delta
+        self._bytes += delta
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._tails:
+            _, tail = self._tails.popitem(last=False)
+            self._bytes -= tail.size
+            self.evictions += 1
+
+    def _trim(self, tail: _Tail) -> None:
+        while len(tail.rounds) > self.max_rounds:
+            _, messages = tail.rounds.popitem(last=False)
+            self._resize(tail, -sum(len(data) for data in messages.values()))
+            tail.complete = False
+
+    def _drop(self, agent_id: str) -> None:
+        tail = self._tails.pop(agent_id, None)
+        if tail is not None:
+            self._bytes -= tail.size
+
+    # ---------------- 写入 ----------------
+
+    def start(self, agent_id: str) -> None:
+        """新建会话，此时历史为空，缓存是完整的"""
+        if not self.enabled:
+            return
+        self._drop(agent_id)
+        self._tails[agent_id] = _Tail(complete=True, message_seq=0)
+        self._touch(agent_id)
+
+    def append(self, message: AMessage) -> None:
+        """消息写入数据库后调用，message.seq 为写入后会话的 message_seq，同一 message_id 重复写入时替换并移到轮次末尾"""
+        if not self.enabled:
+            return
+        agent_id = message.agent_id
+        tail = self._tails.get(agent_id)
+        if tail is None:
+            if message.message_type != "user":
+                # 轮次中途才出现的会话不缓存，避免缓存半轮消息
+                self._touch(agent_id)
+                return
+            tail = self._tails[agent_id] = _Tail(complete=False, message_seq=message.seq)
+        elif tail.message_seq is not None and message.seq == tail.message_seq + 1:
+            tail.message_seq = message.seq
+        else:
+            # 序号不连续：其他 worker 写入过消息或本进程的写入乱序完成，缓存内容无法确认
+            tail.message_seq = None
+
+        data = serialize_message(message)
+        messages = tail.rounds.get(message.round_id)
+        if messages is None:
+            messages = tail.rounds[message.round_id] = OrderedDict()
+        old = messages.pop(message.message_id, None)
+        messages[message.message_id] = data
+        self._resize(tail, len(data) - (len(old) if old is not None else 0))
+
+        self._trim(tail)
+        self._tails.move_to_end(agent_id)
+        self._touch(agent_id)
+        self._evict()
+
+    def delete_round(self, agent_id: str, round_id: str, message_seq: Optional[int] = None) -> None:
+        """删除轮次后调用，message_seq 为删除后会话的 message_seq，未知时缓存不再命中直到重新回填"""
+        if not self.enabled:
+            return
+        tail = self._tails.get(agent_id)
+        if tail is not None:
+            messages = tail.rounds.pop(round_id, None)
+            if messages:
+                self._resize(tail, -sum(len(data) for data in messages.values()))
+            if message_seq is None or tail.message_seq is None or message_seq != tail.message_seq + 1:
+                tail.message_seq = None
+            else:
+                tail.message_seq = message_seq
+        self._touch(agent_id)
+
+    def invalidate(self, *agent_ids: str) -> None:
+        if not self.enabled:
+            return
+        for agent_id in agent_ids:
+            self._drop(agent_id)
+            self._touch(agent_id)
+
+    # ---------------- 读取 ----------------
+
+    def stamp(self) -> int:
+        """查询数据库前调用，返回值传给 seed"""
+        return self._clock
+
+    def seed(self, agent_id: str, rows: Iterable[Tuple[str, str, bytes]], complete: bool, stamp: int,
+             message_seq: int) -> None:
+        """用数据库中最近若干轮的查询结果回填缓存
+
+        Args:
+            agent_id: 会话ID
+            rows: 按时间升序的 (round_id, message_id, 序列化消息)
+            complete: rows 是否为会话的全部消息
+            stamp: 查询数据库前 stamp() 的返回值，期间会话被修改过时放弃回填
+            message_seq: 查询数据库前读取的会话 message_seq；查询期间其他 worker 写入时结果可能更新，
+                下次读取时版本不一致会重新回填，不会返回旧内容
+        """
+        if not self.enabled or self._stamps.get(agent_id, 0) > stamp:
+            return
+        tail = _Tail(complete=complete, message_seq=message_seq)
+        for round_id, message_id, data in rows:
+            messages = tail.rounds.get(round_id)
+            if messages is None:
+                messages = tail.rounds[round_id] = OrderedDict()
+            messages[message_id] = data
+            tail.size += len(data)
+        if tail.size > self.max_bytes:
+            return
+
+        self._drop(agent_id)
+        self._tails[agent_id] = tail
+        self._bytes += tail.size
+        self._trim(tail)
+        self._touch(agent_id)
+        self._evict()
+
+    def _current(self, agent_id: str, message_seq: Optional[int]) -> Optional[_Tail]:
+        """返回与数据库版本一致的缓存，缓存落后于数据库时丢弃，等待重新回填"""
+        tail = self._tails.get(agent_id)
+        if tail is None or message_seq is None:
+            return None
+        if tail.message_seq != message_seq:
+            if tail.message_seq is None or tail.message_seq < message_seq:
+                self._drop(agent_id)
+            return None
+        return tail
+
+    def get(self, agent_id: str, message_seq: Optional[int], rounds: Optional[int] = None,
+            before_round_id: Optional[str] = None) -> Optional[List[bytes]]:
+        """返回按时间升序的序列化消息，缓存版本与 message_seq 不一致或不能覆盖请求范围时返回 None
+
+        Args:
+            agent_id: 会话ID
+            message_seq: 数据库中会话当前的 message_seq，None 表示未知，不使用缓存
+            rounds: 最多返回的轮次数，None 表示全部
+            before_round_id: 只返回该轮次之前的轮次
+        """
+        if not self.enabled:
+            return None
+        tail = self._current(agent_id, message_seq)
+        if tail is None:
+            self.misses += 1
+            return None
+
+        round_ids = list(tail.rounds)
+        if before_round_id is not None:
+            if before_round_id not in tail.rounds:
+                self.misses += 1
+                return None
+            round_ids = round_ids[:round_ids.index(before_round_id)]
+
+        if rounds is not None and len(round_ids) >= rounds:
+            round_ids = round_ids[len(round_ids) - rounds:]
+        elif not tail.complete:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._tails.move_to_end(agent_id)
+        return [data for round_id in round_ids for data in tail.rounds[round_id].values()]
+
+    def get_round(self, agent_id: str, round_id: str, message_seq: Optional[int]) -> Optional[List[bytes]]:
+        """返回一轮的序列化消息，未缓存或缓存版本与 message_seq 不一致时返回 None"""
+        if not self.enabled:
+            return None
+        tail = self._current(agent_id, message_seq)
+        messages = tail.rounds.get(round_id) if tail is not None else None
+        if messages is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._tails.move_to_end(agent_id)
+        return list(messages.values())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self._tails),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "max_rounds": self.max_rounds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# 全局实例
+conversation_cache = ConversationTailCache(
+    max_rounds=settings.CONVERSATION_CACHE_ROUNDS,
+    max_bytes=settings.CONVERSATION_CACHE_MAX_BYTES,
+)
@@ -11,9 +11,10 @@
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import DateTime, JSON, String
+from sqlalchemy import Boolean, DDL, DateTime, Float, Index, Integer, JSON, String, Text, event
 from sqlalchemy.orm import Mapped, mapped_column
 
+from agent.core.config import settings
 from agent.shared.database.async_sqlalchemy import Base
 
 
@@ -27,6 +28,12 @@ class Session(Base):
     last_activity: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
     title: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     options: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # 消息写入或删除时递增，用于判断会话消息是否变化
+    message_seq: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    # 删除轮次时记录当时的 message_seq，游标小于该值的增量同步需要重新加载
+    reset_seq: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    # 会话被创建、修改或写入消息时的全局变更序号
+    change_seq: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False, index=True)
 
     def __repr__(self):
         return f"<Session(session_id='{self.session_id}', agent_id='{self.agent_id}', title='{self.title}')>"
@@ -45,6 +52,101 @@ class Message(Base):
     block_type: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)  # text/thinking/tool_use/tool_result
     message: Mapped[dict] = mapped_column(JSON, nullable=False)
     timestamp: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # 会话内写入序号，取写入时会话的 message_seq，插入和更新都会刷新
+    seq: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
+    __table_args__ = (
+        Index("ix_messages_agent_id_seq", "agent_id", "seq"),
+    )
 
     def __repr__(self):
         return f"<Message(message_id={self.message_id}, session_id='{self.session_id}', round_id={self.round_id}, type='{self.message_type}')>"
+
+
+class Round(Base):
+    """轮次统计表，每轮对话一行，记录耗时、token 用量和费用"""
+    __tablename__ = "rounds"
+
+    round_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    agent_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    session_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    model: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    ttft_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # 首个响应耗时
+    duration_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    duration_api_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    num_turns: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    input_tokens: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    output_tokens: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    cache_creation_input_tokens: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    cache_read_input_tokens: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    total_cost_usd: Mapped[float] = mapped_column(Float, default=0, server_default="0", nullable=False)
+    subtype: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)  # success/error_*/interrupted
+    is_error: Mapped[bool] = mapped_column(Boolean, default=False, server_default="0", nullable=False)
+
+    __table_args__ = (
+        Index("ix_rounds_agent_id_started_at", "agent_id", "started_at"),
+        Index("ix_rounds_started_at", "started_at"),
+        Index("ix_rounds_model_started_at", "model", "started_at"),
+    )
+
+    def __repr__(self):
+        return f"<Round(round_id={self.round_id}, agent_id='{self.agent_id}', subtype='{self.subtype}')>"
+
+
+class SessionTombstone(Base):
+    """已删除会话记录，供会话增量同步返回删除"""
+    __tablename__ = "session_tombstones"
+
+    agent_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    change_seq: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class Sequence(Base):
+    """命名计数器"""
+    __tablename__ = "sequences"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class SearchDocument(Base):
+    """全文检索文档表，每条消息一行，保存抽取出的文本；search_fts 为其外部内容 FTS5 索引，由触发器同步"""
+    __tablename__ = "search_documents"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    message_id: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    agent_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    round_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    block_type: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index("ix_search_documents_agent_id_round_id", "agent_id", "round_id"),
+    )
+
+    def __repr__(self):
+        return f"<SearchDocument(message_id={self.message_id}, agent_id='{self.agent_id}')>"
+
+
+def search_fts_ddl(tokenizer: str) -> list:
+    """search_fts 虚拟表和同步触发器的建表语句"""
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+        f"content, content='search_documents', content_rowid='id', tokenize='{tokenizer}')",
+        "CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN "
+        "INSERT INTO search_fts(rowid, content) VALUES (new.id, new.content); END",
+        "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+        "INSERT INTO search_fts(search_fts, rowid, content) VALUES ('delete', old.id, old.content); END",
+        "CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN "
+        "INSERT INTO search_fts(search_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+        "INSERT INTO search_fts(rowid, content) VALUES (new.id, new.content); END",
+    ]
+
+
+# metadata.create_all 建表时一并创建 FTS5 索引和触发器
+for _statement in search_fts_ddl(settings.SEARCH_TOKENIZER):
+    event.listen(SearchDocument.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
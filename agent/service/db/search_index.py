@@ -0,0 +1,173 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：search_index
+# @Date   ：2026/10/19 23:40
+# @Author ：leemysw
+
+# 2026/10/19 23:40   Create
+# 会话历史全文检索：文本抽取、查询构造和索引重建
+# =====================================================
+
+import html
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select, text
+
+from agent.core.config import settings
+from agent.service.db.models import Message, SearchDocument, search_fts_ddl
+from agent.shared.database.async_sqlalchemy import db
+from agent.utils.logger import logger
+
+# snippet() 的高亮标记，先转义 HTML 再替换为 <mark>，消息中的 HTML 不会原样输出
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+_TRIGRAM_MIN_LENGTH = 3
+
+
+def _block_texts(block: Any) -> List[str]:
+    if isinstance(block, str):
+        return [block]
+    if not isinstance(block, dict):
+        return []
+    if "text" in block:  # TextBlock / 工具结果中的文本
+        return [block["text"] or ""]
+    if "thinking" in block:  # ThinkingBlock
+        return [block["thinking"] or ""]
+    if "name" in block and "input" in block:  # ToolUseBlock
+        return [block["name"], json.dumps(block["input"], ensure_ascii=False)]
+    if "tool_use_id" in block:  # ToolResultBlock
+        content = block.get("content")
+        if isinstance(content, list):
+            return [part for item in content for part in _block_texts(item)]
+        return _block_texts(content)
+    return []
+
+
+def extract_search_text(message_type: str, data: Dict[str, Any]) -> Optional[str]:
+    """从消息中抽取文本、思考、工具调用和工具结果，其他消息返回 None
+
+    Args:
+        message_type: 消息类型
+        data: asdict 后的 SDK 消息
+    """
+    if message_type not in ("user", "assistant"):
+        return None
+    content = data.get("content")
+    blocks = content if isinstance(content, list) else [content]
+    texts = [part for block in blocks for part in _block_texts(block) if part]
+    if not texts:
+        return None
+    return "\n".join(texts)[:settings.SEARCH_MAX_TEXT_LENGTH]
+
+
+def build_match_query(query: str) -> Tuple[Optional[str], List[str]]:
+    """把用户输入拆成 FTS5 短语查询和需要 LIKE 匹配的短词
+
+    每个词加引号作为短语，词之间为 AND，用户输入中的 FTS5 语法不生效；
+    trigram 分词器无法匹配少于 3 个字的词，这些词改用 LIKE 过滤
+
+    Returns:
+        (MATCH 表达式，没有可用于 MATCH 的词时为 None；LIKE 词列表)
+    """
+    trigram = settings.SEARCH_TOKENIZER.split()[0] == "trigram"
+    phrases, like_terms = [], []
+    for term in query.split():
+        term = term.strip('"')
+        if not term:
+            continue
+        if trigram and len(term) < _TRIGRAM_MIN_LENGTH:
+            like_terms.append(term)
+        else:
+            phrases.append('"' + term.replace('"', '""') + '"')
+    return (" ".join(phrases) or None), like_terms
+
+
+def like_pattern(term: str) -> str:
+    """转义 LIKE 通配符，配合 ESCAPE '\\' 使用"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def render_snippet(snippet: str) -> str:
+    """转义 HTML 后把高亮标记替换为 <mark>"""
+    return html.escape(snippet).replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_END, "</mark>")
+
+
+def make_snippet(content: str, terms: List[str], width: int = 64) -> str:
+    """LIKE 查询没有 snippet()，截取第一个匹配词附近的文本并高亮"""
+    lowered = content.lower()
+    positions = [(lowered.find(term.lower()), term) for term in terms]
+    positions = [(pos, term) for pos, term in positions if pos >= 0]
+    if not positions:
+        return html.escape(content[:width])
+    pos, term = min(positions)
+    start = max(0, pos - width // 2)
+    end = min(len(content), pos + len(term) + width // 2)
+    return (
+        ("…" if start > 0 else "")
+        + html.escape(content[start:pos])
+        + "<mark>" + html.escape(content[pos:pos + len(term)]) + "</mark>"
+        + html.escape(content[pos + len(term):end])
+        + ("…" if end < len(content) else "")
+    )
+
+
+async def rebuild_search_index(batch_size: int = 1000) -> int:
+    """按当前分词器重建全文检索索引
+
+    删除索引后从 messages 重新抽取文本，全部写入后一次性构建 FTS5 索引；
+    整个过程在一个事务中完成，期间持有数据库写锁，检索读取旧索引，失败时保留旧索引
+
+    Returns:
+        int: 写入索引的消息数量
+    """
+    count = 0
+    async with db.session() as db_session:
+        # sqlite3 驱动只在 DML 前开启事务，先执行一条空 DML，之后的 DDL 才会在同一事务中，失败时整体回滚
+        await db_session.execute(text("UPDATE search_documents SET id = id WHERE 0"))
+        for statement in ("DROP TRIGGER IF EXISTS search_documents_ai",
+                          "DROP TRIGGER IF EXISTS search_documents_ad",
+                          "DROP TRIGGER IF EXISTS search_documents_au",
+                          "DROP TABLE IF EXISTS search_fts",
+                          "DELETE FROM search_documents"):
+            await db_session.execute(text(statement))
+
+        last_id = ""
+        while True:
+            rows = (await db_session.execute(
+                select(Message.message_id, Message.agent_id, Message.round_id, Message.message_type,
+                       Message.block_type, Message.message, Message.timestamp)
+                .where(Message.message_type.in_(("user", "assistant")))
+                .where(Message.message_id > last_id)
+                .order_by(Message.message_id.asc())
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                break
+            last_id = rows[-1].message_id
+
+            documents = []
+            for row in rows:
+                content = extract_search_text(row.message_type, row.message or {})
+                if content:
+                    documents.append({
+                        "message_id": row.message_id,
+                        "agent_id": row.agent_id,
+                        "round_id": row.round_id,
+                        "block_type": row.block_type,
+                        "content": content,
+                        "timestamp": row.timestamp,
+                    })
+            if documents:
+                await db_session.execute(insert(SearchDocument), documents)
+                count += len(documents)
+
+        for statement in search_fts_ddl(settings.SEARCH_TOKENIZER):
+            await db_session.execute(text(statement))
+        await db_session.execute(text("INSERT INTO search_fts(search_fts) VALUES ('rebuild')"))
+        await db_session.commit()
+
+    logger.info(f"🔎 重建全文检索索引完成: 共{count}条消息, tokenizer={settings.SEARCH_TOKENIZER}")
+    return count
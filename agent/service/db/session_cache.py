@@ -0,0 +1,107 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：session_cache
+# @Date   ：2026/10/19 21:30
+# @Author ：leemysw
+
+# 2026/10/19 21:30   Create
+# 会话元数据缓存
+# =====================================================
+
+from typing import Optional
+
+from agent.core.config import settings
+from agent.service.schema.model_session import ASession
+from agent.shared.cacher.memory_cache import LRUCache
+from agent.utils.logger import logger
+
+
+class SessionCache:
+    """SessionRepository.get_session 的缓存，写操作提交后由仓库负责写入或失效。
+
+    - 默认只在进程内缓存，TTL 是其他 worker 修改会话后本进程的最大不一致时间
+    - shared=True 时存入 Redis，并开启近端缓存，本进程读取仍命中内存，
+      修改时通过 pub/sub 通知其他 worker 删除本地副本
+    - 不缓存"会话不存在"，新建会话立即可见
+    - create_message 更新的 last_activity 不回写缓存，读取到的 last_activity 最多滞后一个 TTL
+    """
+
+    def __init__(self, ttl: int, max_entries: int, shared: bool = False):
+        """
+        Args:
+            ttl: 缓存时间(秒)
+            max_entries: 进程内最大条目数，0 表示关闭缓存
+            shared: 是否通过 Redis 在多个 worker 间共享
+        """
+        self.ttl = ttl
+        self.enabled = max_entries > 0 and ttl > 0
+        self.shared = shared
+        self._max_entries = max_entries
+        self._local = LRUCache(max_entries=max_entries, default_ttl=ttl) if self.enabled else None
+        self._redis = None
+
+    def _shared_cache(self):
+        if self._redis is None:
+            from agent.shared.cacher.redis_cache import get_async_cache_instance
+            self._redis = get_async_cache_instance(
+                "session", near_cache_size=self._max_entries)
+        return self._redis
+
+    async def get(self, agent_id: str) -> Optional[ASession]:
+        if not self.enabled:
+            return None
+        if not self.shared:
+            session = self._local.get(agent_id)
+            return session.model_copy(deep=True) if session is not None else None
+        try:
+            data = await self._shared_cache().get_json(agent_id)
+        except Exception as e:
+            logger.warning(f"【SessionCache】读取共享缓存失败: {e}")
+            return None
+        return ASession.model_validate(data) if data else None
+
+    async def set(self, session: ASession) -> None:
+        if not self.enabled:
+            return
+        if not self.shared:
+            self._local.set(session.agent_id, session.model_copy(deep=True))
+            return
+        try:
+            await self._shared_cache().set_json(session.agent_id, session.model_dump(mode="json"), ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"【SessionCache】写入共享缓存失败: {e}")
+
+    async def invalidate(self, *agent_ids: str) -> None:
+        if not self.enabled or not agent_ids:
+            return
+        if not self.shared:
+            for agent_id in agent_ids:
+                self._local.delete(agent_id)
+            return
+        # 逐个删除：多个 key 可能落在 Redis Cluster 的不同 slot，一次 DEL 会报 CROSSSLOT
+        cache = self._shared_cache()
+        for agent_id in agent_ids:
+            try:
+                await cache.delete(agent_id)
+            except Exception as e:
+                logger.warning(f"【SessionCache】删除共享缓存失败: {agent_id}, Error: {e}")
+
+    def clear(self) -> None:
+        if self._local is not None:
+            self._local.clear()
+
+    def stats(self):
+        if not self.enabled:
+            return None
+        if self.shared:
+            return self._shared_cache().near_cache_stats()
+        return self._local.stats()
+
+
+# 全局实例
+session_cache = SessionCache(
+    ttl=settings.SESSION_CACHE_TTL,
+    max_entries=settings.SESSION_CACHE_MAX_ENTRIES,
+    shared=settings.SESSION_CACHE_SHARED,
+)
@@ -8,18 +8,30 @@
 # 2025/8/30 14:40   Create
 # =====================================================
 
+import hashlib
 from dataclasses import asdict
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
-
-from sqlalchemy import delete, func, select, update
-
-from agent.service.db.models import Message, Session
-from agent.service.schema.model_message import AMessage
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, select, text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from agent.service.db.conversation_cache import conversation_cache
+from agent.service.db.models import Message, Round, SearchDocument, Sequence, Session, SessionTombstone
+from agent.service.db.search_index import (
+    HIGHLIGHT_END, HIGHLIGHT_START, build_match_query, extract_search_text, like_pattern, make_snippet, render_snippet
+)
+from agent.service.db.session_cache import session_cache
+from agent.service.schema.model_message import AMessage, ARound, ARoundUsage, ASearchHit, AUsage
 from agent.service.schema.model_session import ASession
 from agent.shared.database.async_sqlalchemy import db
 from agent.utils.logger import logger
 
+# 会话变更序号的计数器名
+_SESSION_CHANGES = "session_changes"
+# 轮次摘要中用户问题预览的长度
+_PREVIEW_LENGTH = 200
+
 
 class SessionRepository:
     """会话数据仓库"""
@@ -57,10 +69,15 @@ class SessionRepository:
             )
 
             async with db.session() as db_session:
+                new_session.change_seq = await self._next_change_seq(db_session)
+                await db_session.execute(delete(SessionTombstone).where(SessionTombstone.agent_id == agent_id))
                 db_session.add(new_session)
                 await db_session.commit()
                 logger.info(f"✅ 创建会话记录: agent_id={agent_id}, session_id={new_session.session_id}")
-                return True
+
+            await session_cache.set(self._to_schema(new_session))
+            conversation_cache.start(agent_id)
+            return True
 
         except Exception as e:
             logger.error(f"❌ 创建会话失败: {e}")
@@ -98,6 +115,7 @@ class SessionRepository:
                     update_data['options'] = options
 
                 update_data['last_activity'] = datetime.now(timezone.utc)
+                update_data['change_seq'] = await self._next_change_seq(db_session)
 
                 # 执行更新
                 stmt = (
@@ -108,7 +126,9 @@ class SessionRepository:
                 await db_session.execute(stmt)
                 await db_session.commit()
                 logger.info(f"🔄 更新会话记录: agent_id={agent_id}")
-                return True
+
+            await session_cache.invalidate(agent_id)
+            return True
         except Exception as e:
             logger.error(f"❌ 更新会话失败: {e}")
             return False
@@ -124,26 +144,76 @@ class SessionRepository:
             Optional[Dict]: 会话信息
         """
         try:
+            cached = await session_cache.get(agent_id)
+            if cached is not None:
+                return cached
+
             async with db.session() as db_session:
                 stmt = select(Session).where(Session.agent_id == agent_id)
                 result = await db_session.execute(stmt)
                 session_obj = result.scalar_one_or_none()
 
-                if session_obj:
-                    return ASession(
-                        agent_id=session_obj.agent_id,
-                        session_id=session_obj.session_id,
-                        title=session_obj.title,
-                        created_at=session_obj.created_at,
-                        last_activity=session_obj.last_activity,
-                        options=session_obj.options,
-                        message_count=0
-                    )
-                return None
+            if session_obj:
+                session_info = self._to_schema(session_obj)
+                await session_cache.set(session_info)
+                return session_info
+            return None
         except Exception as e:
             logger.error(f"❌ 获取会话信息失败: {e}", exc_info=True)
             return None
 
+    @staticmethod
+    def _to_schema(session_obj: Session) -> ASession:
+        return ASession(
+            agent_id=session_obj.agent_id,
+            session_id=session_obj.session_id,
+            title=session_obj.title,
+            created_at=session_obj.created_at,
+            last_activity=session_obj.last_activity,
+            options=session_obj.options,
+            message_count=0
+        )
+
+    async def get_session_version(self, agent_id: str) -> Optional[Tuple[datetime, int]]:
+        """
+        获取会话的 (last_activity, message_seq)，按主键查询 sessions 表，不读取消息表也不经过缓存
+
+        Args:
+            agent_id: 前端会话ID (主键)
+
+        Returns:
+            Optional[Tuple[datetime, int]]: 会话不存在或查询失败时返回 None
+        """
+        try:
+            async with db.session() as db_session:
+                stmt = select(Session.last_activity, Session.message_seq).where(Session.agent_id == agent_id)
+                row = (await db_session.execute(stmt)).one_or_none()
+                return tuple(row) if row else None
+        except Exception as e:
+            logger.error(f"❌ 获取会话版本失败: {e}")
+            return None
+
+    async def get_sessions_version(self) -> Optional[str]:
+        """
+        获取会话列表的版本摘要，由每个会话的 agent_id、last_activity、message_seq 计算，只读取 sessions 表
+
+        Returns:
+            Optional[str]: 查询失败时返回 None
+        """
+        try:
+            async with db.session() as db_session:
+                stmt = (
+                    select(Session.agent_id, Session.last_activity, Session.message_seq)
+                    .order_by(Session.agent_id)
+                )
+                digest = hashlib.blake2b(digest_size=16)
+                for row in await db_session.execute(stmt):
+                    digest.update(f"{row.agent_id}|{row.last_activity.isoformat()}|{row.message_seq}\n".encode())
+                return digest.hexdigest()
+        except Exception as e:
+            logger.error(f"❌ 获取会话列表版本失败: {e}")
+            return None
+
     async def get_all_sessions(self) -> List[ASession]:
         """
         获取所有会话列表（按最后活动时间降序）
@@ -205,18 +275,65 @@ class SessionRepository:
                 # 删除消息
                 stmt_message = delete(Message).where(Message.agent_id == agent_id)
                 await db_session.execute(stmt_message)
+                await db_session.execute(delete(Round).where(Round.agent_id == agent_id))
+                await db_session.execute(delete(SearchDocument).where(SearchDocument.agent_id == agent_id))
 
                 # 删除会话
                 stmt_session = delete(Session).where(Session.agent_id == agent_id)
-                await db_session.execute(stmt_session)
+                result = await db_session.execute(stmt_session)
+                if result.rowcount:
+                    await self._add_tombstones(db_session, [agent_id])
 
                 await db_session.commit()
                 logger.info(f"🗑️ 删除会话: agent_id={agent_id}")
-                return True
+
+            await session_cache.invalidate(agent_id)
+            conversation_cache.invalidate(agent_id)
+            return True
         except Exception as e:
             logger.error(f"❌ 删除会话失败: {e}")
             return False
 
+    async def delete_inactive_sessions(self, before: datetime) -> int:
+        """
+        删除最后活动时间早于 before 的会话及其所有消息
+
+        Args:
+            before: 截止时间
+
+        Returns:
+            int: 删除的会话数量，-1 表示失败
+        """
+        try:
+            async with db.session() as db_session:
+                inactive = select(Session.agent_id).where(Session.last_activity < before)
+
+                # 删除消息
+                await db_session.execute(delete(Message).where(Message.agent_id.in_(inactive)))
+                await db_session.execute(delete(Round).where(Round.agent_id.in_(inactive)))
+                await db_session.execute(delete(SearchDocument).where(SearchDocument.agent_id.in_(inactive)))
+
+                # 删除会话
+                result = await db_session.execute(
+                    delete(Session).where(Session.last_activity < before).returning(Session.agent_id))
+                deleted_ids = result.scalars().all()
+
+                # 记录删除，并清理早于截止时间的旧删除记录
+                await db_session.execute(delete(SessionTombstone).where(SessionTombstone.deleted_at < before))
+                if deleted_ids:
+                    await self._add_tombstones(db_session, deleted_ids)
+
+                await db_session.commit()
+
+            if deleted_ids:
+                await session_cache.invalidate(*deleted_ids)
+                conversation_cache.invalidate(*deleted_ids)
+                logger.info(f"🗑️ 清理不活跃会话: before={before.isoformat()}, 共{len(deleted_ids)}个会话")
+            return len(deleted_ids)
+        except Exception as e:
+            logger.error(f"❌ 清理不活跃会话失败: {e}")
+            return -1
+
     async def delete_round(self, agent_id: str, round_id: str) -> int:
         """
         删除一轮对话的所有消息（包含用户问题和所有回答）
@@ -239,13 +356,380 @@ class SessionRepository:
                 result = await db_session.execute(stmt)
                 deleted_count = result.rowcount
 
+                await db_session.execute(
+                    delete(Round).where(Round.agent_id == agent_id).where(Round.round_id == round_id))
+                await db_session.execute(
+                    delete(SearchDocument)
+                    .where(SearchDocument.agent_id == agent_id)
+                    .where(SearchDocument.round_id == round_id)
+                )
+
+                message_seq = None
+                if deleted_count:
+                    # 删除无法通过增量返回，游标早于本次删除的客户端需要重新加载
+                    result = await db_session.execute(
+                        update(Session)
+                        .where(Session.agent_id == agent_id)
+                        .values(
+                            message_seq=Session.message_seq + 1,
+                            reset_seq=Session.message_seq + 1,
+                            change_seq=await self._next_change_seq(db_session),
+                        )
+                        .returning(Session.message_seq)
+                    )
+                    message_seq = result.scalar_one_or_none()
+
                 await db_session.commit()
                 logger.info(f"🗑️ 删除轮次: agent_id={agent_id}, round_id={round_id}, 共{deleted_count}条消息")
-                return deleted_count
+
+            if deleted_count:
+                conversation_cache.delete_round(agent_id, round_id, message_seq)
+            return deleted_count
         except Exception as e:
             logger.error(f"❌ 删除轮次失败: {e}")
             return -1
 
+    @staticmethod
+    async def _next_change_seq(db_session) -> int:
+        """在当前事务中取下一个会话变更序号
+
+        单条 INSERT ... ON CONFLICT DO UPDATE ... RETURNING 完成首次创建和自增，
+        首次使用时并发写入不会因主键冲突失败
+        """
+        stmt = sqlite_insert(Sequence).values(name=_SESSION_CHANGES, value=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Sequence.name],
+            set_={"value": Sequence.value + 1},
+        ).returning(Sequence.value)
+        return (await db_session.execute(stmt)).scalar_one()
+
+    async def _add_tombstones(self, db_session, agent_ids: List[str]) -> None:
+        change_seq = await self._next_change_seq(db_session)
+        now = datetime.now(timezone.utc)
+        for agent_id in agent_ids:
+            await db_session.merge(SessionTombstone(agent_id=agent_id, change_seq=change_seq, deleted_at=now))
+
+    async def get_messages_since(
+            self,
+            agent_id: str,
+            since: int,
+            limit: int
+    ) -> Optional[Tuple[List[AMessage], int, bool]]:
+        """
+        获取序号大于 since 的消息（新增或更新），按序号升序
+
+        Args:
+            agent_id: 会话ID
+            since: 客户端游标
+            limit: 最多返回条数
+
+        Returns:
+            Optional[Tuple[List[AMessage], int, bool]]: (消息列表, 会话当前 message_seq, 是否需要重新加载)，
+            会话不存在或查询失败时返回 None
+        """
+        try:
+            async with db.session() as db_session:
+                row = (await db_session.execute(
+                    select(Session.message_seq, Session.reset_seq).where(Session.agent_id == agent_id)
+                )).one_or_none()
+                if row is None:
+                    return None
+                message_seq, reset_seq = row
+                if since < reset_seq or since > message_seq:
+                    return [], message_seq, True
+
+                stmt = (
+                    select(Message)
+                    .where(Message.agent_id == agent_id)
+                    .where(Message.seq > since)
+                    .order_by(Message.seq.asc())
+                    .limit(limit)
+                )
+                messages = (await db_session.execute(stmt)).scalars().all()
+                return [AMessage.model_validate(msg) for msg in messages], message_seq, False
+        except Exception as e:
+            logger.error(f"❌ 获取增量消息失败: {e}")
+            return None
+
+    async def get_sessions_since(
+            self,
+            since: int,
+            limit: int
+    ) -> Optional[Tuple[List[Tuple[int, ASession]], List[Tuple[int, str]]]]:
+        """
+        获取变更序号大于 since 的会话和已删除会话，各自按变更序号升序
+
+        Args:
+            since: 客户端游标
+            limit: 每类最多返回条数
+
+        Returns:
+            Optional[Tuple]: ([(change_seq, 会话)], [(change_seq, 已删除的 agent_id)])，查询失败时返回 None
+        """
+        try:
+            async with db.session() as db_session:
+                message_count = (
+                    select(func.count(Message.message_id))
+                    .where(Message.agent_id == Session.agent_id)
+                    .correlate(Session)
+                    .scalar_subquery()
+                )
+                stmt = (
+                    select(Session, message_count.label("message_count"))
+                    .where(Session.change_seq > since)
+                    .order_by(Session.change_seq.asc())
+                    .limit(limit)
+                )
+                sessions = []
+                for session_obj, count in (await db_session.execute(stmt)).all():
+                    session_info = self._to_schema(session_obj)
+                    session_info.message_count = count
+                    sessions.append((session_obj.change_seq, session_info))
+
+                stmt = (
+                    select(SessionTombstone.change_seq, SessionTombstone.agent_id)
+                    .where(SessionTombstone.change_seq > since)
+                    .order_by(SessionTombstone.change_seq.asc())
+                    .limit(limit)
+                )
+                deleted = [tuple(row) for row in (await db_session.execute(stmt)).all()]
+                return sessions, deleted
+        except Exception as e:
+            logger.error(f"❌ 获取会话变更失败: {e}")
+            return None
+
+    async def get_rounds(
+            self,
+            agent_id: str,
+            limit: Optional[int] = None,
+            before_round_id: Optional[str] = None
+    ) -> List[ARound]:
+        """
+        获取会话的轮次摘要，按开始时间升序，只返回最近的 limit 轮
+
+        Args:
+            agent_id: 会话ID
+            limit: 最多返回的轮次数，None 表示全部
+            before_round_id: 只返回该轮次之前的轮次，用于向前翻页
+
+        Returns:
+            List[ARound]: 轮次摘要列表
+        """
+        try:
+            async with db.session() as db_session:
+                # 用户问题是 message_id 与 round_id 相同的 user 消息，结果是 result 消息
+                is_prompt = (Message.message_type == "user") & (Message.message_id == Message.round_id)
+                stmt = (
+                    select(
+                        Message.round_id,
+                        func.min(Message.timestamp).label("started_at"),
+                        func.max(Message.timestamp).label("finished_at"),
+                        func.count(Message.message_id).label("message_count"),
+                        func.max(case(
+                            (is_prompt, func.substr(Message.message["content"].as_string(), 1, _PREVIEW_LENGTH)),
+                        )).label("preview"),
+                        func.max(case(
+                            (Message.message_type == "result", Message.message["subtype"].as_string()),
+                        )).label("subtype"),
+                    )
+                    .group_by(Message.round_id)
+                    .order_by(func.min(Message.timestamp).asc())
+                )
+                if limit is not None or before_round_id is not None:
+                    # 分页时只按 round_id 索引读取这一页的消息，不扫描会话的全部消息
+                    stmt = stmt.where(Message.round_id.in_(self._round_page(agent_id, limit, before_round_id)))
+                else:
+                    stmt = stmt.where(Message.agent_id == agent_id)
+
+                rows = (await db_session.execute(stmt)).all()
+                return [ARound(agent_id=agent_id, **row._mapping) for row in rows]
+        except Exception as e:
+            logger.error(f"❌ 获取轮次摘要失败: {e}")
+            return []
+
+    async def get_round_messages(self, agent_id: str, round_id: str) -> List[AMessage]:
+        """
+        获取一轮对话的所有消息，按时间升序
+
+        Args:
+            agent_id: 会话ID
+            round_id: 轮次ID
+
+        Returns:
+            List[AMessage]: 消息列表
+        """
+        try:
+            async with db.session() as db_session:
+                stmt = (
+                    select(Message)
+                    .where(Message.round_id == round_id)
+                    .where(Message.agent_id == agent_id)
+                    .order_by(Message.timestamp.asc())
+                )
+                messages = (await db_session.execute(stmt)).scalars().all()
+                return [AMessage.model_validate(msg) for msg in messages]
+        except Exception as e:
+            logger.error(f"❌ 获取轮次消息失败: {e}")
+            return []
+
+    async def start_round(
+            self,
+            agent_id: str,
+            round_id: str,
+            session_id: Optional[str] = None,
+            started_at: Optional[datetime] = None
+    ) -> bool:
+        """
+        记录一轮对话开始，已存在时不修改
+
+        Args:
+            agent_id: 会话ID
+            round_id: 轮次ID
+            session_id: SDK会话ID
+            started_at: 开始时间(UTC)
+
+        Returns:
+            bool: 是否成功
+        """
+        try:
+            async with db.session() as db_session:
+                if await db_session.get(Round, round_id) is None:
+                    db_session.add(Round(
+                        round_id=round_id,
+                        agent_id=agent_id,
+                        session_id=session_id,
+                        started_at=started_at or datetime.now(timezone.utc),
+                    ))
+                    await db_session.commit()
+            return True
+        except Exception as e:
+            logger.error(f"❌ 记录轮次开始失败: {e}")
+            return False
+
+    async def finish_round(self, agent_id: str, round_id: str, **values: Any) -> bool:
+        """
+        记录一轮对话结束，轮次不存在时创建
+
+        Args:
+            agent_id: 会话ID
+            round_id: 轮次ID
+            **values: Round 的字段，如 finished_at、ttft_ms、input_tokens、total_cost_usd、subtype
+
+        Returns:
+            bool: 是否成功
+        """
+        try:
+            async with db.session() as db_session:
+                round_obj = await db_session.get(Round, round_id)
+                if round_obj is None:
+                    round_obj = Round(round_id=round_id, agent_id=agent_id)
+                    db_session.add(round_obj)
+                for key, value in values.items():
+                    if value is not None:
+                        setattr(round_obj, key, value)
+                await db_session.commit()
+            return True
+        except Exception as e:
+            logger.error(f"❌ 记录轮次结束失败: {e}")
+            return False
+
+    async def get_round_usages(self, agent_id: str, limit: Optional[int] = None) -> List[ARoundUsage]:
+        """
+        获取会话每轮的统计，按开始时间倒序
+
+        Args:
+            agent_id: 会话ID
+            limit: 最多返回条数，None 表示全部
+
+        Returns:
+            List[ARoundUsage]: 轮次统计列表
+        """
+        try:
+            async with db.session() as db_session:
+                stmt = select(Round).where(Round.agent_id == agent_id).order_by(Round.started_at.desc())
+                if limit is not None:
+                    stmt = stmt.limit(limit)
+                rounds = (await db_session.execute(stmt)).scalars().all()
+                return [ARoundUsage.model_validate(round_obj) for round_obj in rounds]
+        except Exception as e:
+            logger.error(f"❌ 获取轮次统计失败: {e}")
+            return []
+
+    @staticmethod
+    def _usage_columns():
+        return (
+            func.count(Round.round_id).label("rounds"),
+            func.coalesce(func.sum(Round.input_tokens), 0).label("input_tokens"),
+            func.coalesce(func.sum(Round.output_tokens), 0).label("output_tokens"),
+            func.coalesce(func.sum(Round.cache_creation_input_tokens), 0).label("cache_creation_input_tokens"),
+            func.coalesce(func.sum(Round.cache_read_input_tokens), 0).label("cache_read_input_tokens"),
+            func.coalesce(func.sum(Round.total_cost_usd), 0).label("total_cost_usd"),
+            func.avg(Round.ttft_ms).label("avg_ttft_ms"),
+            func.avg(Round.duration_ms).label("avg_duration_ms"),
+            func.coalesce(func.sum(case((Round.is_error, 1), else_=0)), 0).label("error_count"),
+        )
+
+    async def get_usage(
+            self,
+            group_by: Optional[str] = None,
+            agent_id: Optional[str] = None,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None
+    ) -> List[AUsage]:
+        """
+        汇总轮次用量
+
+        Args:
+            group_by: 分组方式，agent_id / day / model，None 表示不分组
+            agent_id: 只统计该会话
+            start: 开始时间(UTC，包含)
+            end: 结束时间(UTC，不包含)
+
+        Returns:
+            List[AUsage]: 汇总结果，按分组键升序
+        """
+        keys = {
+            "agent_id": Round.agent_id,
+            "day": func.date(Round.started_at),
+            "model": Round.model,
+        }
+        if group_by is not None and group_by not in keys:
+            raise ValueError(f"不支持的分组方式: {group_by}")
+
+        try:
+            async with db.session() as db_session:
+                # 过滤条件都以 started_at 结尾，可以使用 (agent_id, started_at) / (started_at) 索引
+                stmt = select(*self._usage_columns())
+                if agent_id is not None:
+                    stmt = stmt.where(Round.agent_id == agent_id)
+                if start is not None:
+                    stmt = stmt.where(Round.started_at >= start)
+                if end is not None:
+                    stmt = stmt.where(Round.started_at < end)
+                if group_by is not None:
+                    key = keys[group_by]
+                    stmt = stmt.add_columns(key.label("key")).group_by(key).order_by(key.asc())
+
+                rows = (await db_session.execute(stmt)).all()
+                return [AUsage(**row._mapping) for row in rows if row.rounds]
+        except Exception as e:
+            logger.error(f"❌ 汇总用量失败: {e}")
+            return []
+
+    @staticmethod
+    def _round_page(agent_id: str, rounds: Optional[int], before_round_id: Optional[str]):
+        """按轮次开始时间倒序取 before_round_id 之前的 rounds 个 round_id
+
+        读取 rounds 表的 (agent_id, started_at) 索引，代价与页大小成正比，与会话的消息总数无关
+        """
+        stmt = select(Round.round_id).where(Round.agent_id == agent_id).order_by(Round.started_at.desc())
+        if before_round_id is not None:
+            before_started_at = select(Round.started_at).where(Round.round_id == before_round_id).scalar_subquery()
+            stmt = stmt.where(Round.started_at < before_started_at)
+        if rounds is not None:
+            stmt = stmt.limit(rounds)
+        return stmt
+
     async def get_latest_round_id(self, agent_id: str) -> str | None:
         """
         获取指定 agent_id 最新的 round_id
@@ -283,14 +767,29 @@ class SessionRepository:
         """
         try:
             async with db.session() as db_session:
+                # 更新会话最后活动时间，并取得本条消息的序号
+                result = await db_session.execute(
+                    update(Session)
+                    .where(Session.agent_id == message.agent_id)
+                    .values(
+                        last_activity=datetime.now(timezone.utc),
+                        message_seq=Session.message_seq + 1,
+                        change_seq=await self._next_change_seq(db_session),
+                    )
+                    .returning(Session.message_seq)
+                )
+                seq = result.scalar_one_or_none() or 0
+
                 # 检查是否已存在相同 message_id 的记录
                 existing = await db_session.get(Message, message.message_id)
+                data = asdict(message.message)
 
                 if existing:
                     # 更新现有记录（upsert）
-                    existing.message = asdict(message.message)
+                    existing.message = data
                     existing.block_type = message.block_type
                     existing.timestamp = message.timestamp if message.timestamp else datetime.now(timezone.utc)
+                    existing.seq = seq
                     logger.debug(f"📝 更新消息: {message.message_id}")
                 else:
                     # 插入新记录
@@ -301,43 +800,157 @@ class SessionRepository:
                         session_id=message.session_id,
                         message_type=message.message_type,
                         block_type=message.block_type,
-                        message=asdict(message.message),
+                        message=data,
                         parent_id=message.parent_id,
                         timestamp=message.timestamp if message.timestamp else datetime.now(timezone.utc),
+                        seq=seq,
                     )
                     db_session.add(new_message)
+                    # 轮次分页读取 rounds 表，每轮第一条消息写入时登记轮次，已存在时不修改
+                    await db_session.execute(
+                        sqlite_insert(Round)
+                        .values(
+                            round_id=message.round_id,
+                            agent_id=message.agent_id,
+                            session_id=message.session_id,
+                            started_at=new_message.timestamp,
+                        )
+                        .on_conflict_do_nothing(index_elements=[Round.round_id])
+                    )
                     logger.debug(f"💾 保存消息成功: {message.message_id}")
 
-                # 更新会话最后活动时间
-                await db_session.execute(
-                    update(Session)
-                    .where(Session.session_id == message.session_id)
-                    .values(last_activity=datetime.now(timezone.utc))
-                )
-
+                await self._index_message(db_session, message, data, update=existing is not None)
                 await db_session.commit()
-                return True
+
+            message.seq = seq
+            conversation_cache.append(message)
+            return True
         except Exception as e:
             logger.error(f"❌ 保存消息失败: {e}")
             return False
 
-    async def get_session_messages(self, agent_id: str) -> List[AMessage]:
+    @staticmethod
+    async def _index_message(db_session, message: AMessage, data: Dict[str, Any], update: bool) -> None:
+        """写入全文检索文档，同一事务内提交；search_fts 由触发器同步"""
+        content = extract_search_text(message.message_type, data)
+        if not content:
+            if update:
+                await db_session.execute(
+                    delete(SearchDocument).where(SearchDocument.message_id == message.message_id))
+            return
+
+        values = {
+            "content": content,
+            "block_type": message.block_type,
+            "timestamp": message.timestamp or datetime.now(timezone.utc),
+        }
+        await db_session.execute(
+            sqlite_insert(SearchDocument)
+            .values(message_id=message.message_id, agent_id=message.agent_id, round_id=message.round_id, **values)
+            .on_conflict_do_update(index_elements=[SearchDocument.message_id], set_=values)
+        )
+
+    async def search_messages(
+            self,
+            query: str,
+            limit: int = 20,
+            offset: int = 0,
+            agent_id: Optional[str] = None
+    ) -> Optional[Tuple[List[ASearchHit], bool]]:
+        """
+        全文检索会话历史，按相关度排序；只包含少于 3 个字的词时按时间倒序
+
+        Args:
+            query: 检索词，空格分隔的多个词需同时匹配
+            limit: 每页条数
+            offset: 偏移量
+            agent_id: 只检索该会话
+
+        Returns:
+            Optional[Tuple[List[ASearchHit], bool]]: (结果, 是否还有下一页)，查询失败时返回 None
+        """
+        match, like_terms = build_match_query(query)
+        if match is None and not like_terms:
+            return [], False
+
+        params: Dict[str, Any] = {"limit": limit + 1, "offset": offset}
+        clauses = []
+        if match is not None:
+            clauses.append("search_fts MATCH :match")
+            params["match"] = match
+        if agent_id is not None:
+            clauses.append("d.agent_id = :agent_id")
+            params["agent_id"] = agent_id
+        for i, term in enumerate(like_terms):
+            clauses.append(f"d.content LIKE :like_{i} ESCAPE '\\'")
+            params[f"like_{i}"] = like_pattern(term)
+
+        if match is not None:
+            stmt = text(f"""
+                SELECT d.agent_id, d.round_id, d.message_id, d.block_type, d.timestamp, s.title,
+                       snippet(search_fts, 0, :hl_start, :hl_end, '…', 32) AS snippet,
+                       bm25(search_fts) AS score
+                FROM search_fts
+                JOIN search_documents d ON d.id = search_fts.rowid
+                LEFT JOIN sessions s ON s.agent_id = d.agent_id
+                WHERE {" AND ".join(clauses)}
+                ORDER BY search_fts.rank
+                LIMIT :limit OFFSET :offset
+            """)
+            params.update(hl_start=HIGHLIGHT_START, hl_end=HIGHLIGHT_END)
+        else:
+            stmt = text(f"""
+                SELECT d.agent_id, d.round_id, d.message_id, d.block_type, d.timestamp, s.title,
+                       d.content AS snippet, NULL AS score
+                FROM search_documents d
+                LEFT JOIN sessions s ON s.agent_id = d.agent_id
+                WHERE {" AND ".join(clauses)}
+                ORDER BY d.id DESC
+                LIMIT :limit OFFSET :offset
+            """)
+
+        try:
+            async with db.session() as db_session:
+                rows = (await db_session.execute(
+                    stmt.columns(timestamp=SearchDocument.timestamp.type), params)).all()
+        except Exception as e:
+            logger.error(f"❌ 全文检索失败: {e}")
+            return None
+
+        hits = []
+        for row in rows[:limit]:
+            hit = dict(row._mapping)
+            if match is not None:
+                hit["snippet"] = render_snippet(hit["snippet"] or "")
+            else:
+                hit["snippet"] = make_snippet(hit["snippet"], like_terms)
+            hits.append(ASearchHit(**hit))
+        return hits, len(rows) > limit
+
+    async def get_session_messages(
+            self,
+            agent_id: str,
+            rounds: Optional[int] = None,
+            before_round_id: Optional[str] = None
+    ) -> List[AMessage]:
         """
-        获取会话的所有历史消息
+        获取会话的历史消息，轮次按第一条消息的时间排序
 
         Args:
             agent_id: SDK会话ID
+            rounds: 只返回最近的 rounds 轮，None 表示全部
+            before_round_id: 只返回该轮次之前的轮次，用于向前翻页
 
         Returns:
             List[Dict]: 消息列表
         """
         try:
             async with db.session() as db_session:
-                stmt = (
-                    select(Message)
-                    .where(Message.agent_id == agent_id)
-                    .order_by(Message.timestamp.asc())
-                )
+                stmt = select(Message).order_by(Message.timestamp.asc())
+                if rounds is not None or before_round_id is not None:
+                    stmt = stmt.where(Message.round_id.in_(self._round_page(agent_id, rounds, before_round_id)))
+                else:
+                    stmt = stmt.where(Message.agent_id == agent_id)
                 result = await db_session.execute(stmt)
                 messages = result.scalars().all()
 
@@ -10,6 +10,7 @@
 
 import asyncio
 import uuid
+from datetime import datetime, timezone
 from typing import Any, Dict
 
 from claude_agent_sdk.types import ResultMessage
@@ -126,6 +127,14 @@ class InterruptHandler(BaseHandler):
         )
 
         await session_store.save_message(result_message)
+        await session_store.finish_round(
+            agent_id=agent_id,
+            round_id=round_id,
+            session_id=session_id,
+            finished_at=datetime.now(timezone.utc),
+            subtype="interrupted",
+            is_error=True,
+        )
         logger.info(f"💾保存中断消息: agent_id={agent_id}, round_id={round_id}")
 
         await self.send(result_message)
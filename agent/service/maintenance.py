@@ -0,0 +1,77 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：maintenance
+# @Date   ：2026/10/19 19:50
+# @Author ：leemysw
+
+# 2026/10/19 19:50   Create
+# 维护任务注册
+# =====================================================
+
+import os
+from datetime import datetime, timedelta, timezone
+
+from agent.core.config import settings
+from agent.service.db.analytics import analytics_engine
+from agent.service.db.session_repository import session_repository
+from agent.shared.cacher.file_cache import get_cache_instance
+from agent.shared.cacher.file_store import get_temp_file_manager
+from agent.shared.server.common.base_scheduler import MaintenanceScheduler
+from agent.utils.logger import logger
+from agent.utils.utils import cache_path
+
+
+def _namespaces(kind: str):
+    """按目录枚举命名空间，包括当前进程未使用过的命名空间"""
+    root = cache_path(settings.CACHE_FILE_DIR, kind)
+    if not os.path.isdir(root):
+        return []
+    return sorted(entry.name for entry in os.scandir(root) if entry.is_dir())
+
+
+def sweep_file_caches() -> None:
+    """清理所有 FileCache 命名空间中到期的缓存文件，每个命名空间按批次清理直到没有到期文件"""
+    batch = settings.FILE_CACHE_CLEANUP_BATCH
+    for namespace in _namespaces("namespace"):
+        cache = get_cache_instance(namespace)
+        cleaned = 0
+        while True:
+            count = cache.cleanup_expired(limit=batch)
+            cleaned += count
+            if count < batch:
+                break
+        if cleaned:
+            logger.info(f"【Maintenance】FileCache:{namespace} 清理了 {cleaned} 个到期缓存文件")
+
+
+def sweep_temp_files() -> None:
+    """清理所有 TempFile 命名空间中过期的临时文件"""
+    for namespace in _namespaces("temp"):
+        get_temp_file_manager(namespace).cleanup_expired()
+
+
+async def purge_inactive_sessions() -> None:
+    """删除超过保留天数未活动的会话"""
+    before = datetime.now(timezone.utc) - timedelta(days=settings.SESSION_RETENTION_DAYS)
+    await session_repository.delete_inactive_sessions(before)
+
+
+def register_maintenance_jobs(scheduler: MaintenanceScheduler) -> None:
+    """注册内置维护任务，重复调用时跳过已注册的任务
+
+    MAINTENANCE_ENABLED 开启时 FileCache / TempFile 默认不在请求中清理，由这里注册的任务定期执行。
+    """
+    jobs = [
+        ("file_cache_sweep", sweep_file_caches, settings.CACHE_SWEEP_INTERVAL),
+        ("temp_file_sweep", sweep_temp_files, settings.TEMP_FILE_SWEEP_INTERVAL),
+    ]
+    if settings.SESSION_RETENTION_DAYS > 0:
+        jobs.append(("session_retention", purge_inactive_sessions, settings.SESSION_RETENTION_INTERVAL))
+    if settings.ANALYTICS_SNAPSHOT_INTERVAL > 0 and analytics_engine.available:
+        jobs.append(("analytics_snapshot", analytics_engine.snapshot, settings.ANALYTICS_SNAPSHOT_INTERVAL))
+
+    for name, func, interval in jobs:
+        if not scheduler.has_job(name):
+            scheduler.add_job(name, func, interval=interval)
+    logger.debug("【Maintenance】已注册内置维护任务")
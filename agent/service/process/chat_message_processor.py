@@ -9,9 +9,11 @@
 # =====================================================
 
 import uuid
+from datetime import datetime, timezone
 from typing import Optional
 
-from claude_agent_sdk import Message, ResultMessage, SystemMessage, UserMessage
+from claude_agent_sdk import AssistantMessage, Message, ResultMessage, SystemMessage, UserMessage
+from claude_agent_sdk.types import StreamEvent
 
 from agent.service.process.sdk_message_processor import sdk_message_processor
 from agent.service.schema.model_message import AMessage
@@ -38,6 +40,11 @@ class ChatMessageProcessor:
         self.is_save_user_message: bool = False
         self.stream_message_id: Optional[str] = None
 
+        # 轮次统计，查询发送后创建处理器，以此作为开始时间
+        self.started_at: datetime = datetime.now(timezone.utc)
+        self.first_token_at: Optional[datetime] = None
+        self.model: Optional[str] = None
+
     async def process_messages(self, response_msg: Message) -> list[AMessage]:
         """
         处理响应消息，管理消息状态
@@ -54,6 +61,7 @@ class ChatMessageProcessor:
 
         # 获取session_id并建立映射关系，保存用户消息（如果是第一次）
         self.set_subtype(response_msg)
+        self.update_round_state(response_msg)
         await self.set_session_id(response_msg)
         await self.save_user_message(self.query)
 
@@ -84,6 +92,9 @@ class ChatMessageProcessor:
             processed_messages.append(a_message)
             self.message_count += 1
 
+        if isinstance(response_msg, ResultMessage):
+            await self.save_round(response_msg)
+
         return processed_messages
 
     async def set_session_id(self, response_msg: Message) -> Optional[str]:
@@ -122,6 +133,54 @@ class ChatMessageProcessor:
             else:
                 self.subtype = "error"
 
+    def update_round_state(self, response_msg: Message) -> None:
+        """
+        记录首个响应时间和模型
+
+        Args:
+            response_msg: 从SDK接收的原始响应消息
+        """
+        if self.first_token_at is None and isinstance(response_msg, (AssistantMessage, StreamEvent)):
+            if not isinstance(response_msg, StreamEvent) or response_msg.event.get("type") == "content_block_delta":
+                self.first_token_at = datetime.now(timezone.utc)
+
+        if self.model is None and isinstance(response_msg, AssistantMessage):
+            self.model = response_msg.model
+
+    async def save_round(self, result: ResultMessage) -> None:
+        """
+        保存本轮的耗时、token 用量和费用
+
+        Args:
+            result: 本轮的结果消息
+        """
+        usage = result.usage or {}
+        model = self.model
+        if model is None and getattr(result, "model_usage", None):
+            model = next(iter(result.model_usage))
+        ttft_ms = None
+        if self.first_token_at is not None:
+            ttft_ms = int((self.first_token_at - self.started_at).total_seconds() * 1000)
+
+        await session_store.finish_round(
+            agent_id=self.agent_id,
+            round_id=self.round_id,
+            session_id=self.session_id,
+            model=model,
+            finished_at=datetime.now(timezone.utc),
+            ttft_ms=ttft_ms,
+            duration_ms=result.duration_ms,
+            duration_api_ms=result.duration_api_ms,
+            num_turns=result.num_turns,
+            input_tokens=usage.get("input_tokens") or 0,
+            output_tokens=usage.get("output_tokens") or 0,
+            cache_creation_input_tokens=usage.get("cache_creation_input_tokens") or 0,
+            cache_read_input_tokens=usage.get("cache_read_input_tokens") or 0,
+            total_cost_usd=result.total_cost_usd or 0,
+            subtype=result.subtype,
+            is_error=result.is_error,
+        )
+
     def update_stream_state(self, a_message: AMessage) -> None:
         """
         更新流式处理状态
@@ -179,5 +238,11 @@ class ChatMessageProcessor:
             )
 
             await session_store.save_message(user_message)
+            await session_store.start_round(
+                agent_id=self.agent_id,
+                round_id=self.round_id,
+                session_id=self.session_id,
+                started_at=self.started_at,
+            )
 
             self.is_save_user_message = True
@@ -35,10 +35,73 @@ class AMessage(BaseModel):
     block_type: Optional[str] = Field(default=None, description="消息块类型, text、thinking、tool_result、tool_use")
     parent_id: Optional[str] = Field(default=None, description="父消息ID")
     timestamp: Optional[datetime] = Field(default_factory=datetime.now, description="时间戳")
+    seq: Optional[int] = Field(default=None, description="会话内写入序号，用作增量同步游标")
 
     model_config = {"from_attributes": True}
 
 
+class ARound(BaseModel):
+    """轮次摘要"""
+    agent_id: str = Field(..., description="客户端会话ID")
+    round_id: str = Field(..., description="轮次ID")
+    preview: Optional[str] = Field(default=None, description="用户问题预览")
+    started_at: Optional[datetime] = Field(default=None, description="第一条消息时间")
+    finished_at: Optional[datetime] = Field(default=None, description="最后一条消息时间")
+    message_count: int = Field(0, description="消息数量")
+    subtype: Optional[str] = Field(default=None, description="结果消息子类型，success / error_* ，未结束时为空")
+
+    model_config = {"from_attributes": True}
+
+
+class ARoundUsage(BaseModel):
+    """轮次统计"""
+    round_id: str = Field(..., description="轮次ID")
+    agent_id: str = Field(..., description="客户端会话ID")
+    session_id: Optional[str] = Field(default=None, description="SDK会话ID")
+    model: Optional[str] = Field(default=None, description="模型")
+    started_at: Optional[datetime] = Field(default=None, description="开始时间(UTC)")
+    finished_at: Optional[datetime] = Field(default=None, description="结束时间(UTC)")
+    ttft_ms: Optional[int] = Field(default=None, description="首个响应耗时(毫秒)")
+    duration_ms: Optional[int] = Field(default=None, description="总耗时(毫秒)")
+    duration_api_ms: Optional[int] = Field(default=None, description="API 耗时(毫秒)")
+    num_turns: Optional[int] = Field(default=None, description="模型调用轮数")
+    input_tokens: int = Field(0, description="输入 token")
+    output_tokens: int = Field(0, description="输出 token")
+    cache_creation_input_tokens: int = Field(0, description="写入缓存的输入 token")
+    cache_read_input_tokens: int = Field(0, description="命中缓存的输入 token")
+    total_cost_usd: float = Field(0, description="费用(美元)")
+    subtype: Optional[str] = Field(default=None, description="结果子类型，success / error_* / interrupted，未结束时为空")
+    is_error: bool = Field(False, description="是否出错")
+
+    model_config = {"from_attributes": True, "protected_namespaces": ()}
+
+
+class AUsage(BaseModel):
+    """按会话、日期或模型汇总的用量"""
+    key: Optional[str] = Field(default=None, description="分组键：会话ID、日期(UTC, YYYY-MM-DD)或模型")
+    rounds: int = Field(0, description="轮次数")
+    input_tokens: int = Field(0, description="输入 token")
+    output_tokens: int = Field(0, description="输出 token")
+    cache_creation_input_tokens: int = Field(0, description="写入缓存的输入 token")
+    cache_read_input_tokens: int = Field(0, description="命中缓存的输入 token")
+    total_cost_usd: float = Field(0, description="费用(美元)")
+    avg_ttft_ms: Optional[float] = Field(default=None, description="平均首个响应耗时(毫秒)")
+    avg_duration_ms: Optional[float] = Field(default=None, description="平均总耗时(毫秒)")
+    error_count: int = Field(0, description="出错或中断的轮次数")
+
+
+class ASearchHit(BaseModel):
+    """全文检索结果"""
+    agent_id: str = Field(..., description="客户端会话ID")
+    round_id: str = Field(..., description="轮次ID")
+    message_id: str = Field(..., description="消息ID")
+    block_type: Optional[str] = Field(default=None, description="消息块类型")
+    title: Optional[str] = Field(default=None, description="会话标题")
+    snippet: str = Field(..., description="匹配片段，已转义 HTML，匹配词用 <mark> 标出")
+    timestamp: Optional[datetime] = Field(default=None, description="消息时间")
+    score: Optional[float] = Field(default=None, description="bm25 相关度，越小越相关；短词 LIKE 匹配时为空")
+
+
 class AEvent(BaseModel):
     event_type: str = Field(..., description="事件类型")
     agent_id: str = Field(..., description="客户端会话ID")
@@ -8,10 +8,12 @@
 # 2025/11/28 22:29   Create
 # =====================================================
 
-from typing import Dict, List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
+from agent.service.db.conversation_cache import conversation_cache, serialize_message
 from agent.service.db.session_repository import session_repository
-from agent.service.schema.model_message import AMessage
+from agent.service.schema.model_message import AMessage, ARound, ARoundUsage, ASearchHit, AUsage
 from agent.service.schema.model_session import ASession
 from agent.utils.logger import logger
 
@@ -65,6 +67,223 @@ class MessageHistoryStore:
             logger.error(f"❌ 获取历史消息失败: {e}")
             return []
 
+    async def get_serialized_messages(
+            self,
+            agent_id: str,
+            rounds: Optional[int] = None,
+            before_round_id: Optional[str] = None,
+            message_seq: Optional[int] = None
+    ) -> List[bytes]:
+        """
+        获取已序列化为 JSON 的历史消息，优先读取最近轮次缓存，缓存无法覆盖时查询数据库并回填
+
+        Args:
+            agent_id: 客户端会话ID
+            rounds: 只返回最近的 rounds 轮，None 表示全部
+            before_round_id: 只返回该轮次之前的轮次
+            message_seq: 数据库中会话当前的 message_seq，缓存版本一致时才使用缓存，None 时直接查询数据库
+
+        Returns:
+            List[bytes]: 按时间升序的消息 JSON
+        """
+        cached = conversation_cache.get(agent_id, message_seq, rounds=rounds, before_round_id=before_round_id)
+        if cached is not None:
+            logger.debug(f"📥 从缓存加载历史消息: {agent_id}, 共{len(cached)}条")
+            return cached
+
+        stamp = conversation_cache.stamp()
+        try:
+            messages = await session_repository.get_session_messages(
+                agent_id, rounds=rounds, before_round_id=before_round_id)
+        except Exception as e:
+            logger.error(f"❌ 获取历史消息失败: {e}")
+            return []
+
+        rows = [(message.round_id, message.message_id, serialize_message(message)) for message in messages]
+        # 只有最新的若干轮可以回填；空结果可能是查询失败，不回填；版本未知时回填的内容无法校验
+        if rows and before_round_id is None and message_seq is not None:
+            complete = rounds is None or len({row[0] for row in rows}) < rounds
+            conversation_cache.seed(agent_id, rows, complete=complete, stamp=stamp, message_seq=message_seq)
+        return [row[2] for row in rows]
+
+    async def get_rounds(
+            self,
+            agent_id: str,
+            limit: Optional[int] = None,
+            before_round_id: Optional[str] = None
+    ) -> List[ARound]:
+        """
+        获取会话的轮次摘要
+
+        Args:
+            agent_id: 客户端会话ID
+            limit: 最多返回的轮次数，None 表示全部
+            before_round_id: 只返回该轮次之前的轮次
+
+        Returns:
+            List[ARound]: 按开始时间升序的轮次摘要
+        """
+        return await session_repository.get_rounds(agent_id, limit=limit, before_round_id=before_round_id)
+
+    async def get_serialized_round(self, agent_id: str, round_id: str,
+                                   message_seq: Optional[int] = None) -> List[bytes]:
+        """
+        获取一轮对话已序列化的消息，优先读取最近轮次缓存
+
+        Args:
+            agent_id: 客户端会话ID
+            round_id: 轮次ID
+            message_seq: 数据库中会话当前的 message_seq，缓存版本一致时才使用缓存，None 时直接查询数据库
+
+        Returns:
+            List[bytes]: 按时间升序的消息 JSON
+        """
+        cached = conversation_cache.get_round(agent_id, round_id, message_seq)
+        if cached is not None:
+            return cached
+        messages = await session_repository.get_round_messages(agent_id, round_id)
+        return [serialize_message(message) for message in messages]
+
+    async def get_messages_since(self, agent_id: str, since: int, limit: int) -> Optional[Dict[str, Any]]:
+        """
+        获取游标之后新增或更新的消息
+
+        Args:
+            agent_id: 客户端会话ID
+            since: 客户端游标，即已收到消息的最大 seq
+            limit: 最多返回条数
+
+        Returns:
+            Optional[Dict]: {"cursor", "reset", "has_more", "messages": List[bytes]}，会话不存在时返回 None；
+            reset 为 True 时游标已失效（期间删除过轮次），客户端应重新加载全部消息
+        """
+        result = await session_repository.get_messages_since(agent_id, since, limit)
+        if result is None:
+            return None
+        messages, message_seq, reset = result
+        has_more = len(messages) >= limit
+        return {
+            "cursor": messages[-1].seq if has_more else message_seq,
+            "reset": reset,
+            "has_more": has_more,
+            "messages": [serialize_message(message) for message in messages],
+        }
+
+    async def get_session_changes(self, since: int, limit: int) -> Optional[Dict[str, Any]]:
+        """
+        获取游标之后创建、修改、写入过消息或被删除的会话
+
+        Args:
+            since: 客户端游标
+            limit: 每类最多查询条数
+
+        Returns:
+            Optional[Dict]: {"cursor", "has_more", "sessions", "deleted"}，查询失败时返回 None
+        """
+        result = await session_repository.get_sessions_since(since, limit)
+        if result is None:
+            return None
+        sessions, deleted = result
+
+        # 任一类达到 limit 时，只能返回不超过其最后一条序号的变更，否则游标会跳过另一类中未取到的记录
+        cutoff = min([rows[-1][0] for rows in (sessions, deleted) if len(rows) >= limit], default=None)
+        if cutoff is not None:
+            sessions = [row for row in sessions if row[0] <= cutoff]
+            deleted = [row for row in deleted if row[0] <= cutoff]
+        cursor = max([row[0] for row in sessions[-1:] + deleted[-1:]], default=since)
+
+        return {
+            "cursor": cursor,
+            "has_more": cutoff is not None,
+            "sessions": [session.model_dump() for _, session in sessions],
+            "deleted": [agent_id for _, agent_id in deleted],
+        }
+
+    async def search_messages(
+            self,
+            query: str,
+            limit: int = 20,
+            offset: int = 0,
+            agent_id: Optional[str] = None
+    ) -> Optional[Tuple[List[ASearchHit], bool]]:
+        """
+        全文检索会话历史
+
+        Args:
+            query: 检索词，空格分隔的多个词需同时匹配
+            limit: 每页条数
+            offset: 偏移量
+            agent_id: 只检索该会话
+
+        Returns:
+            Optional[Tuple[List[ASearchHit], bool]]: (结果, 是否还有下一页)，查询失败时返回 None
+        """
+        return await session_repository.search_messages(query, limit=limit, offset=offset, agent_id=agent_id)
+
+    async def start_round(self, agent_id: str, round_id: str, session_id: Optional[str],
+                          started_at: Optional[datetime] = None) -> bool:
+        """
+        记录一轮对话开始
+
+        Args:
+            agent_id: 客户端会话ID
+            round_id: 轮次ID
+            session_id: SDK会话ID
+            started_at: 开始时间(UTC)
+
+        Returns:
+            bool: 是否成功
+        """
+        return await session_repository.start_round(agent_id, round_id, session_id=session_id, started_at=started_at)
+
+    async def finish_round(self, agent_id: str, round_id: str, **values: Any) -> bool:
+        """
+        记录一轮对话的结束时间、耗时、token 用量和费用
+
+        Args:
+            agent_id: 客户端会话ID
+            round_id: 轮次ID
+            **values: 轮次统计字段，值为 None 的字段不更新
+
+        Returns:
+            bool: 是否成功
+        """
+        return await session_repository.finish_round(agent_id, round_id, **values)
+
+    async def get_round_usages(self, agent_id: str, limit: Optional[int] = None) -> List[ARoundUsage]:
+        """
+        获取会话每轮的统计，按开始时间倒序
+
+        Args:
+            agent_id: 客户端会话ID
+            limit: 最多返回条数，None 表示全部
+
+        Returns:
+            List[ARoundUsage]: 轮次统计列表
+        """
+        return await session_repository.get_round_usages(agent_id, limit=limit)
+
+    async def get_usage(
+            self,
+            group_by: Optional[str] = None,
+            agent_id: Optional[str] = None,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None
+    ) -> List[AUsage]:
+        """
+        汇总轮次用量
+
+        Args:
+            group_by: 分组方式，agent_id / day / model，None 表示不分组
+            agent_id: 只统计该会话
+            start: 开始时间(UTC，包含)
+            end: 结束时间(UTC，不包含)
+
+        Returns:
+            List[AUsage]: 汇总结果
+        """
+        return await session_repository.get_usage(group_by=group_by, agent_id=agent_id, start=start, end=end)
+
     async def update_session(
             self,
             agent_id: str,
@@ -128,6 +347,27 @@ class MessageHistoryStore:
             logger.error(f"❌ 获取会话信息失败: {e}")
             return None
 
+    async def get_session_version(self, agent_id: str) -> Optional[Tuple[datetime, int]]:
+        """
+        获取会话的 (last_activity, message_seq)，用于生成 ETag
+
+        Args:
+            agent_id: 客户端会话ID
+
+        Returns:
+            Optional[Tuple[datetime, int]]: 会话不存在时返回 None
+        """
+        return await session_repository.get_session_version(agent_id)
+
+    async def get_sessions_version(self) -> Optional[str]:
+        """
+        获取会话列表的版本摘要，用于生成 ETag
+
+        Returns:
+            Optional[str]: 查询失败时返回 None
+        """
+        return await session_repository.get_sessions_version()
+
     async def get_all_sessions(self) -> List[ASession]:
         """
         获取所有会话列表（按最后活动时间降序）
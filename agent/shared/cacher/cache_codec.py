@@ -0,0 +1,56 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：cache_codec
+# @Date   ：2026/10/19 18:05
+# @Author ：leemysw
+
+# 2026/10/19 18:05   Create
+# =====================================================
+
+"""FileCache 的二进制缓存文件格式
+
+文件布局::
+
+    | magic(4) | version(1) | pad(3) | expires_at(f64) | created_at(f64) | payload |
+
+expires_at 为 Unix 时间戳，0 表示不过期；payload 为 orjson 编码的值。
+读取时先解析定长文件头判断是否过期，过期条目不需要解析 payload。
+"""
+
+import struct
+from typing import Any, Optional, Tuple
+
+import orjson
+
+MAGIC = b"AKC\x00"
+VERSION = 1
+HEADER = struct.Struct("<4sB3xdd")
+HEADER_SIZE = HEADER.size
+
+_DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def encode_payload(value: Any) -> bytes:
+    """编码缓存值，值无法序列化时抛出 TypeError (orjson.JSONEncodeError)"""
+    return orjson.dumps(value, option=_DUMPS_OPTIONS)
+
+
+def encode_entry(value: Any, expires_at: Optional[float], created_at: float) -> bytes:
+    """编码缓存条目，值无法序列化时抛出 TypeError (orjson.JSONEncodeError)"""
+    return HEADER.pack(MAGIC, VERSION, expires_at or 0.0, created_at) + encode_payload(value)
+
+
+def decode_header(head: bytes) -> Optional[Tuple[Optional[float], float]]:
+    """解析文件头，返回 (expires_at, created_at)；不是二进制格式（如旧版 JSON 文件）时返回 None"""
+    if len(head) < HEADER_SIZE or head[:4] != MAGIC:
+        return None
+    _, version, expires_at, created_at = HEADER.unpack_from(head)
+    if version != VERSION:
+        return None
+    return (expires_at or None), created_at
+
+
+def decode_payload(payload) -> Any:
+    """解码 payload，支持 bytes / memoryview（mmap 读取时避免拷贝）"""
+    return orjson.loads(payload)
@@ -0,0 +1,193 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：cache_index
+# @Date   ：2026/10/19 17:10
+# @Author ：leemysw
+
+# 2026/10/19 17:10   Create
+# =====================================================
+
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from agent.utils.logger import logger
+
+EVICTION_POLICIES = ("lru", "lfu")
+
+_VICTIM_ORDER = {
+    "lru": "last_access",
+    "lfu": "hits, last_access",
+}
+
+
+class CacheIndex:
+    """FileCache 的 SQLite 索引。
+
+    每个缓存文件一行，sweep_at 为该文件应被清理的时间
+    （min(过期时间, 最后写入时间 + 清理周期)），清理时按 sweep_at 走索引，
+    只读取真正到期的条目，不需要遍历目录。
+    last_access / hits 记录访问信息，用于容量超限时按 LRU / LFU 淘汰；
+    totals 表由触发器维护条目数和总字节数，检查配额时不需要全表聚合。
+    多个 worker 进程共享同一个索引文件，依赖 WAL 和 busy timeout 处理并发。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.open()
+
+    def open(self) -> None:
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"【CacheIndex】设置 WAL 模式失败: {self.db_path}, Error: {e}")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key_hash TEXT PRIMARY KEY,"
+            " path TEXT NOT NULL,"
+            " size INTEGER NOT NULL DEFAULT 0,"
+            " expires_at REAL,"
+            " sweep_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " last_access REAL NOT NULL DEFAULT 0,"
+            " hits INTEGER NOT NULL DEFAULT 0"
+            ")"
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+        if "last_access" not in columns:
+            # 早期索引没有访问信息，补列后以写入时间作为最近访问时间
+            conn.execute("ALTER TABLE entries ADD COLUMN last_access REAL NOT NULL DEFAULT 0")
+            conn.execute("ALTER TABLE entries ADD COLUMN hits INTEGER NOT NULL DEFAULT 0")
+            conn.execute("UPDATE entries SET last_access = updated_at")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_sweep_at ON entries (sweep_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_last_access ON entries (last_access)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_hits ON entries (hits, last_access)")
+
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS totals ("
+            " id INTEGER PRIMARY KEY CHECK (id = 0),"
+            " entries INTEGER NOT NULL,"
+            " bytes INTEGER NOT NULL,"
+            " evictions INTEGER NOT NULL DEFAULT 0"
+            ")"
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO totals (id, entries, bytes)"
+            " SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        )
+        conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS tr_entries_insert AFTER INSERT ON entries BEGIN"
+            " UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 0; END"
+        )
+        conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS tr_entries_delete AFTER DELETE ON entries BEGIN"
+            " UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 0; END"
+        )
+        conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS tr_entries_update AFTER UPDATE OF size ON entries BEGIN"
+            " UPDATE totals SET bytes = bytes - OLD.size + NEW.size WHERE id = 0; END"
+        )
+        self._conn = conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # 覆盖写入时保留 hits，last_access 更新为写入时间
+    _UPSERT_SQL = (
+        "INSERT INTO entries (key_hash, path, size, expires_at, sweep_at, updated_at, last_access)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)"
+        " ON CONFLICT(key_hash) DO UPDATE SET path=excluded.path, size=excluded.size,"
+        " expires_at=excluded.expires_at, sweep_at=excluded.sweep_at, updated_at=excluded.updated_at,"
+        " last_access=excluded.last_access"
+    )
+
+    def upsert(self, key_hash: str, path: str, size: int, expires_at: Optional[float],
+               sweep_at: float, updated_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                self._UPSERT_SQL, (key_hash, path, size, expires_at, sweep_at, updated_at, updated_at))
+
+    def upsert_many(self, rows: Iterable[Tuple[str, str, int, Optional[float], float, float]]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(self._UPSERT_SQL, (row + (row[5],) for row in rows))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def touch_many(self, accesses: Dict[str, Tuple[float, int]]) -> None:
+        """批量记录访问：key_hash -> (最近访问时间, 访问次数增量)"""
+        if not accesses:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "UPDATE entries SET last_access = MAX(last_access, ?), hits = hits + ? WHERE key_hash = ?",
+                    [(last_access, hits, key_hash) for key_hash, (last_access, hits) in accesses.items()],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, key_hash: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key_hash = ?", (key_hash,))
+
+    def delete_many(self, key_hashes: List[str]) -> None:
+        if not key_hashes:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM entries WHERE key_hash = ?", [(k,) for k in key_hashes])
+
+    def clear(self) -> None:
+        """删除全部条目，累计淘汰数保留"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM entries")
+                self._conn.execute("UPDATE totals SET entries = 0, bytes = 0 WHERE id = 0")
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def due(self, now: float, limit: int) -> List[Tuple[str, str]]:
+        """返回最多 limit 个已到清理时间的 (key_hash, path)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT key_hash, path FROM entries WHERE sweep_at <= ? ORDER BY sweep_at LIMIT ?",
+                (now, limit),
+            ).fetchall()
+
+    def victims(self, policy: str, limit: int, exclude: Optional[str] = None) -> List[Tuple[str, str, int]]:
+        """按淘汰策略返回最多 limit 个候选 (key_hash, path, size)，exclude 为刚写入的条目"""
+        order = _VICTIM_ORDER[policy]
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT key_hash, path, size FROM entries WHERE key_hash != ? ORDER BY {order} LIMIT ?",
+                (exclude or "", limit),
+            ).fetchall()
+
+    def add_evictions(self, count: int) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE totals SET evictions = evictions + ? WHERE id = 0", (count,))
+
+    def totals(self) -> Tuple[int, int, int]:
+        """返回 (条目数, 总字节数, 累计淘汰数)"""
+        with self._lock:
+            return self._conn.execute("SELECT entries, bytes, evictions FROM totals WHERE id = 0").fetchone()
+
+    def count(self) -> int:
+        return self.totals()[0]
@@ -0,0 +1,410 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：decorators
+# @Date   ：2026/10/19 20:50
+# @Author ：leemysw
+
+# 2026/10/19 20:50   Create
+# 缓存装饰器
+# =====================================================
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Set, Union
+
+import orjson
+from pydantic import BaseModel
+
+from agent.shared.cacher.file_cache import FileCache
+from agent.shared.cacher.io_executor import get_cache_io_executor, run_in_cache_io
+from agent.shared.cacher.memory_cache import LRUCache
+from agent.shared.cacher.redis_cache import AsyncRedisCache, RedisCache
+from agent.utils.logger import logger
+from agent.utils.metrics import registry
+
+CACHED_CALLS = registry.counter(
+    "cached_calls_total", "Calls to @cached functions by result", ("func", "result"))
+
+# 缓存条目结构：{"v": 值, "t": 写入时间戳}，写入时间用于判断是否过了新鲜期
+_VALUE, _STORED_AT = "v", "t"
+
+
+class CacheBackend(ABC):
+    """@cached 的存储后端，异步函数使用 aget/aset/adelete，同步函数使用 get/set/delete"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, entry: dict, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    async def aget(self, key: str) -> Optional[dict]:
+        return self.get(key)
+
+    async def aset(self, key: str, entry: dict, ttl: float) -> None:
+        self.set(key, entry, ttl)
+
+    async def adelete(self, key: str) -> None:
+        self.delete(key)
+
+
+class MemoryBackend(CacheBackend):
+    """进程内 LRU 后端，缓存对象引用，调用方不应修改返回值"""
+
+    def __init__(self, max_entries: int = 1024):
+        self._cache = LRUCache(max_entries=max_entries)
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._cache.get(key)
+
+    def set(self, key: str, entry: dict, ttl: float) -> None:
+        self._cache.set(key, entry, ttl=ttl)
+
+    def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+
+class FileCacheBackend(CacheBackend):
+    """FileCache 后端，值需要可 JSON 序列化"""
+
+    def __init__(self, cache: Union[FileCache, str]):
+        if isinstance(cache, str):
+            from agent.shared.cacher.file_cache import get_cache_instance
+            cache = get_cache_instance(cache)
+        self._cache = cache
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._cache.get(key)
+
+    def set(self, key: str, entry: dict, ttl: float) -> None:
+        self._cache.set(key, entry, ttl=timedelta(seconds=ttl))
+
+    def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    async def aget(self, key: str) -> Optional[dict]:
+        return await self._cache.aget(key)
+
+    async def aset(self, key: str, entry: dict, ttl: float) -> None:
+        await self._cache.aset(key, entry, ttl=timedelta(seconds=ttl))
+
+    async def adelete(self, key: str) -> None:
+        await self._cache.adelete(key)
+
+
+class RedisBackend(CacheBackend):
+    """Redis 后端，值需要可 JSON 序列化。
+
+    同步函数需要 RedisCache；异步函数优先使用 AsyncRedisCache，传入 RedisCache 时在缓存 I/O 线程池中执行。
+    """
+
+    def __init__(self, cache: Union[RedisCache, AsyncRedisCache]):
+        self._cache = cache
+        self._async = isinstance(cache, AsyncRedisCache)
+
+    def _sync_cache(self) -> RedisCache:
+        if self._async:
+            raise TypeError("RedisBackend with AsyncRedisCache can only cache async functions")
+        return self._cache
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._sync_cache().get_json(key)
+
+    def set(self, key: str, entry: dict, ttl: float) -> None:
+        self._sync_cache().set_json(key, entry, ex=max(1, int(ttl)))
+
+    def delete(self, key: str) -> None:
+        self._sync_cache().delete(key)
+
+    async def aget(self, key: str) -> Optional[dict]:
+        if self._async:
+            return await self._cache.get_json(key)
+        return await run_in_cache_io(self.get, key)
+
+    async def aset(self, key: str, entry: dict, ttl: float) -> None:
+        if self._async:
+            await self._cache.set_json(key, entry, ex=max(1, int(ttl)))
+        else:
+            await run_in_cache_io(self.set, key, entry, ttl)
+
+    async def adelete(self, key: str) -> None:
+        if self._async:
+            await self._cache.delete(key)
+        else:
+            await run_in_cache_io(self.delete, key)
+
+
+class _LeaderCancelled(Exception):
+    """执行函数的调用被取消或中断，等待者应自行重新加载，而不是收到对方的取消"""
+
+
+class _Flight:
+    """同步函数的一次进行中调用，等待者共享其结果或异常"""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[Exception] = None
+
+    def wait(self) -> Any:
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+_KEY_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+def _key_default(value: Any) -> Any:
+    """orjson 无法直接编码的参数：pydantic 模型、集合、bytes；其他类型拒绝生成键"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return sorted(orjson.dumps(item, default=_key_default, option=_KEY_OPTIONS).decode() for item in value)
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": bytes(value).hex()}
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def default_key_builder(func: Callable, *args, **kwargs) -> str:
+    """按函数全名和绑定后的参数生成缓存键，位置参数与关键字参数传法不同也得到同一个键。
+
+    参数用 orjson 编码，只接受基本类型、容器、日期、UUID、枚举、dataclass 和 pydantic 模型，
+    键在进程和重启之间保持不变；无法编码的参数抛出 TypeError。
+    第一个参数为 cls 时使用类的全名；为 self 时使用实例的 __cache_key__() 返回值，
+    未实现时抛出 TypeError，方法需要实现 __cache_key__ 或提供 key_builder。
+    """
+    signature = inspect.signature(func)
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+    params = list(signature.parameters)
+    if params and params[0] == "cls" and "cls" in arguments:
+        owner = arguments["cls"]
+        arguments["cls"] = f"{owner.__module__}.{owner.__qualname__}"
+    elif params and params[0] == "self" and "self" in arguments:
+        identity = getattr(arguments["self"], "__cache_key__", None)
+        if identity is None:
+            raise TypeError(f"{func.__qualname__} 的实例未实现 __cache_key__()，请实现或提供 key_builder")
+        arguments["self"] = identity()
+    try:
+        encoded = orjson.dumps(arguments, default=_key_default, option=_KEY_OPTIONS)
+    except orjson.JSONEncodeError as e:
+        raise TypeError(f"{func.__qualname__} 的参数无法生成缓存键，请提供 key_builder: {e}") from e
+    return f"{func.__module__}.{func.__qualname__}:{hashlib.md5(encoded).hexdigest()}"
+
+
+def cached(
+        ttl: float,
+        backend: Optional[CacheBackend] = None,
+        key_builder: Optional[Callable[..., str]] = None,
+        stale_ttl: float = 0,
+        cache_none: bool = False,
+):
+    """缓存函数结果，支持异步和同步函数。
+
+    - 同一进程内同一个 key 的并发未命中只会执行一次函数（single-flight），其余调用等待该结果
+    - stale_ttl > 0 时，超过 ttl 但未超过 ttl + stale_ttl 的值会先返回旧值，并在后台刷新
+    - 后端读写失败时记录日志并直接执行函数，缓存不影响调用结果
+
+    Args:
+        ttl: 新鲜期(秒)
+        backend: 存储后端，默认为进程内 MemoryBackend
+        key_builder: 缓存键生成函数，参数与被装饰函数相同，默认使用 default_key_builder；
+            参数无法稳定编码或装饰的方法未实现 __cache_key__ 时必须提供
+        stale_ttl: 过期后仍可返回旧值的时间(秒)
+        cache_none: 是否缓存 None 结果
+
+    被装饰函数额外提供 invalidate(*args, **kwargs) / ainvalidate(...) 和 cache_key(*args, **kwargs)。
+    """
+    backend = backend or MemoryBackend()
+
+    def decorator(func: Callable) -> Callable:
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        def cache_key(*args, **kwargs) -> str:
+            if key_builder is not None:
+                return key_builder(*args, **kwargs)
+            return default_key_builder(func, *args, **kwargs)
+
+        def make_entry(value: Any) -> Optional[dict]:
+            if value is None and not cache_none:
+                return None
+            return {_VALUE: value, _STORED_AT: time.time()}
+
+        def is_fresh(entry: dict) -> bool:
+            return time.time() - entry[_STORED_AT] < ttl
+
+        def is_valid(entry: Any) -> bool:
+            return isinstance(entry, dict) and _VALUE in entry and _STORED_AT in entry
+
+        if inspect.iscoroutinefunction(func):
+            inflight: Dict[str, asyncio.Future] = {}
+            refreshing: Set[asyncio.Task] = set()  # 持有后台刷新任务引用，避免被回收
+
+            async def load(key: str, args, kwargs) -> Any:
+                """执行函数并写入缓存，同一 key 同时只有一个执行"""
+                while True:
+                    future = inflight.get(key)
+                    if future is None:
+                        break
+                    CACHED_CALLS.inc(func=name, result="coalesced")
+                    try:
+                        return await asyncio.shield(future)
+                    except _LeaderCancelled:
+                        # 执行者被取消，由等待者之一重新执行
+                        continue
+
+                future = asyncio.get_running_loop().create_future()
+                inflight[key] = future
+                try:
+                    value = await func(*args, **kwargs)
+                    entry = make_entry(value)
+                    if entry is not None:
+                        try:
+                            await backend.aset(key, entry, ttl + stale_ttl)
+                        except Exception as e:
+                            logger.warning(f"【cached:{name}】写入缓存失败: {e}")
+                    future.set_result(value)
+                    return value
+                except Exception as e:
+                    future.set_exception(e)
+                    # 没有其他等待者时避免 "Future exception was never retrieved"
+                    future.exception()
+                    raise
+                except BaseException:
+                    # 取消只属于本次调用，等待者收到 _LeaderCancelled 后重试
+                    future.set_exception(_LeaderCancelled())
+                    future.exception()
+                    raise
+                finally:
+                    inflight.pop(key, None)
+
+            async def refresh(key: str, args, kwargs) -> None:
+                try:
+                    await load(key, args, kwargs)
+                except Exception as e:
+                    logger.warning(f"【cached:{name}】后台刷新失败: {e}")
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                key = cache_key(*args, **kwargs)
+                try:
+                    entry = await backend.aget(key)
+                except Exception as e:
+                    logger.warning(f"【cached:{name}】读取缓存失败: {e}")
+                    entry = None
+
+                if is_valid(entry):
+                    if is_fresh(entry):
+                        CACHED_CALLS.inc(func=name, result="hit")
+                        return entry[_VALUE]
+                    if stale_ttl > 0:
+                        CACHED_CALLS.inc(func=name, result="stale")
+                        if key not in inflight:
+                            task = asyncio.create_task(refresh(key, args, kwargs))
+                            refreshing.add(task)
+                            task.add_done_callback(refreshing.discard)
+                        return entry[_VALUE]
+
+                CACHED_CALLS.inc(func=name, result="miss")
+                return await load(key, args, kwargs)
+
+            async def ainvalidate(*args, **kwargs) -> None:
+                await backend.adelete(cache_key(*args, **kwargs))
+
+            wrapper.ainvalidate = ainvalidate
+        else:
+            inflight_sync: Dict[str, _Flight] = {}
+            lock = threading.Lock()
+
+            def load_sync(key: str, args, kwargs) -> Any:
+                """执行函数并写入缓存，同一 key 同时只有一个线程执行"""
+                while True:
+                    with lock:
+                        flight = inflight_sync.get(key)
+                        leader = flight is None
+                        if leader:
+                            flight = inflight_sync[key] = _Flight()
+                    if leader:
+                        break
+                    CACHED_CALLS.inc(func=name, result="coalesced")
+                    try:
+                        return flight.wait()
+                    except _LeaderCancelled:
+                        # 执行线程被中断，由等待者之一重新执行
+                        continue
+
+                try:
+                    value = func(*args, **kwargs)
+                    entry = make_entry(value)
+                    if entry is not None:
+                        try:
+                            backend.set(key, entry, ttl + stale_ttl)
+                        except Exception as e:
+                            logger.warning(f"【cached:{name}】写入缓存失败: {e}")
+                    flight.value = value
+                    return value
+                except Exception as e:
+                    flight.error = e
+                    raise
+                except BaseException:
+                    flight.error = _LeaderCancelled()
+                    raise
+                finally:
+                    with lock:
+                        inflight_sync.pop(key, None)
+                    flight.done.set()
+
+            def refresh_sync(key: str, args, kwargs) -> None:
+                try:
+                    load_sync(key, args, kwargs)
+                except Exception as e:
+                    logger.warning(f"【cached:{name}】后台刷新失败: {e}")
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = cache_key(*args, **kwargs)
+                try:
+                    entry = backend.get(key)
+                except Exception as e:
+                    logger.warning(f"【cached:{name}】读取缓存失败: {e}")
+                    entry = None
+
+                if is_valid(entry):
+                    if is_fresh(entry):
+                        CACHED_CALLS.inc(func=name, result="hit")
+                        return entry[_VALUE]
+                    if stale_ttl > 0:
+                        CACHED_CALLS.inc(func=name, result="stale")
+                        if key not in inflight_sync:
+                            get_cache_io_executor().submit(refresh_sync, key, args, kwargs)
+                        return entry[_VALUE]
+
+                CACHED_CALLS.inc(func=name, result="miss")
+                return load_sync(key, args, kwargs)
+
+        def invalidate(*args, **kwargs) -> None:
+            backend.delete(cache_key(*args, **kwargs))
+
+        wrapper.invalidate = invalidate
+        wrapper.cache_key = cache_key
+        return wrapper
+
+    return decorator
@@ -10,37 +10,104 @@
 
 import hashlib
 import json
+import mmap
 import os
-import shutil
+import sqlite3
+import tempfile
+import threading
 import time
-from datetime import date, datetime, timedelta, timezone
+from datetime import date, datetime, timedelta
 from functools import lru_cache
-from typing import Any, Optional
+from typing import Any, Dict, Optional, Tuple, Union
 
 from agent.core.config import settings
+from agent.shared.cacher.cache_codec import HEADER_SIZE, decode_header, decode_payload, encode_entry, encode_payload
+from agent.shared.cacher.cache_index import EVICTION_POLICIES, CacheIndex
+from agent.shared.cacher.fingerprint import afingerprint_file, fingerprint_file
+from agent.shared.cacher.io_executor import run_in_cache_io
+from agent.shared.cacher.memory_cache import LRUCache
 from agent.utils.logger import logger
 from agent.utils.utils import cache_path
 
+_MISSING = object()
+
 
 class FileCache:
-    def __init__(self, namespace: str = "default", default_ttl_days: int = settings.DEFAULT_CACHE_TTL_DAYS):
+    def __init__(
+            self,
+            namespace: str = "default",
+            default_ttl_days: int = settings.DEFAULT_CACHE_TTL_DAYS,
+            memory_max_entries: Optional[int] = None,
+            memory_max_bytes: Optional[int] = None,
+            memory_ttl: Optional[float] = None,
+            max_bytes: Optional[int] = None,
+            max_entries: Optional[int] = None,
+            eviction_policy: Optional[str] = None,
+            inline_cleanup: Optional[bool] = None,
+    ):
         """初始化通用文件缓存管理器。
 
         Args:
             namespace: 缓存命名空间 (e.g. 'ocr_results', 'user_sessions')
             default_ttl_days: 默认的缓存清理周期（天）
+            memory_max_entries: 内存层最大条目数，0 表示关闭内存层，默认使用settings.FILE_CACHE_MEMORY_MAX_ENTRIES
+            memory_max_bytes: 内存层最大字节数，默认使用settings.FILE_CACHE_MEMORY_MAX_BYTES
+            memory_ttl: 内存层条目最长存活时间（秒），默认使用settings.FILE_CACHE_MEMORY_TTL
+            max_bytes: 命名空间磁盘占用上限（字节），0 表示不限制，默认使用settings.FILE_CACHE_MAX_BYTES
+            max_entries: 命名空间条目数上限，0 表示不限制，默认使用settings.FILE_CACHE_MAX_ENTRIES
+            eviction_policy: 超出配额时的淘汰策略，'lru' 或 'lfu'，默认使用settings.FILE_CACHE_EVICTION_POLICY
+            inline_cleanup: 是否在请求中清理过期缓存，为 False 时由维护调度器定期清理，默认使用settings.CACHE_INLINE_CLEANUP
         """
         self.namespace = namespace
         self.enable_cache = settings.ENABLE_CACHE
+        if inline_cleanup is None:
+            inline_cleanup = settings.CACHE_INLINE_CLEANUP
+        if inline_cleanup is None:
+            inline_cleanup = not settings.MAINTENANCE_ENABLED  # 维护任务启用时由调度器清理
+        self.inline_cleanup = inline_cleanup
+
+        # 内存 LRU 层：热点 key 命中时不访问磁盘
+        if memory_max_entries is None:
+            memory_max_entries = settings.FILE_CACHE_MEMORY_MAX_ENTRIES
+        self._memory: Optional[LRUCache] = None
+        if memory_max_entries > 0:
+            self._memory = LRUCache(
+                max_entries=memory_max_entries,
+                max_bytes=memory_max_bytes if memory_max_bytes is not None else settings.FILE_CACHE_MEMORY_MAX_BYTES,
+                default_ttl=memory_ttl if memory_ttl is not None else settings.FILE_CACHE_MEMORY_TTL,
+            )
+        self._disk_hits = 0
+        self._disk_misses = 0
+        # 每个 key 的写入代数，set/delete/clear 时递增；读磁盘前后代数不变才回填内存层，
+        # 避免与写入并发的读取把旧值放回内存层。超过上限时整体清空并递增 epoch，代数仍然不会重复
+        self._generations: Dict[str, int] = {}
+        self._generation_epoch = 0
+        self._generation_lock = threading.Lock()
+
+        # 磁盘配额：超出后按索引中的访问信息淘汰
+        self.max_bytes = max_bytes if max_bytes is not None else settings.FILE_CACHE_MAX_BYTES
+        self.max_entries = max_entries if max_entries is not None else settings.FILE_CACHE_MAX_ENTRIES
+        self.eviction_policy = eviction_policy or settings.FILE_CACHE_EVICTION_POLICY
+        if self.eviction_policy not in EVICTION_POLICIES:
+            raise ValueError(f"eviction_policy must be one of {EVICTION_POLICIES}, got {self.eviction_policy!r}")
+        # 命中时先在内存中累计访问信息，批量写入索引，避免每次读取都写 SQLite
+        self._pending_access: Dict[str, Tuple[float, int]] = {}
+        self._access_lock = threading.Lock()
+        self._clear_lock = threading.Lock()
+        self._last_access_flush = time.monotonic()
 
         # 使用命名空间创建更具体的缓存基础目录
         self.base_cache_dir = cache_path(settings.CACHE_FILE_DIR, f"namespace/{self.namespace}")
         self.cleanup_ttl = timedelta(days=default_ttl_days)
         self._last_cleanup_date: Optional[date] = None  # <-- Track last cleanup date
+        self._cleanup_pending = False
 
-        # 不再强制按日期分子目录存储，但清理时仍按日期目录清理
+        # 缓存文件按 key 哈希分两级子目录存放，过期信息记录在 SQLite 索引中
         self._ensure_base_dir()
-        self._cleanup_old_caches()  # 初始时清理一次旧缓存
+        self._index = CacheIndex(os.path.join(self.base_cache_dir, "index.db"))
+        self._migrate_flat_layout()
+        if self.inline_cleanup:
+            self._cleanup_old_caches()  # 初始时清理一次旧缓存
 
     def _ensure_base_dir(self) -> None:
         """确保基础缓存目录存在。"""
@@ -50,51 +117,104 @@ class FileCache:
             except OSError as e:
                 logger.error(f"【FileCache:{self.namespace}】创建缓存目录失败: {self.base_cache_dir}, Error: {e}")
 
+    @staticmethod
+    def _hash_key(key: str) -> str:
+        # 使用 key 的哈希值作为文件名，避免特殊字符问题
+        return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _relpath_for_hash(key_hash: str) -> str:
+        """两级分片目录：ab/cd/abcd....bin，单个目录下的文件数保持在可控范围"""
+        return os.path.join(key_hash[:2], key_hash[2:4], f"{key_hash}.bin")
+
     def _get_cache_filepath(self, key: str) -> str:
         """根据 key 生成缓存文件路径。"""
-        # 使用 key 的哈希值作为文件名，避免特殊字符问题
-        key_hash = hashlib.md5(key.encode('utf-8')).hexdigest()
-        # 将所有缓存文件直接放在基础目录下，简化查找
-        return os.path.join(self.base_cache_dir, f"{key_hash}.json")
+        return os.path.join(self.base_cache_dir, self._relpath_for_hash(self._hash_key(key)))
+
+    def _sweep_at(self, now_ts: float, expires_ts: Optional[float]) -> float:
+        """条目的清理时间：过期时间与清理周期取较早者"""
+        sweep_at = now_ts + self.cleanup_ttl.total_seconds()
+        if expires_ts is not None:
+            sweep_at = min(sweep_at, expires_ts)
+        return sweep_at
+
+    def _migrate_flat_layout(self) -> None:
+        """将旧版平铺在基础目录下的缓存文件迁移到分片目录并写入索引。"""
+        rows = []
+        try:
+            with os.scandir(self.base_cache_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".json") or not entry.is_file():
+                        continue
+                    key_hash = entry.name[:-len(".json")]
+                    relpath = self._relpath_for_hash(key_hash)
+                    target = os.path.join(self.base_cache_dir, relpath)
+                    try:
+                        stat = entry.stat()
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        os.replace(entry.path, target)
+                    except OSError as e:
+                        logger.warning(f"【FileCache:{self.namespace}】迁移缓存文件 {entry.path} 失败: {e}")
+                        continue
+                    # 旧文件的过期时间在文件内容中，读取时仍会校验；这里按修改时间计算清理时间
+                    rows.append((key_hash, relpath, stat.st_size, None,
+                                 self._sweep_at(stat.st_mtime, None), stat.st_mtime))
+        except OSError as e:
+            logger.error(f"【FileCache:{self.namespace}】扫描旧缓存目录失败: {e}")
+            return
+
+        if rows:
+            self._index.upsert_many(rows)
+            logger.info(f"【FileCache:{self.namespace}】已迁移 {len(rows)} 个旧版缓存文件到分片目录。")
 
     def _check_and_run_cleanup(self) -> None:
-        """检查是否需要运行每日清理任务。"""
-        if not self.enable_cache:
+        """检查是否需要运行每日清理任务，清理分批进行，每次调用最多处理一批。"""
+        if not self.enable_cache or not self.inline_cleanup:
             return
         today = date.today()
         if self._last_cleanup_date != today:
             logger.info(f"【FileCache:{self.namespace}】触发每日缓存清理任务...")
-            self._cleanup_old_caches()
+            self._cleanup_pending = True
             self._last_cleanup_date = today
+        if self._cleanup_pending:
+            batch = settings.FILE_CACHE_CLEANUP_BATCH
+            self._cleanup_pending = self.cleanup_expired(limit=batch) >= batch
+
+    def cleanup_expired(self, limit: int = 500) -> int:
+        """清理最多 limit 个已到期的缓存文件，返回清理数量。"""
+        try:
+            due = self._index.due(time.time(), limit)
+        except Exception as e:
+            logger.error(f"【FileCache:{self.namespace}】查询过期索引失败: {e}")
+            return 0
+
+        for _, relpath in due:
+            filepath = os.path.join(self.base_cache_dir, relpath)
+            try:
+                os.remove(filepath)
+            except FileNotFoundError:
+                pass  # 文件可能已被删除
+            except OSError as e:
+                logger.warning(f"【FileCache:{self.namespace}】清理文件 {filepath} 时出错: {e}")
+        self._index.delete_many([key_hash for key_hash, _ in due])
+        return len(due)
 
     def _cleanup_old_caches(self) -> None:
-        """清理过期的缓存文件（基于文件修改时间）。"""
+        """清理所有到期的缓存文件（过期或超过清理周期未更新），按批次进行。"""
         if not self.enable_cache or not os.path.exists(self.base_cache_dir):
             return
 
-        now_ts = time.time()
-        cutoff_ts = now_ts - self.cleanup_ttl.total_seconds()
-
+        batch = settings.FILE_CACHE_CLEANUP_BATCH
         cleaned_count = 0
-        try:
-            for filename in os.listdir(self.base_cache_dir):
-                if filename.endswith(".json"):
-                    filepath = os.path.join(self.base_cache_dir, filename)
-                    try:
-                        # 检查文件的最后修改时间
-                        file_mtime = os.path.getmtime(filepath)
-                        if file_mtime < cutoff_ts:
-                            os.remove(filepath)
-                            cleaned_count += 1
-                    except FileNotFoundError:
-                        continue  # 文件可能在迭代过程中已被删除
-                    except Exception as e:
-                        logger.warning(f"【FileCache:{self.namespace}】清理文件 {filepath} 时出错: {e}")
-            if cleaned_count > 0:
-                logger.info(
-                    f"【FileCache:{self.namespace}】清理了 {cleaned_count} 个超过 {self.cleanup_ttl.days} 天的旧缓存文件。")
-        except Exception as e:
-            logger.error(f"【FileCache:{self.namespace}】执行缓存清理时出错: {e}")
+        while True:
+            count = self.cleanup_expired(limit=batch)
+            cleaned_count += count
+            if count < batch:
+                break
+        self._cleanup_pending = False
+
+        if cleaned_count > 0:
+            logger.info(f"【FileCache:{self.namespace}】清理了 {cleaned_count} 个过期或超过 {self.cleanup_ttl.days} 天的旧缓存文件。")
 
     @staticmethod
     def generate_key(content: str) -> str:
@@ -111,7 +231,9 @@ class FileCache:
 
     @staticmethod
     def generate_key_from_file(file_path: str) -> str:
-        """根据文件路径生成缓存键。
+        """根据文件内容生成缓存键。
+
+        使用非加密哈希和大块读取，并按文件 inode、大小、修改时间记忆结果，未修改的文件不会重复读取。
 
         Args:
             file_path: 文件路径
@@ -120,15 +242,12 @@ class FileCache:
             缓存键 (字符串)
         """
 
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"文件不存在: {file_path}")
-
-        md5_hash = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                md5_hash.update(chunk)
+        return fingerprint_file(file_path)
 
-        return md5_hash.hexdigest()
+    @staticmethod
+    async def agenerate_key_from_file(file_path: str) -> str:
+        """generate_key_from_file 的异步版本，在缓存 I/O 线程池中读取文件"""
+        return await afingerprint_file(file_path)
 
     def set(self, key: str, value: Any, ttl: Optional[timedelta] = None) -> None:
         """将键值对存入缓存，并可设置过期时间。
@@ -140,27 +259,90 @@ class FileCache:
         """
         self._check_and_run_cleanup()  # <-- Add cleanup check
 
-        filepath = self._get_cache_filepath(key)
-        self._ensure_base_dir()  # 确保目录存在
+        key_hash = self._hash_key(key)
+        relpath = self._relpath_for_hash(key_hash)
+        filepath = os.path.join(self.base_cache_dir, relpath)
 
-        expires_at = None
-        if ttl:
-            expires_at = (datetime.now(timezone.utc) + ttl).isoformat()
+        now_ts = time.time()
+        expires_ts = now_ts + ttl.total_seconds() if ttl else None
 
-        cache_data = {
-            'value': value,
-            'expires_at': expires_at,  # 存储 ISO 格式的 UTC 时间字符串
-            'created_at': datetime.now(timezone.utc).isoformat()
-        }
+        # 先失效内存层，写入失败时不会读到旧值
+        generation = self._bump_generation(key)
+        if self._memory is not None:
+            self._memory.delete(key)
 
         try:
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=4)  # indent for readability
+            data = encode_entry(value, expires_ts, now_ts)
+            self._atomic_write(filepath, data)
+            self._index.upsert(key_hash, relpath, len(data), expires_ts, self._sweep_at(now_ts, expires_ts), now_ts)
             logger.debug(f"【FileCache:{self.namespace}】保存缓存: {key} -> {filepath}")
-        except IOError as e:
-            logger.error(f"【FileCache:{self.namespace}】写入缓存文件失败: {filepath}, Error: {e}")
         except TypeError as e:
             logger.error(f"【FileCache:{self.namespace}】缓存值无法JSON序列化: key={key}, Error: {e}")
+            return
+        except (IOError, sqlite3.Error) as e:
+            logger.error(f"【FileCache:{self.namespace}】写入缓存文件失败: {filepath}, Error: {e}")
+            return
+
+        self._memory_set(key, memoryview(data)[HEADER_SIZE:], ttl.total_seconds() if ttl else None, generation)
+
+        try:
+            self._enforce_quota(exclude=key_hash)
+        except sqlite3.Error as e:
+            logger.error(f"【FileCache:{self.namespace}】执行配额淘汰失败: {e}")
+
+    @staticmethod
+    def _atomic_write(filepath: str, data: bytes) -> None:
+        """先写入同目录临时文件再原子替换，读取方不会看到写了一半的文件"""
+        dirname = os.path.dirname(filepath)
+        os.makedirs(dirname, exist_ok=True)  # 确保目录存在
+        fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _read_entry(filepath: str) -> Tuple[Any, Optional[float], int, bool]:
+        """读取缓存文件，返回 (值, 过期时间戳, 文件大小, 是否旧版格式)。
+
+        已过期的条目只读取文件头，不解析 payload，此时返回的值为 _MISSING。
+        """
+        with open(filepath, "rb") as f:
+            head = f.read(HEADER_SIZE)
+            header = decode_header(head)
+            if header is None:
+                # 旧版格式：{"value": ..., "expires_at": ISO 时间, "created_at": ...}
+                content = head + f.read()
+                cache_data = json.loads(content)
+                expires_ts = None
+                if cache_data.get('expires_at'):
+                    expires_ts = datetime.fromisoformat(cache_data['expires_at']).timestamp()
+                if expires_ts is not None and expires_ts <= time.time():
+                    return _MISSING, expires_ts, len(content), True
+                return cache_data['value'], expires_ts, len(content), True
+
+            expires_ts, _ = header
+            if expires_ts is not None and expires_ts <= time.time():
+                return _MISSING, expires_ts, 0, False
+
+            size = os.fstat(f.fileno()).st_size
+            if size - HEADER_SIZE >= settings.FILE_CACHE_MMAP_THRESHOLD:
+                # 大文件用 mmap 直接交给 orjson 解析，省去一次读入缓冲区的拷贝
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    view = memoryview(mm)[HEADER_SIZE:]
+                    try:
+                        value = decode_payload(view)
+                    finally:
+                        view.release()
+            else:
+                value = decode_payload(f.read())
+            return value, expires_ts, size, False
 
     def get(self, key: str) -> Optional[Any]:
         """根据键获取缓存值。如果缓存不存在或已过期，则返回 None。
@@ -176,44 +358,64 @@ class FileCache:
         if not self.enable_cache:
             return None
 
-        filepath = self._get_cache_filepath(key)
+        value = self._memory_get(key)
+        if value is not _MISSING:
+            return value
 
-        if not os.path.exists(filepath):
-            return None
+        key_hash = self._hash_key(key)
+        relpath = self._relpath_for_hash(key_hash)
+        filepath = os.path.join(self.base_cache_dir, relpath)
 
+        generation = self._current_generation(key)
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                cache_data = json.load(f)
-
-            expires_at_str = cache_data.get('expires_at')
-            if expires_at_str:
-                expires_at = datetime.fromisoformat(expires_at_str)
-                # 确保比较时使用带时区的当前时间
-                if datetime.now(timezone.utc) > expires_at:
-                    # 缓存已过期，删除文件并返回 None
-                    try:
-                        os.remove(filepath)
-                        logger.debug(f"【FileCache:{self.namespace}】删除过期缓存: {key}")
-                    except OSError as e:
-                        logger.warning(f"【FileCache:{self.namespace}】删除过期缓存文件失败: {filepath}, Error: {e}")
-                    return None
-
-            # logger.debug(f"【FileCache:{self.namespace}】命中缓存: {key}")
-            return cache_data.get('value')
-
-        except (json.JSONDecodeError, KeyError, TypeError, ValueError, FileNotFoundError) as e:
+            value, expires_ts, _, legacy = self._read_entry(filepath)
+        except FileNotFoundError:
+            self._disk_misses += 1
+            return None
+        except (ValueError, KeyError, TypeError, OSError) as e:
+            # orjson.JSONDecodeError / json.JSONDecodeError 均为 ValueError 子类
             logger.warning(f"【FileCache:{self.namespace}】读取或解析缓存文件失败: {filepath}, Error: {e}. 可能需要清理。")
             # 如果文件有问题，尝试删除它
             try:
-                if os.path.exists(filepath):
-                    os.remove(filepath)
+                os.remove(filepath)
             except OSError:
                 pass  # 忽略删除错误
+            self._index_delete(key_hash)
+            self._disk_misses += 1
             return None
         except Exception as e:
             logger.error(f"【FileCache:{self.namespace}】获取缓存时发生未知错误: key={key}, Error: {e}")
             return None
 
+        if value is _MISSING:
+            # 缓存已过期，删除文件并返回 None
+            try:
+                os.remove(filepath)
+                logger.debug(f"【FileCache:{self.namespace}】删除过期缓存: {key}")
+            except OSError as e:
+                logger.warning(f"【FileCache:{self.namespace}】删除过期缓存文件失败: {filepath}, Error: {e}")
+            self._index_delete(key_hash)
+            self._disk_misses += 1
+            return None
+
+        if legacy:
+            # 旧版 JSON 文件读取成功后按新格式重写
+            try:
+                now_ts = time.time()
+                data = encode_entry(value, expires_ts, now_ts)
+                self._atomic_write(filepath, data)
+                self._index.upsert(key_hash, relpath, len(data), expires_ts, self._sweep_at(now_ts, expires_ts), now_ts)
+            except (TypeError, OSError, sqlite3.Error) as e:
+                logger.warning(f"【FileCache:{self.namespace}】升级旧版缓存文件失败: {filepath}, Error: {e}")
+
+        # logger.debug(f"【FileCache:{self.namespace}】命中缓存: {key}")
+        self._disk_hits += 1
+        self._record_access(key_hash)
+        if self._memory is not None:
+            remaining = expires_ts - time.time() if expires_ts is not None else None
+            self._memory_set(key, encode_payload(value), remaining, generation)
+        return value
+
     def delete(self, key: str) -> bool:
         """删除指定的缓存键。
 
@@ -227,7 +429,13 @@ class FileCache:
         if not self.enable_cache:
             return True  # 缓存未启用，视为删除成功
 
-        filepath = self._get_cache_filepath(key)
+        self._bump_generation(key)
+        if self._memory is not None:
+            self._memory.delete(key)
+
+        key_hash = self._hash_key(key)
+        filepath = os.path.join(self.base_cache_dir, self._relpath_for_hash(key_hash))
+        self._index_delete(key_hash)
         if os.path.exists(filepath):
             try:
                 os.remove(filepath)
@@ -244,16 +452,187 @@ class FileCache:
         if not self.enable_cache:
             return True
 
-        if os.path.exists(self.base_cache_dir):
+        self._bump_generation(None)
+        if self._memory is not None:
+            self._memory.clear()
+        if not os.path.exists(self.base_cache_dir):
+            return True  # 目录不存在，视为清空成功
+
+        # 索引连接由所有线程共享，不关闭也不删除数据库文件，只清空记录和缓存文件；
+        # 保留分片目录和写入中的 .tmp 文件，同时进行的 set 不会因目录消失而失败
+        with self._clear_lock:
+            with self._access_lock:
+                self._pending_access.clear()
             try:
-                shutil.rmtree(self.base_cache_dir)
-                logger.info(f"【FileCache:{self.namespace}】已清空命名空间缓存目录: {self.base_cache_dir}")
-                self._ensure_base_dir()  # 重新创建基础目录
-                return True
-            except OSError as e:
+                self._index.clear()
+                for dirpath, _, filenames in os.walk(self.base_cache_dir):
+                    for filename in filenames:
+                        if not filename.endswith((".bin", ".json")):
+                            continue  # index.db 及写入中的 .tmp 文件
+                        try:
+                            os.remove(os.path.join(dirpath, filename))
+                        except FileNotFoundError:
+                            pass
+            except (OSError, sqlite3.Error) as e:
                 logger.error(f"【FileCache:{self.namespace}】清空命名空间缓存失败: {self.base_cache_dir}, Error: {e}")
                 return False
-        return True  # 目录不存在，视为清空成功
+        logger.info(f"【FileCache:{self.namespace}】已清空命名空间缓存目录: {self.base_cache_dir}")
+        return True
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get 的异步版本，内存层命中时直接返回，否则在缓存 I/O 线程池中读取磁盘。"""
+        if self.enable_cache:
+            value = self._memory_get(key)
+            if value is not _MISSING:
+                return value
+        return await run_in_cache_io(self.get, key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[timedelta] = None) -> None:
+        """set 的异步版本。"""
+        await run_in_cache_io(self.set, key, value, ttl)
+
+    async def adelete(self, key: str) -> bool:
+        """delete 的异步版本。"""
+        return await run_in_cache_io(self.delete, key)
+
+    async def aclear_namespace(self) -> bool:
+        """clear_namespace 的异步版本。"""
+        return await run_in_cache_io(self.clear_namespace)
+
+    def _record_access(self, key_hash: str) -> None:
+        """记录一次磁盘命中。内存层命中不记录，内存层 TTL 较短，热点 key 过期后会再次命中磁盘。"""
+        now_ts = time.time()
+        with self._access_lock:
+            _, hits = self._pending_access.get(key_hash, (0.0, 0))
+            self._pending_access[key_hash] = (now_ts, hits + 1)
+            should_flush = (len(self._pending_access) >= 256 or
+                            time.monotonic() - self._last_access_flush >= 5)
+        if should_flush:
+            self._flush_access()
+
+    def _flush_access(self) -> None:
+        """将累计的访问信息写入索引"""
+        with self._access_lock:
+            pending, self._pending_access = self._pending_access, {}
+            self._last_access_flush = time.monotonic()
+        try:
+            self._index.touch_many(pending)
+        except sqlite3.Error as e:
+            logger.warning(f"【FileCache:{self.namespace}】写入访问记录失败: {e}")
+
+    def _enforce_quota(self, exclude: Optional[str] = None) -> int:
+        """超出配额时按淘汰策略删除条目，降到配额的 90% 以下，避免每次写入都触发淘汰。"""
+        if not self.max_bytes and not self.max_entries:
+            return 0
+
+        entries, total_bytes, _ = self._index.totals()
+        over_entries = self.max_entries and entries > self.max_entries
+        over_bytes = self.max_bytes and total_bytes > self.max_bytes
+        if not over_entries and not over_bytes:
+            return 0
+
+        target_entries = int(self.max_entries * 0.9) if self.max_entries else None
+        target_bytes = int(self.max_bytes * 0.9) if self.max_bytes else None
+        self._flush_access()
+
+        evicted = 0
+        while True:
+            candidates = self._index.victims(self.eviction_policy, 256, exclude=exclude)
+            if not candidates:
+                break
+            removed = []
+            for key_hash, relpath, size in candidates:
+                if ((target_entries is None or entries <= target_entries) and
+                        (target_bytes is None or total_bytes <= target_bytes)):
+                    break
+                try:
+                    os.remove(os.path.join(self.base_cache_dir, relpath))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"【FileCache:{self.namespace}】淘汰缓存文件失败: {relpath}, Error: {e}")
+                    continue
+                removed.append(key_hash)
+                entries -= 1
+                total_bytes -= size
+            self._index.delete_many(removed)
+            evicted += len(removed)
+            if len(removed) < len(candidates) or not removed:
+                break
+
+        if evicted:
+            self._index.add_evictions(evicted)
+            logger.info(f"【FileCache:{self.namespace}】超出配额，按 {self.eviction_policy} 淘汰了 {evicted} 个缓存文件。")
+        return evicted
+
+    def _index_delete(self, key_hash: str) -> None:
+        try:
+            self._index.delete(key_hash)
+        except sqlite3.Error as e:
+            logger.warning(f"【FileCache:{self.namespace}】删除缓存索引失败: {key_hash}, Error: {e}")
+
+    def _memory_get(self, key: str) -> Any:
+        """读取内存层，每次解码出新对象，调用方修改返回值不会影响缓存；未命中返回 _MISSING"""
+        if self._memory is None:
+            return _MISSING
+        payload = self._memory.get(key, _MISSING)
+        if payload is _MISSING:
+            return _MISSING
+        return decode_payload(payload)
+
+    def _current_generation(self, key: str) -> Tuple[int, int]:
+        with self._generation_lock:
+            return self._generation_epoch, self._generations.get(key, 0)
+
+    def _bump_generation(self, key: Optional[str]) -> Tuple[int, int]:
+        """递增 key 的写入代数并返回新代数，key 为 None 时使所有 key 的代数失效"""
+        if self._memory is None:
+            return 0, 0
+        with self._generation_lock:
+            if key is None or len(self._generations) >= max(self._memory.max_entries, 1024):
+                self._generations.clear()
+                self._generation_epoch += 1
+            if key is None:
+                return self._generation_epoch, 0
+            generation = self._generations[key] = self._generations.get(key, 0) + 1
+            return self._generation_epoch, generation
+
+    def _memory_set(self, key: str, payload: Union[bytes, memoryview], ttl: Optional[float],
+                    generation: Tuple[int, int]) -> None:
+        """以编码后的 payload 写入内存层，内存层 TTL 不超过条目剩余有效期
+
+        generation 为读写磁盘前的代数，期间有其他 set/delete 时放弃写入，内存层不会保留旧值
+        """
+        if self._memory is None:
+            return
+        if ttl is not None and self._memory.default_ttl is not None:
+            ttl = min(ttl, self._memory.default_ttl)
+        with self._generation_lock:
+            if (self._generation_epoch, self._generations.get(key, 0)) != generation:
+                return
+            self._memory.set(key, payload, ttl=ttl, size=len(payload))
+
+    def stats(self) -> dict:
+        """缓存命中、磁盘占用和淘汰统计"""
+        memory_stats = self._memory.stats() if self._memory is not None else None
+        memory_hits = memory_stats["hits"] if memory_stats else 0
+        total = memory_hits + self._disk_hits + self._disk_misses
+        entries, total_bytes, evictions = self._index.totals()
+        return {
+            "namespace": self.namespace,
+            "memory": memory_stats,
+            "disk": {
+                "entries": entries,
+                "bytes": total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "eviction_policy": self.eviction_policy,
+                "evictions": evictions,
+            },
+            "disk_hits": self._disk_hits,
+            "disk_misses": self._disk_misses,
+            "hit_ratio": (memory_hits + self._disk_hits) / total if total else 0.0,
+        }
 
 
 @lru_cache()
@@ -9,38 +9,65 @@
 # 临时文件管理器
 # =====================================================
 
+import hashlib
 import json
 import os
 import shutil
+import sqlite3
+import tempfile
+import time
 from datetime import datetime, timedelta, timezone
 from functools import lru_cache
-from typing import Optional
+from typing import AsyncIterator, Optional, Union
+
+from starlette.datastructures import UploadFile
 
 from agent.core.config import settings
+from agent.shared.cacher.io_executor import run_in_cache_io
+from agent.shared.cacher.temp_file_index import TempFileIndex
 from agent.utils.logger import logger
 from agent.utils.snowflake import worker
 from agent.utils.utils import cache_path
 
 
 class TempFile:
-    """临时文件管理器，用于管理具有生命周期的临时文件。"""
+    """临时文件管理器，用于管理具有生命周期的临时文件。
+
+    文件内容按 sha256 存放在 blobs/ 下，每个 file_id 对应的文件是指向 blob 的硬链接，
+    相同内容只存一份；文件系统不支持硬链接时改为复制。blob 及其链接都是只读的，
+    get() 返回的路径不能原地修改，需要修改时先复制。
+    元数据和 blob 引用数保存在命名空间目录下的 SQLite 表中，引用数降为 0 时删除 blob。
+    """
 
-    def __init__(self, namespace: str = "default", default_ttl_hours: int = 6):
+    def __init__(self, namespace: str = "default", default_ttl_hours: int = 6,
+                 inline_cleanup: Optional[bool] = None):
         """初始化临时文件管理器。
 
         Args:
             namespace: 命名空间，用于隔离不同业务的临时文件
             default_ttl_hours: 默认过期时间（小时）
+            inline_cleanup: 是否在请求中清理过期文件，为 False 时由维护调度器定期清理，默认使用settings.CACHE_INLINE_CLEANUP
         """
         self.namespace = namespace
+        if inline_cleanup is None:
+            inline_cleanup = settings.CACHE_INLINE_CLEANUP
+        if inline_cleanup is None:
+            inline_cleanup = not settings.MAINTENANCE_ENABLED  # 维护任务启用时由调度器清理
+        self.inline_cleanup = inline_cleanup
 
         # 临时文件存储目录
         self.temp_dir = cache_path(settings.CACHE_FILE_DIR, f"temp/{self.namespace}")
         self.default_ttl = timedelta(hours=default_ttl_hours)
         self._last_cleanup_time: Optional[datetime] = None  # <-- Track last cleanup time
 
+        self.blob_dir = os.path.join(self.temp_dir, "blobs")
+        self.incoming_dir = os.path.join(self.temp_dir, ".incoming")
+
         self._ensure_temp_dir()
-        self.cleanup_expired()  # 初始时清理一次旧缓存
+        self._index = TempFileIndex(os.path.join(self.temp_dir, "index.db"))
+        self._import_legacy_meta()
+        if self.inline_cleanup:
+            self.cleanup_expired()  # 初始时清理一次旧缓存
 
     def _ensure_temp_dir(self) -> None:
         """确保临时文件目录存在。"""
@@ -65,9 +92,105 @@ class TempFile:
             extension = f'.{extension}'
         return os.path.join(self.temp_dir, f"{file_id}{extension}")
 
-    def _get_meta_path(self, file_id: str) -> str:
-        """生成元数据文件路径。"""
-        return os.path.join(self.temp_dir, f"{file_id}.meta.json")
+    def _import_legacy_meta(self) -> None:
+        """将旧版 {file_id}.meta.json 元数据导入 SQLite 表并删除。"""
+        rows, imported = [], []
+        try:
+            with os.scandir(self.temp_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".meta.json"):
+                        continue
+                    try:
+                        with open(entry.path, 'r', encoding='utf-8') as f:
+                            metadata = json.load(f)
+                        expires_at = metadata.get('expires_at')
+                        rows.append((
+                            metadata['file_id'],
+                            metadata['file_path'],
+                            metadata.get('extension') or "",
+                            metadata.get('file_size') or 0,
+                            metadata.get('content_hash'),
+                            datetime.fromisoformat(metadata['created_at']).timestamp(),
+                            datetime.fromisoformat(expires_at).timestamp() if expires_at else None,
+                        ))
+                        imported.append(entry.path)
+                    except (ValueError, KeyError, TypeError, OSError) as e:
+                        logger.warning(f"【TempFile:{self.namespace}】旧版元数据无法解析，已保留: {entry.path}, Error: {e}")
+        except OSError as e:
+            logger.error(f"【TempFile:{self.namespace}】扫描旧版元数据失败: {e}")
+            return
+
+        if not imported:
+            return
+        self._index.put_many(rows)
+        for path in imported:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        logger.info(f"【TempFile:{self.namespace}】已导入 {len(rows)} 条旧版元数据。")
+
+    def _get_blob_path(self, content_hash: str) -> str:
+        """内容寻址的 blob 路径。"""
+        return os.path.join(self.blob_dir, content_hash[:2], content_hash)
+
+    def _new_incoming_file(self):
+        """在 .incoming 目录创建写入中的临时文件，返回 (文件对象, 路径)。"""
+        os.makedirs(self.incoming_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.incoming_dir, suffix=".part")
+        return os.fdopen(fd, "wb"), tmp_path
+
+    def _link_blob(self, tmp_path: str, content_hash: str, file_path: str) -> None:
+        """将写完的临时文件归入只读 blob（已存在则复用），并为 file_id 创建硬链接，不支持硬链接时复制。"""
+        blob_path = self._get_blob_path(content_hash)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        if os.path.exists(file_path):
+            os.remove(file_path)  # 指定 file_id 覆盖写入
+
+        for _ in range(3):
+            if not os.path.exists(blob_path):
+                os.chmod(tmp_path, 0o444)
+                os.replace(tmp_path, blob_path)
+            try:
+                os.link(blob_path, file_path)
+                break
+            except FileNotFoundError:
+                # blob 在检查和链接之间被其他进程回收，重新发布
+                continue
+            except OSError:
+                try:
+                    shutil.copy2(blob_path, file_path)
+                    break
+                except FileNotFoundError:
+                    continue
+        else:
+            raise OSError(f"无法链接 blob: {blob_path}")
+
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)  # 内容已存在，丢弃本次写入
+
+    def _release_blob(self, content_hash: Optional[str]) -> None:
+        """删除引用数已降为 0 的 blob。"""
+        if not content_hash:
+            return
+        try:
+            os.remove(self._get_blob_path(content_hash))
+            logger.debug(f"【TempFile:{self.namespace}】回收 blob: {content_hash}")
+        except FileNotFoundError:
+            pass
+
+    def _write_metadata(self, file_id: str, file_path: str, extension: str,
+                        ttl: Optional[timedelta], content_hash: str, file_size: int) -> None:
+        """保存元数据。"""
+        # 计算过期时间
+        created_at = time.time()
+        expires_at = None
+        if ttl or self.default_ttl:
+            use_ttl = ttl if ttl else self.default_ttl
+            expires_at = created_at + use_ttl.total_seconds()
+
+        for released in self._index.put(file_id, file_path, extension, file_size, content_hash, created_at, expires_at):
+            self._release_blob(released)
 
     @staticmethod
     def generate_file_id() -> str:
@@ -91,66 +214,118 @@ class TempFile:
         self._ensure_temp_dir()
         self._check_and_run_cleanup()
 
-        # 生成或使用指定的文件ID
+        # 生成或使用指定的文件ID，指定的文件ID已存在时先释放旧内容
         if file_id is None:
             file_id = self.generate_file_id()
+        else:
+            self.delete(file_id)
 
         file_path = self._get_file_path(file_id, extension)
-        meta_path = self._get_meta_path(file_id)
 
+        tmp_path = None
         try:
-            # 保存文件内容
-            with open(file_path, 'wb') as f:
+            # 先写入临时文件，再按内容哈希归入 blob
+            f, tmp_path = self._new_incoming_file()
+            with f:
                 f.write(file_obj)
-
-            # 计算过期时间
-            expires_at = None
-            if ttl or self.default_ttl:
-                use_ttl = ttl if ttl else self.default_ttl
-                expires_at = (datetime.now(timezone.utc) + use_ttl).isoformat()
-
-            # 保存元数据
-            metadata = {
-                'file_id': file_id,
-                'file_path': file_path,
-                'extension': extension,
-                'created_at': datetime.now(timezone.utc).isoformat(),
-                'expires_at': expires_at,
-                'file_size': os.path.getsize(file_path)
-            }
-
-            with open(meta_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, ensure_ascii=False, indent=2)
+            content_hash = hashlib.sha256(file_obj).hexdigest()
+            self._link_blob(tmp_path, content_hash, file_path)
+            self._write_metadata(file_id, file_path, extension, ttl, content_hash, len(file_obj))
 
             logger.debug(f"【TempFile:{self.namespace}】保存临时文件: {file_id} -> {file_path}")
             return file_id
 
         except Exception as e:
             logger.error(f"【TempFile:{self.namespace}】保存临时文件失败: file_id={file_id}, Error: {e}")
-            # 清理可能产生的部分文件
+            self._discard_partial(tmp_path, file_path)
+            return None
+
+    async def save_stream(self, source: Union[UploadFile, AsyncIterator[bytes]], extension: str = "",
+                          ttl: Optional[timedelta] = None, file_id: Optional[str] = None,
+                          chunk_size: int = 1024 * 1024, max_size: Optional[int] = None) -> Optional[str]:
+        """流式保存临时文件，边写入边计算哈希，内容相同的文件只存一份。
+
+        Args:
+            source: Starlette UploadFile 或产出 bytes 的异步迭代器
+            extension: 文件扩展名（如 'pdf', '.jpg'）
+            ttl: 过期时间，如果为None则使用默认值
+            file_id: 指定文件ID，如果为None则自动生成
+            chunk_size: 从 UploadFile 读取的分块大小
+            max_size: 文件大小上限（字节），超出时放弃保存
+
+        Returns:
+            文件ID，失败返回 None
+        """
+        await run_in_cache_io(self._ensure_temp_dir)
+        await run_in_cache_io(self._check_and_run_cleanup)
+
+        if file_id is None:
+            file_id = self.generate_file_id()
+        else:
+            await run_in_cache_io(self.delete, file_id)
+
+        file_path = self._get_file_path(file_id, extension)
+
+        tmp_path = None
+        try:
+            f, tmp_path = await run_in_cache_io(self._new_incoming_file)
+            digest = hashlib.sha256()
+            file_size = 0
+            try:
+                async for chunk in self._iter_chunks(source, chunk_size):
+                    file_size += len(chunk)
+                    if max_size is not None and file_size > max_size:
+                        raise ValueError(f"文件大小超过上限 {max_size} bytes")
+                    digest.update(chunk)
+                    await run_in_cache_io(f.write, chunk)
+            finally:
+                await run_in_cache_io(f.close)
+
+            content_hash = digest.hexdigest()
+            await run_in_cache_io(self._link_blob, tmp_path, content_hash, file_path)
+            await run_in_cache_io(self._write_metadata, file_id, file_path, extension, ttl, content_hash, file_size)
+
+            logger.debug(f"【TempFile:{self.namespace}】流式保存临时文件: {file_id} -> {file_path}, size={file_size}")
+            return file_id
+
+        except Exception as e:
+            logger.error(f"【TempFile:{self.namespace}】流式保存临时文件失败: file_id={file_id}, Error: {e}")
+            await run_in_cache_io(self._discard_partial, tmp_path, file_path)
+            return None
+
+    @staticmethod
+    async def _iter_chunks(source: Union[UploadFile, AsyncIterator[bytes]], chunk_size: int) -> AsyncIterator[bytes]:
+        if hasattr(source, "read"):
+            while True:
+                chunk = await source.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        else:
+            async for chunk in source:
+                if chunk:
+                    yield chunk
+
+    def _discard_partial(self, tmp_path: Optional[str], file_path: str) -> None:
+        """清理保存失败时可能产生的部分文件"""
+        for path in (tmp_path, file_path):
             try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                if os.path.exists(meta_path):
-                    os.remove(meta_path)
+                if path and os.path.exists(path):
+                    os.remove(path)
             except OSError:
                 pass
-            return None
 
     def get(self, file_id: str) -> Optional[str]:
         """获取临时文件路径。"""
 
-        meta_path = self._get_meta_path(file_id)
         self._check_and_run_cleanup()
 
-        if not os.path.exists(meta_path):
-            return None
-
         try:
-            with open(meta_path, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            metadata = self._index.get(file_id)
+            if metadata is None:
+                return None
 
-            file_path = metadata.get('file_path')
+            file_path = metadata['path']
 
             # 检查文件是否存在
             if file_path and os.path.exists(file_path):
@@ -168,32 +343,33 @@ class TempFile:
     def delete(self, file_id: str) -> bool:
         """删除临时文件。"""
 
-        meta_path = self._get_meta_path(file_id)
-
         try:
-            # 读取元数据获取文件路径
-            if os.path.exists(meta_path):
-                with open(meta_path, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                file_path = metadata.get('file_path')
-
-                # 删除文件
-                if file_path and os.path.exists(file_path):
-                    os.remove(file_path)
-
-                # 删除元数据
-                os.remove(meta_path)
-                logger.debug(f"【TempFile:{self.namespace}】删除临时文件: {file_id}")
-                return True
+            row = self._index.delete(file_id)
+            if row is None:
+                return True  # 文件不存在也视为删除成功
 
-            return True  # 文件不存在也视为删除成功
+            self._remove_file(*row)
+            logger.debug(f"【TempFile:{self.namespace}】删除临时文件: {file_id}")
+            return True
 
         except Exception as e:
             logger.error(f"【TempFile:{self.namespace}】删除临时文件失败: file_id={file_id}, Error: {e}")
             return False
 
+    def _remove_file(self, file_path: Optional[str], content_hash: Optional[str], released: bool) -> None:
+        """删除文件（指向 blob 的硬链接或副本），released 为 True 时 blob 已无引用，一并删除"""
+        if file_path:
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+        if released:
+            self._release_blob(content_hash)
+
     def _check_and_run_cleanup(self) -> None:
         """检查是否需要运行清理任务（每6小时清理一次）。"""
+        if not self.inline_cleanup:
+            return
 
         now = datetime.now(timezone.utc)
         if self._last_cleanup_time is None or (now - self._last_cleanup_time) >= timedelta(hours=6):
@@ -201,7 +377,7 @@ class TempFile:
             self.cleanup_expired()
             self._last_cleanup_time = now
 
-    def cleanup_expired(self) -> int:
+    def cleanup_expired(self, batch_size: int = 500) -> int:
         """清理所有过期的临时文件。"""
         if not os.path.exists(self.temp_dir):
             return 0
@@ -209,48 +385,64 @@ class TempFile:
         cleaned_count = 0
 
         try:
-            for filename in os.listdir(self.temp_dir):
-                if filename.endswith('.meta.json'):
-                    meta_path = os.path.join(self.temp_dir, filename)
-
+            while True:
+                expired = self._index.pop_expired(time.time(), batch_size)
+                for file_id, file_path, content_hash, released in expired:
                     try:
-                        with open(meta_path, 'r', encoding='utf-8') as f:
-                            metadata = json.load(f)
-
-                        expires_at_str = metadata.get('expires_at')
-                        if expires_at_str:
-                            expires_at = datetime.fromisoformat(expires_at_str)
-                            if datetime.now(timezone.utc) > expires_at:
-                                file_id = metadata.get('file_id')
-                                if file_id and self.delete(file_id):
-                                    cleaned_count += 1
-
-                    except (json.JSONDecodeError, KeyError, FileNotFoundError):
-                        continue
+                        self._remove_file(file_path, content_hash, released)
+                        cleaned_count += 1
                     except Exception as e:
-                        logger.warning(f"【TempFile:{self.namespace}】清理文件 {meta_path} 时出错: {e}")
+                        logger.warning(f"【TempFile:{self.namespace}】清理文件 {file_id} 时出错: {e}")
+                if len(expired) < batch_size:
+                    break
 
         except Exception as e:
             logger.error(f"【TempFile:{self.namespace}】执行清理任务时出错: {e}")
 
+        self._cleanup_orphans()
+
         if cleaned_count > 0:
             logger.info(f"【TempFile:{self.namespace}】清理了 {cleaned_count} 个过期临时文件")
 
         return cleaned_count
 
-    def clear_all(self) -> bool:
-        """清空命名空间下的所有临时文件。"""
-        if os.path.exists(self.temp_dir):
-            try:
-                shutil.rmtree(self.temp_dir)
-                logger.info(f"【TempFile:{self.namespace}】已清空所有临时文件: {self.temp_dir}")
-                self._ensure_temp_dir()
-                return True
-            except OSError as e:
-                logger.error(f"【TempFile:{self.namespace}】清空临时文件失败: {self.temp_dir}, Error: {e}")
-                return False
+    def _cleanup_orphans(self, grace_seconds: int = 3600) -> None:
+        """删除中断上传遗留在 .incoming 下的临时文件。
 
-        return True
+        .incoming 只包含正在写入的文件，数量与并发上传数相当；blob 由引用数回收，不需要扫描。
+        只处理超过 grace_seconds 未修改的文件，避免误删正在写入的文件。
+        """
+        if not os.path.exists(self.incoming_dir):
+            return
+        deadline = time.time() - grace_seconds
+        with os.scandir(self.incoming_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < deadline:
+                        os.remove(entry.path)
+                except OSError:
+                    continue
+
+    def clear_all(self) -> bool:
+        """清空命名空间下的所有临时文件，索引连接保持打开，只清空其中的记录。"""
+        if not os.path.exists(self.temp_dir):
+            return True
+        try:
+            self._index.clear()
+            index_name = os.path.basename(self._index.db_path)
+            with os.scandir(self.temp_dir) as entries:
+                for entry in entries:
+                    if entry.name.startswith(index_name):
+                        continue  # index.db 及其 -wal / -shm 文件
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path)
+                    else:
+                        os.remove(entry.path)
+            logger.info(f"【TempFile:{self.namespace}】已清空所有临时文件: {self.temp_dir}")
+            return True
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"【TempFile:{self.namespace}】清空临时文件失败: {self.temp_dir}, Error: {e}")
+            return False
 
     def exists(self, file_id: str) -> bool:
         """检查临时文件是否存在且未过期。"""
@@ -258,28 +450,51 @@ class TempFile:
 
     def get_file_info(self, file_id: str) -> Optional[dict]:
         """获取临时文件的元数据信息。"""
-        meta_path = self._get_meta_path(file_id)
-
-        if not os.path.exists(meta_path):
-            return None
-
         try:
-            with open(meta_path, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            row = self._index.get(file_id)
+            if row is None:
+                return None
 
             # 检查是否过期
-            expires_at_str = metadata.get('expires_at')
-            if expires_at_str:
-                expires_at = datetime.fromisoformat(expires_at_str)
-                if datetime.now(timezone.utc) > expires_at:
-                    return None
+            if row['expires_at'] is not None and time.time() > row['expires_at']:
+                return None
 
-            return metadata
+            return {
+                'file_id': row['file_id'],
+                'file_path': row['path'],
+                'extension': row['extension'],
+                'created_at': datetime.fromtimestamp(row['created_at'], timezone.utc).isoformat(),
+                'expires_at': (datetime.fromtimestamp(row['expires_at'], timezone.utc).isoformat()
+                               if row['expires_at'] is not None else None),
+                'file_size': row['size'],
+                'content_hash': row['content_hash'],
+            }
 
         except Exception as e:
             logger.error(f"【TempFile:{self.namespace}】获取文件信息失败: file_id={file_id}, Error: {e}")
             return None
 
+    async def asave(self, file_obj: bytes, extension: str = "",
+                    ttl: Optional[timedelta] = None, file_id: Optional[str] = None) -> Optional[str]:
+        """save 的异步版本，在缓存 I/O 线程池中执行。"""
+        return await run_in_cache_io(self.save, file_obj, extension, ttl, file_id)
+
+    async def aget(self, file_id: str) -> Optional[str]:
+        """get 的异步版本。"""
+        return await run_in_cache_io(self.get, file_id)
+
+    async def adelete(self, file_id: str) -> bool:
+        """delete 的异步版本。"""
+        return await run_in_cache_io(self.delete, file_id)
+
+    async def aget_file_info(self, file_id: str) -> Optional[dict]:
+        """get_file_info 的异步版本。"""
+        return await run_in_cache_io(self.get_file_info, file_id)
+
+    async def acleanup_expired(self) -> int:
+        """cleanup_expired 的异步版本。"""
+        return await run_in_cache_io(self.cleanup_expired)
+
 
 @lru_cache()
 def get_temp_file_manager(namespace: str = "files",
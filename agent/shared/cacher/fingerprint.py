@@ -0,0 +1,103 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：fingerprint
+# @Date   ：2026/10/19 21:10
+# @Author ：leemysw
+
+# 2026/10/19 21:10   Create
+# 文件指纹
+# =====================================================
+
+import hashlib
+import os
+from typing import Callable, Optional, Tuple
+
+from agent.core.config import settings
+from agent.shared.cacher.io_executor import run_in_cache_io
+from agent.shared.cacher.memory_cache import LRUCache
+
+try:
+    import xxhash
+except ImportError:  # 未安装 xxhash 时使用标准库 blake2b
+    xxhash = None
+
+_BUFFER_SIZE = 1024 * 1024
+
+
+def _new_hasher(algorithm: str):
+    if algorithm == "xxh3":
+        if xxhash is None:
+            raise ValueError("xxhash is not installed, use algorithm='blake2b'")
+        return xxhash.xxh3_128()
+    if algorithm == "blake2b":
+        return hashlib.blake2b(digest_size=16)
+    return hashlib.new(algorithm)
+
+
+def default_algorithm() -> str:
+    return settings.FILE_FINGERPRINT_ALGORITHM or ("xxh3" if xxhash is not None else "blake2b")
+
+
+class FileFingerprinter:
+    """计算文件内容指纹，并按 (st_dev, st_ino, st_size, st_mtime_ns) 记住结果，未修改的文件不会重复读取。
+
+    指纹用于缓存键，不用于安全校验，默认使用非加密哈希；
+    同一秒内原地覆盖且大小不变的文件依赖 st_mtime_ns 的精度区分。
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self._memo = LRUCache(max_entries=max_entries)
+
+    @staticmethod
+    def _stat_key(st: os.stat_result, algorithm: str) -> Tuple:
+        return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, algorithm
+
+    def fingerprint(self, file_path: str, algorithm: Optional[str] = None) -> str:
+        """返回文件内容的十六进制指纹
+
+        Args:
+            file_path: 文件路径
+            algorithm: xxh3 / blake2b / 任意 hashlib 算法名，默认按 settings.FILE_FINGERPRINT_ALGORITHM
+        """
+        algorithm = algorithm or default_algorithm()
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"文件不存在: {file_path}")
+
+        memo_key = self._stat_key(st, algorithm)
+        digest = self._memo.get(memo_key)
+        if digest is not None:
+            return digest
+
+        hasher = _new_hasher(algorithm)
+        buffer = bytearray(_BUFFER_SIZE)
+        view = memoryview(buffer)
+        with open(file_path, "rb", buffering=0) as f:
+            # 读取期间文件被修改时以读取前的 stat 为准，下次 stat 变化会重新计算
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                hasher.update(view[:n])
+        digest = hasher.hexdigest()
+
+        self._memo.set(memo_key, digest)
+        return digest
+
+    async def afingerprint(self, file_path: str, algorithm: Optional[str] = None) -> str:
+        """fingerprint 的异步版本，在缓存 I/O 线程池中读取文件"""
+        return await run_in_cache_io(self.fingerprint, file_path, algorithm)
+
+    def clear(self) -> None:
+        self._memo.clear()
+
+    def stats(self):
+        return self._memo.stats()
+
+
+# 全局实例
+file_fingerprinter = FileFingerprinter(max_entries=settings.FILE_FINGERPRINT_MEMO_SIZE)
+fingerprint_file: Callable[..., str] = file_fingerprinter.fingerprint
+afingerprint_file = file_fingerprinter.afingerprint
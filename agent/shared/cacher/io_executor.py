@@ -0,0 +1,54 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：io_executor
+# @Date   ：2026/10/19 17:40
+# @Author ：leemysw
+
+# 2026/10/19 17:40   Create
+# =====================================================
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from agent.core.config import settings
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_cache_io_executor() -> ThreadPoolExecutor:
+    """缓存文件 I/O 专用线程池。
+
+    与 asyncio 默认线程池隔离，线程数有上限，大量缓存读写排队时不会占满默认线程池，
+    也不会无限制地并发打到磁盘上。
+    """
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.CACHE_IO_WORKERS, thread_name_prefix="cache-io")
+    return _executor
+
+
+async def run_in_cache_io(func: Callable[..., T], *args, **kwargs) -> T:
+    """在缓存 I/O 线程池中执行同步函数，不阻塞事件循环"""
+    loop = asyncio.get_running_loop()
+    if kwargs:
+        func = functools.partial(func, **kwargs)
+    return await loop.run_in_executor(get_cache_io_executor(), func, *args)
+
+
+def shutdown_cache_io_executor() -> None:
+    """关闭线程池，阻塞等待已提交的 I/O 完成；在事件循环中应通过 asyncio.to_thread 调用"""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -0,0 +1,126 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：memory_cache
+# @Date   ：2026/10/19 16:05
+# @Author ：leemysw
+
+# 2026/10/19 16:05   Create
+# =====================================================
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """线程安全的进程内 LRU 缓存。
+
+    容量同时受条目数和字节数限制（字节数由调用方在 set 时给出），条目可设置 TTL。
+    缓存的是对象引用，调用方不应修改取出的值。
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 0, default_ttl: Optional[float] = None):
+        """
+        Args:
+            max_entries: 最大条目数，0 表示不限制
+            max_bytes: 最大字节数，0 表示不限制
+            default_ttl: 默认过期时间(秒)，None 表示不过期
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+
+        # key -> (value, size, expires_at)，expires_at 为 time.monotonic() 时间
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, size, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, size: int = 0) -> bool:
+        """写入缓存，单个条目超过字节上限时不缓存并返回 False"""
+        if self.max_bytes and size > self.max_bytes:
+            self.delete(key)
+            return False
+
+        ttl = ttl if ttl is not None else self.default_ttl
+        if ttl is not None and ttl <= 0:
+            self.delete(key)
+            return False
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, size, expires_at)
+            self._bytes += size
+            self._evict()
+        return True
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+                return True
+            return False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def _evict(self) -> None:
+        while self._data and (
+                (self.max_entries and len(self._data) > self.max_entries) or
+                (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            _, (_, size, _) = self._data.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and (entry[2] is None or time.monotonic() < entry[2])
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+        }
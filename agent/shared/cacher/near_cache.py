@@ -0,0 +1,210 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：near_cache
+# @Date   ：2026/10/19 20:20
+# @Author ：leemysw
+
+# 2026/10/19 20:20   Create
+# =====================================================
+
+import asyncio
+import threading
+import uuid
+from typing import Any, Dict, Iterable, Optional
+
+from agent.shared.cacher.memory_cache import LRUCache
+from agent.utils.logger import logger
+from agent.utils.metrics import registry
+
+NEAR_CACHE_REQUESTS = registry.counter(
+    "near_cache_requests_total", "Near cache lookups by result", ("cache", "result"))
+NEAR_CACHE_INVALIDATIONS = registry.counter(
+    "near_cache_invalidations_total", "Near cache invalidations by source", ("cache", "source"))
+
+_FLUSH_ALL = "*"
+_MISSING = object()
+
+
+class NearCache:
+    """Redis 缓存的进程内近端缓存。
+
+    读取命中时直接返回本地值；本进程写入时删除本地值并向失效频道发布 key，
+    其他 worker 收到消息后删除各自的本地值。
+    pub/sub 不保证送达，本地 TTL 是失效消息丢失或 key 在服务端自然过期时的最长不一致时间；
+    订阅连接断开重连后清空本地缓存。
+    """
+
+    def __init__(self, name: str, channel: str, max_entries: int = 1024, ttl: float = 5.0):
+        """
+        Args:
+            name: 缓存名，用于指标标签
+            channel: 失效通知频道
+            max_entries: 本地最大条目数
+            ttl: 本地条目最长存活时间(秒)
+        """
+        self.name = name
+        self.channel = channel
+        self._local = LRUCache(max_entries=max_entries, default_ttl=ttl)
+        self._origin = uuid.uuid4().hex
+        self._listener: Optional[Any] = None
+        self._listener_lock = threading.Lock()
+        self._subscribed: Optional[asyncio.Event] = None
+        self.invalidations = 0
+        # 每次失效递增，读取服务端期间发生过失效时不回填本地缓存，避免写回旧值
+        self.generation = 0
+
+    # ---------------- 本地读写 ----------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._local.get(key, _MISSING)
+        if value is _MISSING:
+            NEAR_CACHE_REQUESTS.inc(cache=self.name, result="miss")
+            return default
+        NEAR_CACHE_REQUESTS.inc(cache=self.name, result="hit")
+        return value
+
+    def set(self, key: str, value: Any, generation: Optional[int] = None) -> None:
+        """回填本地缓存，generation 为读取服务端前的 self.generation"""
+        if generation is not None and generation != self.generation:
+            return
+        self._local.set(key, value)
+
+    def invalidate_local(self, keys: Iterable[str], source: str = "local") -> None:
+        self.generation += 1
+        count = 0
+        for key in keys:
+            if key == _FLUSH_ALL:
+                self._local.clear()
+            else:
+                self._local.delete(key)
+            count += 1
+        if count:
+            self.invalidations += count
+            NEAR_CACHE_INVALIDATIONS.inc(count, cache=self.name, source=source)
+
+    def clear(self, source: str = "local") -> None:
+        self.invalidate_local([_FLUSH_ALL], source=source)
+
+    # ---------------- 失效消息 ----------------
+
+    def encode_message(self, keys: Iterable[str]) -> str:
+        return "\n".join([self._origin, *keys])
+
+    def handle_message(self, data: Any) -> None:
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        if not isinstance(data, str):
+            return
+        origin, _, body = data.partition("\n")
+        if origin == self._origin or not body:
+            return  # 本进程写入时已删除本地值
+        self.invalidate_local(body.split("\n"), source="remote")
+
+    def publish(self, client, keys: Iterable[str]) -> None:
+        """同步客户端写入后调用"""
+        keys = list(keys)
+        self.invalidate_local(keys)
+        try:
+            client.publish(self.channel, self.encode_message(keys))
+        except Exception as e:
+            logger.warning(f"【NearCache:{self.name}】发布失效消息失败: {e}")
+
+    async def apublish(self, client, keys: Iterable[str]) -> None:
+        """异步客户端写入后调用"""
+        keys = list(keys)
+        self.invalidate_local(keys)
+        try:
+            await client.publish(self.channel, self.encode_message(keys))
+        except Exception as e:
+            logger.warning(f"【NearCache:{self.name}】发布失效消息失败: {e}")
+
+    # ---------------- 订阅 ----------------
+
+    def ensure_listener(self, client) -> bool:
+        """为同步客户端启动订阅线程，订阅失败时返回 False，调用方应绕过近端缓存"""
+        if self._listener is not None:
+            return True
+        with self._listener_lock:
+            if self._listener is not None:
+                return True
+
+            def on_message(message: Dict[str, Any]) -> None:
+                self.handle_message(message.get("data"))
+
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{self.channel: on_message})
+            except Exception as e:
+                logger.warning(f"【NearCache:{self.name}】订阅失效频道失败，暂不使用近端缓存: {e}")
+                return False
+            self._listener = pubsub.run_in_thread(sleep_time=1.0, daemon=True,
+                                                  exception_handler=self._on_sync_error)
+            return True
+
+    def _on_sync_error(self, exc: BaseException, pubsub, worker_thread) -> None:
+        # 订阅连接异常期间可能漏掉失效消息，清空本地缓存；redis-py 下一次 get_message 会重连并重新订阅
+        logger.warning(f"【NearCache:{self.name}】订阅连接异常，清空本地缓存: {exc}")
+        self.clear(source="reconnect")
+
+    async def aensure_listener(self, client) -> bool:
+        """为异步客户端在当前事件循环中启动订阅任务，订阅建立前返回 False，调用方应绕过近端缓存
+
+        任务已结束或属于其他事件循环（如测试或 worker 重建了事件循环）时重新创建，
+        期间可能漏掉失效消息，同时清空本地缓存
+        """
+        loop = asyncio.get_running_loop()
+        listener = self._listener
+        if listener is None or (
+                isinstance(listener, asyncio.Task) and (listener.done() or listener.get_loop() is not loop)):
+            if listener is not None:
+                self._retire_listener(listener)
+                self.clear(source="reconnect")
+            subscribed = self._subscribed = asyncio.Event()
+            self._listener = asyncio.create_task(self._listen(client, subscribed), name=f"near-cache:{self.name}")
+        return self._subscribed.is_set()
+
+    @staticmethod
+    def _retire_listener(listener: asyncio.Task) -> None:
+        """取消旧事件循环中的订阅任务，事件循环已关闭时任务随之废弃"""
+        if listener.done():
+            return
+        listener_loop = listener.get_loop()
+        if listener_loop.is_running() and not listener_loop.is_closed():
+            listener_loop.call_soon_threadsafe(listener.cancel)
+
+    async def _listen(self, client, subscribed: asyncio.Event) -> None:
+        while True:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                subscribed.set()
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.handle_message(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"【NearCache:{self.name}】订阅连接异常，清空本地缓存: {e}")
+                subscribed.clear()
+                self.clear(source="reconnect")
+                await asyncio.sleep(1.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def aclose(self) -> None:
+        listener, self._listener = self._listener, None
+        if isinstance(listener, asyncio.Task):
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+        elif listener is not None:
+            listener.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._local.stats()
+        stats["invalidations"] = self.invalidations
+        return stats
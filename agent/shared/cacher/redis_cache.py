@@ -10,38 +10,53 @@
 
 import json
 from functools import lru_cache
-from typing import Optional, Union
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
 
 import redis
+from redis import asyncio as aioredis
+from redis.asyncio.cluster import RedisCluster as AioRedisCluster
 from redis.cluster import RedisCluster as RedisCluster
 
 from agent.core.config import settings
+from agent.shared.cacher.near_cache import NearCache
 
+_MISSING = object()
 
-class RedisCache:
-    """同步Redis缓存封装类"""
 
-    def __init__(
-            self,
-            redis_client: Union[redis.Redis, RedisCluster],
-            expire: Optional[int] = None,
-            prefix: Optional[str] = None
-    ):
-        """
-        初始化同步Redis缓存
+class _BaseRedisCache:
+    """Redis缓存公共逻辑：key前缀、值转换与近端缓存"""
 
+    def __init__(self, expire: Optional[int] = None, prefix: Optional[str] = None, hash_tag: bool = False,
+                 near_cache_size: int = 0, near_cache_ttl: float = 5.0):
+        """
         Args:
-            redis_client: 同步Redis客户端实例(必须)
             expire: 默认过期时间(秒)
             prefix: key前缀
+            hash_tag: 是否将前缀作为集群 hash tag（{前缀}:key），
+                开启后同一前缀下的 key 落在同一个 slot，集群模式下也可以使用 MGET / 事务
+            near_cache_size: 进程内近端缓存条目数，0 表示关闭；开启后 get 类操作优先读本地，
+                写入通过 pub/sub 通知其他 worker 失效
+            near_cache_ttl: 近端缓存条目最长存活时间(秒)
         """
-        self._client = redis_client
-
         self.expire = expire
         self.nx = False
         self.xx = False
-        self.prefix = f"{settings.PROJECT_NAME}:algorithm:{prefix}" if prefix else f"{settings.PROJECT_NAME}:algorithm"
+        prefix = f"{settings.PROJECT_NAME}:algorithm:{prefix}" if prefix else f"{settings.PROJECT_NAME}:algorithm"
+        self.prefix = f"{{{prefix}}}" if hash_tag else prefix
+        self.hash_tag = hash_tag
+
+        self._near: Optional[NearCache] = None
+        if near_cache_size > 0:
+            self._near = NearCache(
+                name=self.prefix,
+                channel=f"{self.prefix}:__near_cache_invalidate__",
+                max_entries=near_cache_size,
+                ttl=near_cache_ttl,
+            )
 
+    def near_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """近端缓存命中与失效统计，未开启时返回None"""
+        return self._near.stats() if self._near is not None else None
 
     @staticmethod
     def to_text(value, encoding="utf-8"):
@@ -62,11 +77,77 @@ class RedisCache:
             return key
         return f"{self.prefix}:{key}"
 
+    def _near_mget(self, keys: List[str], use_near: bool):
+        """先从近端缓存读取，返回 (值列表, 未命中的下标)"""
+        if not use_near:
+            return [None] * len(keys), list(range(len(keys)))
+        values, missing = [], []
+        for i, key in enumerate(keys):
+            value = self._near.get(key, _MISSING)
+            if value is _MISSING:
+                missing.append(i)
+                value = None
+            values.append(value)
+        return values, missing
+
+    def _near_fill(self, keys: List[str], values: List[Optional[str]], missing: List[int],
+                   fetched: Sequence[Any], generation: Optional[int]) -> None:
+        """将服务端读取结果写入值列表，generation 不为 None 时回填近端缓存"""
+        for i, value in zip(missing, fetched):
+            value = self.to_text(value)
+            values[i] = value
+            if generation is not None:
+                self._near.set(keys[i], value, generation)
+
+    @staticmethod
+    def loads_json(value: Optional[str]) -> Optional[Any]:
+        """解析JSON文本，解析失败返回None"""
+        if not value:
+            return None
+        try:
+            return json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return None
+
+
+class RedisCache(_BaseRedisCache):
+    """同步Redis缓存封装类"""
+
+    def __init__(
+            self,
+            redis_client: Union[redis.Redis, RedisCluster],
+            expire: Optional[int] = None,
+            prefix: Optional[str] = None,
+            hash_tag: bool = False,
+            near_cache_size: int = 0,
+            near_cache_ttl: float = 5.0
+    ):
+        """
+        初始化同步Redis缓存
+
+        Args:
+            redis_client: 同步Redis客户端实例(必须)
+            expire: 默认过期时间(秒)
+            prefix: key前缀
+            hash_tag: 是否将前缀作为集群 hash tag
+            near_cache_size: 进程内近端缓存条目数，0 表示关闭
+            near_cache_ttl: 近端缓存条目最长存活时间(秒)
+        """
+        super().__init__(expire=expire, prefix=prefix, hash_tag=hash_tag,
+                         near_cache_size=near_cache_size, near_cache_ttl=near_cache_ttl)
+        self._client = redis_client
+
+    def _invalidate(self, *keys: str) -> None:
+        if self._near is not None:
+            self._near.publish(self._client, keys)
+
     def set(self, name: str, value: str, ex: Optional[int] = None) -> bool:
         """设置缓存"""
         name = self.key_name(name)
         ex = ex or self.expire
-        return self._client.set(name, value, ex=ex, nx=self.nx, xx=self.xx)
+        ret = self._client.set(name, value, ex=ex, nx=self.nx, xx=self.xx)
+        self._invalidate(name)
+        return ret
 
     def set_json(self, name: str, value: dict, ex: Optional[int] = None) -> bool:
         """设置JSON缓存"""
@@ -77,8 +158,16 @@ class RedisCache:
     def get(self, name: str) -> Optional[str]:
         """获取缓存"""
         name = self.key_name(name)
-        ret = self._client.get(name)
-        return self.to_text(ret)
+        if self._near is None or not self._near.ensure_listener(self._client):
+            return self.to_text(self._client.get(name))
+
+        ret = self._near.get(name, _MISSING)
+        if ret is not _MISSING:
+            return ret
+        generation = self._near.generation
+        ret = self.to_text(self._client.get(name))
+        self._near.set(name, ret, generation)
+        return ret
 
     def get_json(self, name: str) -> Optional[dict]:
         """获取JSON缓存"""
@@ -91,6 +180,34 @@ class RedisCache:
                 return None
         return None
 
+    def mget_json(self, names: Sequence[str]) -> List[Optional[Any]]:
+        """批量获取JSON缓存，结果与 names 顺序一致"""
+        if not names:
+            return []
+        keys = [self.key_name(name) for name in names]
+        use_near = self._near is not None and self._near.ensure_listener(self._client)
+        values, missing = self._near_mget(keys, use_near)
+        if missing:
+            generation = self._near.generation if use_near else None
+            missing_keys = [keys[i] for i in missing]
+            if isinstance(self._client, RedisCluster) and not self.hash_tag:
+                fetched = self._client.mget_nonatomic(missing_keys)
+            else:
+                fetched = self._client.mget(missing_keys)
+            self._near_fill(keys, values, missing, fetched, generation)
+        return [self.loads_json(value) for value in values]
+
+    def mset_json(self, mapping: Mapping[str, Any], ex: Optional[int] = None) -> None:
+        """批量设置JSON缓存，通过 pipeline 一次往返完成"""
+        if not mapping:
+            return
+        ex = ex or self.expire
+        with self._client.pipeline(transaction=False) as pipe:
+            for name, value in mapping.items():
+                pipe.set(self.key_name(name), json.dumps(value, ensure_ascii=False), ex=ex)
+            pipe.execute()
+        self._invalidate(*(self.key_name(name) for name in mapping))
+
     def hget(self, name: str, key: str) -> Optional[str]:
         """获取Hash字段"""
         name = self.key_name(name)
@@ -105,7 +222,9 @@ class RedisCache:
     def delete(self, *names: str) -> int:
         """删除缓存"""
         keys = [self.key_name(name) for name in names]
-        return self._client.delete(*keys)
+        ret = self._client.delete(*keys)
+        self._invalidate(*keys)
+        return ret
 
     def exists(self, name: str) -> bool:
         """检查key是否存在"""
@@ -124,15 +243,190 @@ class RedisCache:
         return self._client.ttl(name)
 
 
+class AsyncRedisCache(_BaseRedisCache):
+    """异步Redis缓存封装类，支持批量读写与 pipeline"""
+
+    def __init__(
+            self,
+            redis_client: Union[aioredis.Redis, AioRedisCluster],
+            expire: Optional[int] = None,
+            prefix: Optional[str] = None,
+            hash_tag: bool = False,
+            near_cache_size: int = 0,
+            near_cache_ttl: float = 5.0
+    ):
+        """
+        初始化异步Redis缓存
+
+        Args:
+            redis_client: 异步Redis客户端实例(必须)
+            expire: 默认过期时间(秒)
+            prefix: key前缀
+            hash_tag: 是否将前缀作为集群 hash tag
+            near_cache_size: 进程内近端缓存条目数，0 表示关闭
+            near_cache_ttl: 近端缓存条目最长存活时间(秒)
+        """
+        super().__init__(expire=expire, prefix=prefix, hash_tag=hash_tag,
+                         near_cache_size=near_cache_size, near_cache_ttl=near_cache_ttl)
+        self._client = redis_client
+        self._cluster = isinstance(redis_client, AioRedisCluster)
+
+    async def _invalidate(self, *keys: str) -> None:
+        if self._near is not None:
+            await self._near.apublish(self._client, keys)
+
+    async def _near_ready(self) -> bool:
+        """近端缓存已开启且失效订阅已建立"""
+        return self._near is not None and await self._near.aensure_listener(self._client)
+
+    async def close(self) -> None:
+        """停止近端缓存订阅"""
+        if self._near is not None:
+            await self._near.aclose()
+
+    async def set(self, name: str, value: str, ex: Optional[int] = None) -> bool:
+        """设置缓存"""
+        name = self.key_name(name)
+        ex = ex or self.expire
+        ret = await self._client.set(name, value, ex=ex, nx=self.nx, xx=self.xx)
+        await self._invalidate(name)
+        return ret
+
+    async def set_json(self, name: str, value: Any, ex: Optional[int] = None) -> bool:
+        """设置JSON缓存"""
+        return await self.set(name, json.dumps(value, ensure_ascii=False), ex=ex)
+
+    async def get(self, name: str) -> Optional[str]:
+        """获取缓存"""
+        name = self.key_name(name)
+        if not await self._near_ready():
+            return self.to_text(await self._client.get(name))
+
+        ret = self._near.get(name, _MISSING)
+        if ret is not _MISSING:
+            return ret
+        generation = self._near.generation
+        ret = self.to_text(await self._client.get(name))
+        self._near.set(name, ret, generation)
+        return ret
+
+    async def get_json(self, name: str) -> Optional[Any]:
+        """获取JSON缓存"""
+        return self.loads_json(await self.get(name))
+
+    async def mget(self, names: Sequence[str]) -> List[Optional[str]]:
+        """批量获取缓存，结果与 names 顺序一致，一次往返
+
+        集群模式下未开启 hash tag 时 key 可能分布在不同 slot，按 slot 拆分请求
+        """
+        if not names:
+            return []
+        keys = [self.key_name(name) for name in names]
+        use_near = await self._near_ready()
+        values, missing = self._near_mget(keys, use_near)
+        if missing:
+            generation = self._near.generation if use_near else None
+            missing_keys = [keys[i] for i in missing]
+            if self._cluster and not self.hash_tag:
+                fetched = await self._client.mget_nonatomic(missing_keys)
+            else:
+                fetched = await self._client.mget(missing_keys)
+            self._near_fill(keys, values, missing, fetched, generation)
+        return values
+
+    async def mget_json(self, names: Sequence[str]) -> List[Optional[Any]]:
+        """批量获取JSON缓存，结果与 names 顺序一致"""
+        return [self.loads_json(value) for value in await self.mget(names)]
+
+    async def mset_json(self, mapping: Mapping[str, Any], ex: Optional[int] = None) -> None:
+        """批量设置JSON缓存，通过 pipeline 一次往返完成（每个 key 单独设置过期时间）"""
+        if not mapping:
+            return
+        ex = ex or self.expire
+        async with self._client.pipeline(transaction=False) as pipe:
+            for name, value in mapping.items():
+                pipe.set(self.key_name(name), json.dumps(value, ensure_ascii=False), ex=ex)
+            await pipe.execute()
+        await self._invalidate(*(self.key_name(name) for name in mapping))
+
+    async def hget(self, name: str, key: str) -> Optional[str]:
+        """获取Hash字段"""
+        name = self.key_name(name)
+        ret = await self._client.hget(name, key)
+        return self.to_text(ret)
+
+    async def hgetall(self, name: str) -> Dict[str, str]:
+        """获取Hash全部字段"""
+        name = self.key_name(name)
+        ret = await self._client.hgetall(name)
+        return {self.to_text(k): self.to_text(v) for k, v in ret.items()}
+
+    async def hset(self, name: str, key: Optional[str] = None, value: Optional[str] = None,
+                   mapping: Optional[Mapping[str, str]] = None, ex: Optional[int] = None) -> int:
+        """设置Hash字段，指定过期时间时 HSET 与 EXPIRE 在同一个 pipeline 中发送"""
+        name = self.key_name(name)
+        ex = ex or self.expire
+        if not ex:
+            return await self._client.hset(name, key, value, mapping=mapping)
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.hset(name, key, value, mapping=mapping)
+            pipe.expire(name, ex)
+            added, _ = await pipe.execute()
+        return added
+
+    async def delete(self, *names: str) -> int:
+        """删除缓存"""
+        if not names:
+            return 0
+        keys = [self.key_name(name) for name in names]
+        ret = await self._client.delete(*keys)
+        await self._invalidate(*keys)
+        return ret
+
+    async def exists(self, name: str) -> bool:
+        """检查key是否存在"""
+        name = self.key_name(name)
+        result = await self._client.exists(name)
+        return result > 0
+
+    async def expire_key(self, name: str, seconds: int) -> bool:
+        """设置key过期时间"""
+        name = self.key_name(name)
+        return await self._client.expire(name, seconds)
+
+    async def ttl(self, name: str) -> int:
+        """获取key剩余过期时间"""
+        name = self.key_name(name)
+        return await self._client.ttl(name)
+
+
 @lru_cache()
-def get_cache_instance(prefix: str=None) -> RedisCache:
+def get_cache_instance(prefix: str=None, near_cache_size: int = 0) -> RedisCache:
     """获取缓存管理器实例。
     Args:
         prefix: 缓存key前缀
+        near_cache_size: 进程内近端缓存条目数，0 表示关闭
 
     Returns:
         缓存管理器实例
     """
     from agent.shared.database.get_redis import get_redis_client
     redis_client = get_redis_client()
-    return RedisCache(redis_client, prefix=prefix)
\ No newline at end of file
+    return RedisCache(redis_client, prefix=prefix, near_cache_size=near_cache_size)
+
+
+@lru_cache()
+def get_async_cache_instance(prefix: str = None, hash_tag: bool = False,
+                             near_cache_size: int = 0) -> AsyncRedisCache:
+    """获取异步缓存管理器实例。
+    Args:
+        prefix: 缓存key前缀
+        hash_tag: 是否将前缀作为集群 hash tag
+        near_cache_size: 进程内近端缓存条目数，0 表示关闭
+
+    Returns:
+        异步缓存管理器实例
+    """
+    from agent.shared.database.get_redis import get_aioredis_client
+    redis_client = get_aioredis_client()
+    return AsyncRedisCache(redis_client, prefix=prefix, hash_tag=hash_tag, near_cache_size=near_cache_size)
@@ -0,0 +1,161 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：temp_file_index
+# @Date   ：2026/10/19 19:00
+# @Author ：leemysw
+
+# 2026/10/19 19:00   Create
+# =====================================================
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from agent.utils.logger import logger
+
+_COLUMNS = ("file_id", "path", "extension", "size", "content_hash", "created_at", "expires_at")
+
+
+class TempFileIndex:
+    """TempFile 的 SQLite 元数据表，每个命名空间一个。
+
+    按 file_id 查询走主键，过期清理走 expires_at 索引并通过
+    DELETE ... RETURNING 一次取回需要删除的文件路径。
+    blobs 表记录每个 blob 被多少个 file_id 引用，与 files 在同一事务中更新，
+    写入和删除返回引用数降为 0 的 blob，由调用方删除文件。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.open()
+
+    def open(self) -> None:
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"【TempFileIndex】设置 WAL 模式失败: {self.db_path}, Error: {e}")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " file_id TEXT PRIMARY KEY,"
+            " path TEXT NOT NULL,"
+            " extension TEXT NOT NULL DEFAULT '',"
+            " size INTEGER NOT NULL DEFAULT 0,"
+            " content_hash TEXT,"
+            " created_at REAL NOT NULL,"
+            " expires_at REAL"
+            ")"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_files_expires_at ON files (expires_at)")
+        has_blobs = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'blobs'").fetchone()
+        if not has_blobs:
+            # 旧版索引按已有记录初始化引用数
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("CREATE TABLE IF NOT EXISTS blobs (content_hash TEXT PRIMARY KEY, refs INTEGER NOT NULL)")
+            conn.execute(
+                "INSERT OR IGNORE INTO blobs (content_hash, refs)"
+                " SELECT content_hash, COUNT(*) FROM files WHERE content_hash IS NOT NULL GROUP BY content_hash")
+            conn.execute("COMMIT")
+        self._conn = conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    _UPSERT_SQL = (
+        f"INSERT OR REPLACE INTO files ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+    )
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _acquire(conn: sqlite3.Connection, content_hash: Optional[str]) -> None:
+        if content_hash:
+            conn.execute(
+                "INSERT INTO blobs (content_hash, refs) VALUES (?, 1)"
+                " ON CONFLICT (content_hash) DO UPDATE SET refs = refs + 1", (content_hash,))
+
+    @staticmethod
+    def _release(conn: sqlite3.Connection, content_hash: Optional[str]) -> bool:
+        """引用数减一，降为 0 时删除记录并返回 True"""
+        if not content_hash:
+            return False
+        rows = conn.execute(
+            "UPDATE blobs SET refs = refs - 1 WHERE content_hash = ? RETURNING refs", (content_hash,)).fetchall()
+        if not rows or rows[0][0] > 0:
+            return False
+        conn.execute("DELETE FROM blobs WHERE content_hash = ?", (content_hash,))
+        return True
+
+    def put(self, file_id: str, path: str, extension: str, size: int, content_hash: Optional[str],
+            created_at: float, expires_at: Optional[float]) -> List[str]:
+        """写入记录并增加 blob 引用，返回被覆盖的旧记录释放后不再被引用的 blob"""
+        with self._transaction() as conn:
+            old = conn.execute("SELECT content_hash FROM files WHERE file_id = ?", (file_id,)).fetchone()
+            conn.execute(self._UPSERT_SQL, (file_id, path, extension, size, content_hash, created_at, expires_at))
+            self._acquire(conn, content_hash)
+            if old is not None and self._release(conn, old[0]):
+                return [old[0]]
+        return []
+
+    def put_many(self, rows: Iterable[Tuple]) -> None:
+        with self._transaction() as conn:
+            for row in rows:
+                if conn.execute("SELECT 1 FROM files WHERE file_id = ?", (row[0],)).fetchone():
+                    continue
+                conn.execute(self._UPSERT_SQL, row)
+                self._acquire(conn, row[4])
+
+    def get(self, file_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM files WHERE file_id = ?", (file_id,)).fetchone()
+        return dict(zip(_COLUMNS, row)) if row else None
+
+    def delete(self, file_id: str) -> Optional[Tuple[str, Optional[str], bool]]:
+        """删除记录，返回 (path, content_hash, blob 是否已无引用)，记录不存在时返回 None"""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "DELETE FROM files WHERE file_id = ? RETURNING path, content_hash", (file_id,)).fetchall()
+            if not rows:
+                return None
+            path, content_hash = rows[0]
+            return path, content_hash, self._release(conn, content_hash)
+
+    def pop_expired(self, now: float, limit: int) -> List[Tuple[str, str, Optional[str], bool]]:
+        """删除最多 limit 条已过期记录，返回 (file_id, path, content_hash, blob 是否已无引用)"""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "DELETE FROM files WHERE file_id IN ("
+                " SELECT file_id FROM files WHERE expires_at < ? LIMIT ?"
+                ") RETURNING file_id, path, content_hash",
+                (now, limit),
+            ).fetchall()
+            return [(file_id, path, content_hash, self._release(conn, content_hash))
+                    for file_id, path, content_hash in rows]
+
+    def clear(self) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM files")
+            conn.execute("DELETE FROM blobs")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
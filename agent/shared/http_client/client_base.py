@@ -9,16 +9,19 @@
 # =====================================================
 
 import os
-import ssl
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Optional, Union
+from urllib.parse import urlsplit
 
-import aiohttp
-import certifi
 import requests
 from aiohttp import ClientTimeout
 
 from agent.core.config import settings
+from agent.shared.http_client.resilience import ResiliencePolicy, UpstreamStatusError, parse_retry_after
+from agent.shared.http_client.resilience import resilience_executor
+from agent.shared.http_client.session_pool import http_session_pool
 from agent.shared.server.common.base_exception import ServerException
+from agent.shared.server.common.sse_client import Event, SSEClient
 from agent.utils.logger import logger
 
 
@@ -43,30 +46,120 @@ class BaseClient(ABC):
             raise e
 
     @staticmethod
-    async def _async_invoke(url: str, method: str = "POST", **kwargs):
-        try:
-            proxy = os.getenv("HTTP_PROXY", None)
-            if proxy and url.startswith("https"):
-                kwargs["proxy"] = proxy
-            if "headers" not in kwargs:
-                kwargs["headers"] = {'Content-Type': 'application/json'}
-            if "timeout" not in kwargs:
-                kwargs["timeout"] = ClientTimeout(total=settings.HTTP_TIMEOUT)
-            elif isinstance(kwargs["timeout"], (int, float)):
-                kwargs["timeout"] = ClientTimeout(total=kwargs["timeout"])
-
-            if url.startswith("https"):
-                ssl_context = ssl.create_default_context(cafile=certifi.where())
-                kwargs["ssl"] = ssl_context
-
-            async with aiohttp.ClientSession() as session:
-                async with session.request(method, url, **kwargs) as response:
-                    if response.status != 200:
-                        error_msg = await response.text()
-                        raise ServerException(f"API request failed with state: {response.status}, error: {error_msg}")
-                    return await response.json()
-        except Exception as e:
-            raise e
+    async def _async_invoke(
+            url: str,
+            method: str = "POST",
+            resilience: Optional[ResiliencePolicy] = None,
+            endpoint: Optional[str] = None,
+            **kwargs
+    ):
+        """异步请求
+
+        Args:
+            url: 请求地址
+            method: 请求方法
+            resilience: 弹性策略（熔断、重试、对冲），None 表示只请求一次
+            endpoint: 熔断器与指标的分组名，默认 "METHOD scheme://host"；
+                路径中带 ID 时按路径分组会产生无限多个熔断器和指标标签，需要按路由细分时传入路由模板
+        """
+        proxy = os.getenv("HTTP_PROXY", None)
+        if proxy and url.startswith("https"):
+            kwargs["proxy"] = proxy
+        if "headers" not in kwargs:
+            kwargs["headers"] = {'Content-Type': 'application/json'}
+        if "timeout" not in kwargs:
+            kwargs["timeout"] = ClientTimeout(total=settings.HTTP_TIMEOUT)
+        elif isinstance(kwargs["timeout"], (int, float)):
+            kwargs["timeout"] = ClientTimeout(total=kwargs["timeout"])
+
+        if resilience is None:
+            return await BaseClient._async_request(url, method, **kwargs)
+
+        if endpoint is None:
+            parts = urlsplit(url)
+            endpoint = f"{method.upper()} {parts.scheme}://{parts.netloc}"
+        return await resilience_executor.call(
+            endpoint, lambda: BaseClient._async_request(url, method, **kwargs), resilience
+        )
+
+    @staticmethod
+    async def _async_request(url: str, method: str, **kwargs):
+        # 复用共享连接池，https 默认使用缓存的 SSLContext
+        session = http_session_pool.get_session()
+        async with session.request(method, url, **kwargs) as response:
+            if response.status != 200:
+                error_msg = await response.text()
+                raise UpstreamStatusError(
+                    f"API request failed with state: {response.status}, error: {error_msg}",
+                    status=response.status,
+                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                )
+            return await response.json()
+
+    @staticmethod
+    async def _async_stream_invoke(
+            url: str,
+            method: str = "POST",
+            sse: bool = False,
+            chunk_size: Optional[int] = None,
+            **kwargs
+    ) -> AsyncIterator[Union[bytes, Event]]:
+        """流式请求，数据到达即产出，不缓冲整个响应体。
+
+        生成器按需拉取，消费方处理慢时 aiohttp 会暂停读取 socket（背压）。
+        消费方提前 break 时应调用 aclose()（或使用 contextlib.aclosing），
+        被取消或提前退出时连接会直接关闭，不会放回连接池。
+
+        Args:
+            url: 请求地址
+            method: 请求方法
+            sse: 为 True 时按 SSE 协议解析，产出 Event；否则产出原始 bytes
+            chunk_size: 原始模式下的分块大小，None 表示到达多少产出多少
+
+        Returns:
+            bytes 或 Event 的异步迭代器
+        """
+        proxy = os.getenv("HTTP_PROXY", None)
+        if proxy and url.startswith("https"):
+            kwargs["proxy"] = proxy
+        # 复制一份再补充 Accept，不修改调用方传入的 headers
+        headers = dict(kwargs.get("headers") or {'Content-Type': 'application/json'})
+        if sse and not any(key.lower() == "accept" for key in headers):
+            headers["Accept"] = "text/event-stream"
+        kwargs["headers"] = headers
+        # 流式响应总时长不可预期，只限制两次读取之间的间隔
+        if "timeout" not in kwargs:
+            kwargs["timeout"] = ClientTimeout(total=None, sock_read=settings.HTTP_TIMEOUT)
+        elif isinstance(kwargs["timeout"], (int, float)):
+            kwargs["timeout"] = ClientTimeout(total=None, sock_read=kwargs["timeout"])
+
+        session = http_session_pool.get_session()
+        async with session.request(method, url, **kwargs) as response:
+            if response.status != 200:
+                error_msg = await response.text()
+                raise UpstreamStatusError(
+                    f"API request failed with state: {response.status}, error: {error_msg}",
+                    status=response.status,
+                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                )
+
+            completed = False
+            try:
+                if sse:
+                    async for event in SSEClient(response.content.iter_any()).events_async():
+                        yield event
+                else:
+                    if chunk_size:
+                        chunks = response.content.iter_chunked(chunk_size)
+                    else:
+                        chunks = response.content.iter_any()
+                    async for chunk in chunks:
+                        yield chunk
+                completed = True
+            finally:
+                if not completed:
+                    # 响应体未读完，连接不可复用
+                    response.close()
 
     @abstractmethod
     def invoke(self, **kwargs):
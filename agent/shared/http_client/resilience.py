@@ -0,0 +1,278 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：resilience
+# @Date   ：2026/10/19 14:35
+# @Author ：leemysw
+
+# 2026/10/19 14:35   Create
+# =====================================================
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+import aiohttp
+
+from agent.shared.server.common.base_exception import ServerException
+from agent.utils.logger import logger
+from agent.utils.metrics import registry
+
+T = TypeVar("T")
+
+REQUESTS = registry.counter(
+    "http_client_requests_total", "Outbound HTTP calls by final outcome", ("endpoint", "outcome"))
+RETRIES = registry.counter(
+    "http_client_retries_total", "Outbound HTTP retry attempts", ("endpoint",))
+HEDGES = registry.counter(
+    "http_client_hedges_total", "Hedged outbound HTTP requests", ("endpoint", "result"))
+CIRCUIT_STATE = registry.gauge(
+    "http_client_circuit_state", "Circuit breaker state (0=closed, 1=open, 2=half_open)", ("endpoint",))
+LATENCY = registry.histogram(
+    "http_client_request_duration_seconds", "Latency of successful outbound HTTP calls", ("endpoint",))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUE = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+
+class UpstreamStatusError(ServerException):
+    """上游返回非 200 状态码"""
+
+    def __init__(self, errors: str, status: int, retry_after: Optional[float] = None):
+        super().__init__(errors)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(ServerException):
+    """熔断器打开，请求被直接拒绝"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头（秒数或 HTTP 日期），返回需要等待的秒数"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass
+class ResiliencePolicy:
+    """出站调用的弹性策略
+
+    Attributes:
+        max_retries: 最大重试次数
+        base_delay: 退避基数(秒)，第 n 次重试等待 uniform(0, base_delay * 2**n)
+        max_delay: 单次等待上限(秒)，Retry-After 超过该值时不再重试
+        retry_on_status: 可重试的状态码
+        failure_threshold: 连续失败多少次后熔断
+        recovery_timeout: 熔断后多久进入半开状态(秒)
+        hedge: 是否启用对冲请求，只应对幂等请求开启
+        hedge_quantile: 对冲延迟取历史延迟的分位数
+        hedge_min_samples: 样本数不足时不对冲
+        hedge_min_delay: 对冲延迟下限(秒)
+    """
+    max_retries: int = 2
+    base_delay: float = 0.2
+    max_delay: float = 5.0
+    retry_on_status: Tuple[int, ...] = (429, 502, 503, 504)
+    failure_threshold: int = 5
+    recovery_timeout: float = 30.0
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20
+    hedge_min_delay: float = 0.05
+
+    def backoff(self, attempt: int) -> float:
+        """full jitter 退避"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """单个 endpoint 的熔断器：closed -> open -> half_open(单个探测请求) -> closed
+
+    熔断状态属于上游，由所有调用方共享；阈值属于调用方，每次调用传入各自策略的值，
+    不同策略调用同一个 endpoint 时各自的阈值都会生效。
+    """
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        CIRCUIT_STATE.set(0, endpoint=endpoint)
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            logger.info(f"【CircuitBreaker:{self.endpoint}】{self.state} -> {state}")
+            self.state = state
+            CIRCUIT_STATE.set(_STATE_VALUE[state], endpoint=self.endpoint)
+
+    def allow(self, recovery_timeout: float) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < recovery_timeout:
+                return False
+            self._set_state(HALF_OPEN)
+        # 半开状态只放行一个探测请求
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def release(self) -> None:
+        """探测请求被取消或以非上游故障结束时释放名额，不改变熔断状态"""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probing = False
+        self._set_state(CLOSED)
+
+    def record_failure(self, failure_threshold: int) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == HALF_OPEN or self.failures >= failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+
+class LatencyWindow:
+    """最近 N 次成功请求的延迟，用于计算对冲延迟"""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def quantile(self, q: float) -> float:
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ResilienceExecutor:
+    """按 endpoint 维护熔断器和延迟窗口，执行带重试、熔断、对冲的调用"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latencies: Dict[str, LatencyWindow] = {}
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+    @staticmethod
+    def _classify(exc: BaseException, policy: ResiliencePolicy) -> Tuple[bool, bool, Optional[float]]:
+        """返回 (是否可重试, 是否计入熔断失败, Retry-After)"""
+        if isinstance(exc, UpstreamStatusError):
+            retryable = exc.status in policy.retry_on_status
+            return retryable, retryable or exc.status >= 500, exc.retry_after
+        if isinstance(exc, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+            return True, True, None
+        return False, False, None
+
+    async def call(self, endpoint: str, func: Callable[[], Awaitable[T]], policy: ResiliencePolicy) -> T:
+        breaker = self.breaker(endpoint)
+        attempt = 0
+        while True:
+            if not breaker.allow(policy.recovery_timeout):
+                REQUESTS.inc(endpoint=endpoint, outcome="rejected")
+                raise CircuitOpenError(f"Circuit open for {endpoint}")
+
+            try:
+                result = await self._hedged(endpoint, func, policy)
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            except Exception as e:
+                retryable, is_failure, retry_after = self._classify(e, policy)
+                if is_failure:
+                    breaker.record_failure(policy.failure_threshold)
+                else:
+                    # 非上游故障（如 4xx），不影响熔断状态，只释放半开探测名额
+                    breaker.release()
+
+                # 本次失败使熔断器打开时不再重试，抛出真实的上游错误而不是 CircuitOpenError
+                if not retryable or attempt >= policy.max_retries or breaker.state == OPEN:
+                    REQUESTS.inc(endpoint=endpoint, outcome="failure")
+                    raise
+                if retry_after is not None and retry_after > policy.max_delay:
+                    REQUESTS.inc(endpoint=endpoint, outcome="failure")
+                    raise
+
+                delay = retry_after if retry_after is not None else policy.backoff(attempt)
+                attempt += 1
+                RETRIES.inc(endpoint=endpoint)
+                logger.warning(f"Retry {attempt}/{policy.max_retries} {endpoint} after {delay:.3f}s. Error: {e}")
+                await asyncio.sleep(delay)
+                continue
+
+            breaker.record_success()
+            REQUESTS.inc(endpoint=endpoint, outcome="success")
+            return result
+
+    async def _timed(self, endpoint: str, func: Callable[[], Awaitable[T]]) -> T:
+        start = time.perf_counter()
+        result = await func()
+        elapsed = time.perf_counter() - start
+        self._latencies.setdefault(endpoint, LatencyWindow()).add(elapsed)
+        LATENCY.observe(elapsed, endpoint=endpoint)
+        return result
+
+    async def _hedged(self, endpoint: str, func: Callable[[], Awaitable[T]], policy: ResiliencePolicy) -> T:
+        window = self._latencies.get(endpoint)
+        if not policy.hedge or window is None or len(window) < policy.hedge_min_samples:
+            return await self._timed(endpoint, func)
+
+        delay = max(policy.hedge_min_delay, window.quantile(policy.hedge_quantile))
+        pending = set()
+        try:
+            # 从创建主请求起就在 try 内，等待期间被取消时 finally 会取消已发出的请求
+            primary = asyncio.ensure_future(self._timed(endpoint, func))
+            pending.add(primary)
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            # 主请求超过 p95 仍未返回，发出对冲请求，谁先成功用谁
+            HEDGES.inc(endpoint=endpoint, result="sent")
+            secondary = asyncio.ensure_future(self._timed(endpoint, func))
+            pending.add(secondary)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is secondary:
+                            HEDGES.inc(endpoint=endpoint, result="won")
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+# 全局实例
+resilience_executor = ResilienceExecutor()
@@ -0,0 +1,166 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：session_pool
+# @Date   ：2026/10/19 10:12
+# @Author ：leemysw
+
+# 2026/10/19 10:12   Create
+# =====================================================
+
+import asyncio
+import ssl
+from functools import lru_cache
+from typing import Any, Dict, Optional, Set, Tuple
+
+import aiohttp
+import certifi
+
+from agent.core.config import settings
+from agent.utils.logger import logger
+from agent.utils.metrics import registry
+
+POOL_ACQUIRED = registry.gauge(
+    "http_client_pool_acquired_connections", "Connections currently in use", ("pool",))
+POOL_IDLE = registry.gauge(
+    "http_client_pool_idle_connections", "Keep-alive connections waiting for reuse", ("pool",))
+POOL_WAITING = registry.gauge(
+    "http_client_pool_waiting_requests", "Requests waiting for a free connection", ("pool",))
+POOL_SATURATION = registry.gauge(
+    "http_client_pool_saturation", "Acquired connections / pool limit", ("pool",))
+
+
+@lru_cache()
+def get_ssl_context() -> ssl.SSLContext:
+    """加载一次 CA 证书，所有连接共享同一个 SSLContext"""
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+class HttpSessionPool:
+    """aiohttp ClientSession 注册表。
+
+    按名称复用 ClientSession 及其连接池（keep-alive、单 host 连接上限、DNS 缓存），
+    避免每次请求都重新建立 TCP/TLS 连接。ClientSession 绑定事件循环，
+    循环变化时会重新创建并关闭旧的 session。由 app.lifespan 在退出时统一关闭。
+    """
+
+    def __init__(
+            self,
+            limit: Optional[int] = None,
+            limit_per_host: Optional[int] = None,
+            dns_cache_ttl: Optional[int] = None,
+            keepalive_timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            limit: 连接池总连接数上限，默认使用settings.HTTP_POOL_LIMIT
+            limit_per_host: 单个 host 的连接数上限，默认使用settings.HTTP_POOL_LIMIT_PER_HOST
+            dns_cache_ttl: DNS 缓存时间(秒)，默认使用settings.HTTP_DNS_CACHE_TTL
+            keepalive_timeout: 空闲连接保持时间(秒)，默认使用settings.HTTP_KEEPALIVE_TIMEOUT
+        """
+        self.limit = limit if limit is not None else settings.HTTP_POOL_LIMIT
+        self.limit_per_host = limit_per_host if limit_per_host is not None else settings.HTTP_POOL_LIMIT_PER_HOST
+        self.dns_cache_ttl = dns_cache_ttl if dns_cache_ttl is not None else settings.HTTP_DNS_CACHE_TTL
+        self.keepalive_timeout = keepalive_timeout if keepalive_timeout is not None else settings.HTTP_KEEPALIVE_TIMEOUT
+
+        self._sessions: Dict[str, Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+        # 正在关闭的旧 session 任务，保留引用避免被回收
+        self._closing: Set[asyncio.Future] = set()
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+            keepalive_timeout=self.keepalive_timeout,
+            ssl=get_ssl_context(),
+        )
+        return aiohttp.ClientSession(connector=connector)
+
+    def get_session(self, name: str = "default") -> aiohttp.ClientSession:
+        """获取（或创建）指定名称的共享 ClientSession，必须在事件循环中调用"""
+        loop = asyncio.get_running_loop()
+        entry = self._sessions.get(name)
+        if entry is not None:
+            session_loop, session = entry
+            if session_loop is loop and not session.closed:
+                return session
+            self._retire(name, session_loop, session)
+
+        session = self._create_session()
+        self._sessions[name] = (loop, session)
+        logger.debug(f"【HttpSessionPool】创建共享 ClientSession: {name}")
+        return session
+
+    def _retire(self, name: str, session_loop: asyncio.AbstractEventLoop, session: aiohttp.ClientSession) -> None:
+        """关闭因事件循环变化被替换的 session"""
+        if session.closed:
+            return
+        try:
+            if session_loop.is_running() and not session_loop.is_closed():
+                # 旧循环仍在其他线程中运行，在原循环中关闭
+                asyncio.run_coroutine_threadsafe(session.close(), session_loop)
+            else:
+                # 旧循环已结束，连接器不再访问旧循环，在当前循环中标记关闭并释放连接
+                task = asyncio.ensure_future(session.close())
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+        except Exception as e:
+            logger.warning(f"【HttpSessionPool】关闭旧 ClientSession 失败: {name}, Error: {e}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """连接池使用情况，saturation 为已占用连接数 / 连接上限"""
+        result = {}
+        for name, (_, session) in self._sessions.items():
+            if session.closed:
+                continue
+            connector = session.connector
+            # 以下均为 aiohttp 私有字段，版本变化时缺失或结构不同按 0 处理
+            try:
+                acquired = len(getattr(connector, "_acquired", None) or ())
+                idle = sum(len(conns) for conns in (getattr(connector, "_conns", None) or {}).values())
+                waiting = sum(len(waiters) for waiters in (getattr(connector, "_waiters", None) or {}).values())
+                per_host = {
+                    f"{getattr(key, 'host', key)}:{getattr(key, 'port', '')}": len(conns)
+                    for key, conns in (getattr(connector, "_acquired_per_host", None) or {}).items()
+                }
+            except (TypeError, AttributeError):
+                acquired, idle, waiting, per_host = 0, 0, 0, {}
+            limit = getattr(connector, "limit", 0)
+            result[name] = {
+                "limit": limit,
+                "limit_per_host": getattr(connector, "limit_per_host", 0),
+                "acquired": acquired,
+                "idle": idle,
+                "waiting": waiting,
+                "saturation": acquired / limit if limit else 0.0,
+                "per_host": per_host,
+            }
+        return result
+
+    async def close(self) -> None:
+        """关闭所有共享 ClientSession"""
+        sessions, self._sessions = self._sessions, {}
+        for name, (_, session) in sessions.items():
+            if session.closed:
+                continue
+            try:
+                await session.close()
+            except Exception as e:
+                logger.warning(f"【HttpSessionPool】关闭 ClientSession 失败: {name}, Error: {e}")
+
+
+# 全局实例
+http_session_pool = HttpSessionPool()
+
+
+def _collect_pool_metrics() -> None:
+    for name, stat in http_session_pool.stats().items():
+        POOL_ACQUIRED.set(stat["acquired"], pool=name)
+        POOL_IDLE.set(stat["idle"], pool=name)
+        POOL_WAITING.set(stat["waiting"], pool=name)
+        POOL_SATURATION.set(stat["saturation"], pool=name)
+
+
+registry.register_collector(_collect_pool_metrics)
@@ -8,9 +8,11 @@
 # 2024/1/22 23:24   Create
 # =====================================================
 
+import hashlib
 from enum import Enum
-from typing import Union
+from typing import Optional, Union
 
+import orjson
 from fastapi import status as http_status
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse, Response
@@ -21,6 +23,11 @@ from agent.utils.logger import logger
 
 __all__ = [
     'ok',
+    'ok_serialized',
+    'make_etag',
+    'etag_matches',
+    'with_etag',
+    'not_modified',
     'fail',
     'Resp',
     'Unauthorized',
@@ -89,6 +96,46 @@ def ok(response: Resp, data=None) -> Response:
     )
 
 
+def ok_serialized(response: Resp, data: bytes) -> Response:
+    """返回已序列化为 JSON 的 data，跳过 jsonable_encoder，适合较大的列表"""
+    logger.info(
+        f"\n\n=====================DONE========================\n"
+        f"{dict(response.info_dict, data=f'<{len(data)} bytes>')}\n"
+    )
+    body = (
+            b'{"code":' + orjson.dumps(response.code)
+            + b',"message":' + orjson.dumps(response.message)
+            + b',"success":' + orjson.dumps(response.success)
+            + b',"data":' + data + b'}'
+    )
+    return Response(content=body, status_code=http_status.HTTP_200_OK, media_type="application/json")
+
+
+def make_etag(*parts) -> str:
+    """由资源版本信息生成强 ETag"""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode("utf-8"), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 按弱比较判断，忽略 W/ 前缀"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def not_modified(etag: str) -> Response:
+    return with_etag(Response(status_code=http_status.HTTP_304_NOT_MODIFIED), etag)
+
+
 def fail(response: Resp) -> Response:
     response.data = {"request_id": response.request_id, "detail": response.detail}
     response.message = "failed"
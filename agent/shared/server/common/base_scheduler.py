@@ -0,0 +1,196 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：base_scheduler
+# @Date   ：2026/10/19 19:30
+# @Author ：leemysw
+
+# 2026/10/19 19:30   Create
+# 后台维护任务调度器
+# =====================================================
+
+import asyncio
+import os
+import random
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from agent.core.config import settings
+from agent.utils.logger import logger
+from agent.utils.metrics import registry
+from agent.utils.utils import cache_path
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，只做进程内互斥
+    fcntl = None
+
+JOB_RUNS = registry.counter(
+    "maintenance_job_runs_total", "Maintenance job runs by outcome", ("job", "outcome"))
+JOB_DURATION = registry.histogram(
+    "maintenance_job_duration_seconds", "Duration of maintenance job runs", ("job",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0))
+JOB_LAST_SUCCESS = registry.gauge(
+    "maintenance_job_last_success_timestamp", "Unix time of the last successful run", ("job",))
+
+
+@dataclass
+class MaintenanceJob:
+    """维护任务
+
+    Attributes:
+        name: 任务名，同时用作跨进程锁文件名
+        func: 任务函数，同步函数在线程池中执行
+        interval: 执行间隔(秒)
+        jitter: 间隔抖动比例，实际间隔为 interval * (1 ± jitter)，避免多个 worker 同时触发
+        wait_first: 首次执行前等待(秒)，None 表示在 [0, interval * jitter] 内随机等待
+    """
+    name: str
+    func: Callable[[], Any]
+    interval: float
+    jitter: float = 0.1
+    wait_first: Optional[float] = None
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    def next_delay(self) -> float:
+        return max(0.0, self.interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+
+class MaintenanceScheduler:
+    """在应用 lifespan 内运行的维护任务调度器。
+
+    - 同一进程内同一任务不会重叠执行（single-flight）
+    - 多个 gunicorn worker 通过锁文件互斥，并根据上次执行时间跳过刚被其他 worker 执行过的任务
+    - 每次执行记录耗时和结果指标
+    """
+
+    def __init__(self, lock_dir: Optional[str] = None):
+        self._jobs: Dict[str, MaintenanceJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._lock_dir = lock_dir
+
+    @property
+    def lock_dir(self) -> str:
+        if self._lock_dir is None:
+            self._lock_dir = cache_path(settings.CACHE_FILE_DIR, "locks")
+        os.makedirs(self._lock_dir, exist_ok=True)
+        return self._lock_dir
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def has_job(self, name: str) -> bool:
+        return name in self._jobs
+
+    def add_job(self, name: str, func: Callable[[], Any], interval: float,
+                jitter: float = 0.1, wait_first: Optional[float] = None) -> MaintenanceJob:
+        if name in self._jobs:
+            raise ValueError(f"Maintenance job {name} already registered")
+        job = MaintenanceJob(name=name, func=func, interval=interval, jitter=jitter, wait_first=wait_first)
+        self._jobs[name] = job
+        if self.running:
+            self._tasks[name] = asyncio.create_task(self._loop(job), name=f"maintenance:{name}")
+        return job
+
+    def start(self) -> None:
+        for name, job in self._jobs.items():
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.create_task(self._loop(job), name=f"maintenance:{name}")
+        logger.info(f"【Maintenance】调度器已启动，共 {len(self._jobs)} 个任务: {', '.join(self._jobs)}")
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _loop(self, job: MaintenanceJob) -> None:
+        delay = job.wait_first if job.wait_first is not None else random.uniform(0, job.interval * job.jitter)
+        while True:
+            await asyncio.sleep(delay)
+            await self.run_job(job.name)
+            delay = job.next_delay()
+
+    async def run_job(self, name: str, force: bool = False) -> str:
+        """执行一次任务，返回结果：success / failure / skipped
+
+        Args:
+            name: 任务名
+            force: 为 True 时忽略其他 worker 的最近执行时间（仍然互斥）
+        """
+        job = self._jobs[name]
+        if job._lock.locked():
+            JOB_RUNS.inc(job=name, outcome="skipped")
+            return "skipped"
+
+        async with job._lock:
+            with self._lease(job, force) as mark_done:
+                if mark_done is None:
+                    JOB_RUNS.inc(job=name, outcome="skipped")
+                    return "skipped"
+
+                start = time.perf_counter()
+                try:
+                    if asyncio.iscoroutinefunction(job.func):
+                        await job.func()
+                    else:
+                        await run_in_threadpool(job.func)
+                except Exception as e:
+                    JOB_RUNS.inc(job=name, outcome="failure")
+                    logger.exception(f"【Maintenance】任务 {name} 执行失败: {e}")
+                    return "failure"
+                finally:
+                    JOB_DURATION.observe(time.perf_counter() - start, job=name)
+
+                mark_done()
+                JOB_RUNS.inc(job=name, outcome="success")
+                JOB_LAST_SUCCESS.set(time.time(), job=name)
+                return "success"
+
+    @contextmanager
+    def _lease(self, job: MaintenanceJob, force: bool) -> Iterator[Optional[Callable[[], None]]]:
+        """跨进程互斥：持有锁文件期间其他 worker 跳过该任务；上次成功执行距今不足一个间隔的 90% 时也跳过
+
+        获得执行权时产出 mark_done，任务成功后调用以记录执行时间；失败时不记录，其他 worker 可以立即重试。
+        未获得执行权时产出 None。
+        """
+        if fcntl is None:
+            yield lambda: None
+            return
+
+        path = os.path.join(self.lock_dir, f"{job.name}.lock")
+        with open(path, "a+") as f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield None
+                return
+            try:
+                f.seek(0)
+                try:
+                    last_run = float(f.read().strip() or 0)
+                except ValueError:
+                    last_run = 0.0
+                if not force and time.time() - last_run < job.interval * 0.9:
+                    yield None
+                    return
+
+                def mark_done() -> None:
+                    f.seek(0)
+                    f.truncate()
+                    f.write(str(time.time()))
+                    f.flush()
+
+                yield mark_done
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+# 全局实例
+maintenance_scheduler = MaintenanceScheduler()
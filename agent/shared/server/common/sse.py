@@ -7,10 +7,9 @@
 
 # 2024/2/3 15:31   Create
 # =====================================================
-import io
 import re
 from datetime import datetime
-from functools import partial
+from functools import lru_cache, partial
 from typing import (
     Any,
     AsyncIterable,
@@ -70,7 +69,21 @@ except ModuleNotFoundError:
     logger.debug("Uvicorn not used.")
 
 
+DEFAULT_SEPARATOR = "\r\n"
+LINE_SEP_EXPR = re.compile(r"\r\n|\r|\n")
+
+
+def _is_single_line(text: str) -> bool:
+    """单行文本走快速路径，避免正则 split"""
+    return "\n" not in text and "\r" not in text
+
+
 class ServerSentEvent:
+    __slots__ = ("data", "event", "id", "retry", "comment", "_sep")
+
+    DEFAULT_SEPARATOR = DEFAULT_SEPARATOR
+    LINE_SEP_EXPR = LINE_SEP_EXPR
+
     def __init__(
             self,
             data: Optional[Any] = None,
@@ -106,38 +119,54 @@ class ServerSentEvent:
         self.id = id
         self.retry = retry
         self.comment = comment
-        self.DEFAULT_SEPARATOR = "\r\n"
-        self.LINE_SEP_EXPR = re.compile(r"\r\n|\r|\n")
-        self._sep = sep if sep is not None else self.DEFAULT_SEPARATOR
+        self._sep = sep if sep is not None else DEFAULT_SEPARATOR
 
     def encode(self) -> bytes:
-        buffer = io.StringIO()
+        sep = self._sep
+
+        # 快速路径：只有单行 data 的事件（流式输出最常见的形态）
+        if self.comment is None and self.id is None and self.event is None and self.retry is None:
+            if self.data is None:
+                return sep.encode("utf-8")
+            data = self.data if isinstance(self.data, str) else str(self.data)
+            if _is_single_line(data):
+                return b"data: " + data.encode("utf-8") + (sep + sep).encode("utf-8")
+
+        parts = []
         if self.comment is not None:
-            for chunk in self.LINE_SEP_EXPR.split(str(self.comment)):
-                buffer.write(f": {chunk}")
-                buffer.write(self._sep)
+            for chunk in LINE_SEP_EXPR.split(str(self.comment)):
+                parts.append(": ")
+                parts.append(chunk)
+                parts.append(sep)
 
         if self.id is not None:
-            buffer.write(self.LINE_SEP_EXPR.sub("", f"message_id: {self.id}"))
-            buffer.write(self._sep)
+            parts.append(LINE_SEP_EXPR.sub("", f"message_id: {self.id}"))
+            parts.append(sep)
 
         if self.event is not None:
-            buffer.write(self.LINE_SEP_EXPR.sub("", f"event: {self.event}"))
-            buffer.write(self._sep)
+            parts.append(LINE_SEP_EXPR.sub("", f"event: {self.event}"))
+            parts.append(sep)
 
         if self.data is not None:
-            for chunk in self.LINE_SEP_EXPR.split(str(self.data)):
-                buffer.write(f"data: {chunk}")
-                buffer.write(self._sep)
+            for chunk in LINE_SEP_EXPR.split(str(self.data)):
+                parts.append("data: ")
+                parts.append(chunk)
+                parts.append(sep)
 
         if self.retry is not None:
             if not isinstance(self.retry, int):
                 raise TypeError("retry argument must be int")
-            buffer.write(f"retry: {self.retry}")
-            buffer.write(self._sep)
+            parts.append(f"retry: {self.retry}")
+            parts.append(sep)
+
+        parts.append(sep)
+        return "".join(parts).encode("utf-8")
+
 
-        buffer.write(self._sep)
-        return buffer.getvalue().encode("utf-8")
+@lru_cache(maxsize=64)
+def encode_comment(comment: str, sep: str = DEFAULT_SEPARATOR) -> bytes:
+    """预编码注释事件（如固定内容的 ping），相同参数只编码一次"""
+    return ServerSentEvent(comment=comment, sep=sep).encode()
 
 
 def ensure_bytes(data: Union[bytes, dict, ServerSentEvent, Any], sep: str) -> bytes:
@@ -146,8 +175,8 @@ def ensure_bytes(data: Union[bytes, dict, ServerSentEvent, Any], sep: str) -> by
     elif isinstance(data, ServerSentEvent):
         return data.encode()
     elif isinstance(data, dict):
-        data["sep"] = sep
-        return ServerSentEvent(**data).encode()
+        # 不修改调用方传入的 dict
+        return ServerSentEvent(**{**data, "sep": sep}).encode()
     else:
         return ServerSentEvent(str(data), sep=sep).encode()
 
@@ -185,6 +214,7 @@ class EventSourceResponse(Response):
                 Callable[[], Coroutine[None, None, None]]
             ] = None,
             send_timeout: Optional[float] = None,
+            cache_ping: bool = False,
     ) -> None:
         if sep is not None and sep not in ["\r\n", "\r", "\n"]:
             raise ValueError(f"sep must be one of: \\r\\n, \\r, \\n, got: {sep}")
@@ -192,6 +222,9 @@ class EventSourceResponse(Response):
         self.sep = sep if sep is not None else self.DEFAULT_SEPARATOR
 
         self.ping_message_factory = ping_message_factory
+        # 开启后 ping 只编码一次，之后复用同一份 bytes
+        self.cache_ping = cache_ping
+        self._ping_bytes: Optional[bytes] = None
 
         if isinstance(content, AsyncIterable):
             self.body_iterator = content
@@ -326,11 +359,16 @@ class EventSourceResponse(Response):
             if self.ping_message_factory:
                 assert isinstance(self.ping_message_factory,
                                   Callable)  # type: ignore  # https://github.com/python/mypy/issues/6864
-            ping = (
-                ServerSentEvent(comment=f"ping - {datetime.utcnow()}").encode()
-                if self.ping_message_factory is None
-                else ensure_bytes(self.ping_message_factory(), self.sep)
-            )
+            ping = self._ping_bytes
+            if ping is None:
+                if self.ping_message_factory is not None:
+                    ping = ensure_bytes(self.ping_message_factory(), self.sep)
+                elif self.cache_ping:
+                    ping = encode_comment("ping", self.sep)
+                else:
+                    ping = ServerSentEvent(comment=f"ping - {datetime.utcnow()}").encode()
+                if self.cache_ping:
+                    self._ping_bytes = ping
             logger.debug(f"ping: {ping.decode()}")
             async with self._send_lock:
                 if self.active:
@@ -7,9 +7,141 @@
 
 # 2024/2/6 09:25   Create
 # =====================================================
+from typing import List, Optional
+
 from agent.utils.logger import logger
 
 _FIELD_SEPARATOR = ':'
+_FIELDS = frozenset(('id', 'event', 'data', 'retry'))
+
+
+class SSEParser(object):
+    """增量式 SSE 解析器。
+
+    数据追加到 bytearray 中，从上次扫描位置继续查找行结束符，已处理的
+    前缀每次 feed 只压缩一次，因此超长 ``data:`` 行的解析开销与总长度成线性关系。
+    行结束符不会出现在 UTF-8 多字节序列内部，完整的行可以直接解码。
+    """
+
+    __slots__ = ('_char_enc', '_buffer', '_scan_pos', '_pending_cr',
+                 '_id', '_event', '_data', '_retry')
+
+    def __init__(self, char_enc='utf-8'):
+        self._char_enc = char_enc
+        self._buffer = bytearray()
+        self._scan_pos = 0
+        # 上一个 chunk 以 \r 结尾时，下一个 chunk 开头的 \n 属于同一个行结束符
+        self._pending_cr = False
+        self._reset()
+
+    def _reset(self):
+        self._id = None
+        self._event = None
+        self._data: List[str] = []
+        self._retry = None
+
+    def feed(self, chunk: bytes) -> List['Event']:
+        """追加一段字节流，返回其中已完整的事件"""
+        if not chunk:
+            return []
+
+        buffer = self._buffer
+        if self._pending_cr:
+            self._pending_cr = False
+            if chunk[:1] == b'\n':
+                chunk = chunk[1:]
+        buffer += chunk
+
+        events = []
+        start = 0
+        pos = self._scan_pos
+        size = len(buffer)
+        # 分别缓存下一个 \n 与 \r 的位置，只在越过时重新查找，保证每个字节只扫描一次
+        lf = buffer.find(b'\n', pos)
+        cr = buffer.find(b'\r', pos)
+        while lf != -1 or cr != -1:
+            if cr == -1 or (lf != -1 and lf < cr):
+                end, pos = lf, lf + 1
+            elif cr + 1 < size and buffer[cr + 1] == 0x0A:
+                end, pos = cr, cr + 2
+            else:
+                end, pos = cr, cr + 1
+                if pos == size:
+                    self._pending_cr = True
+
+            event = self._process_line(buffer[start:end])
+            if event is not None:
+                events.append(event)
+            start = pos
+
+            if lf != -1 and lf < pos:
+                lf = buffer.find(b'\n', pos)
+            if cr != -1 and cr < pos:
+                cr = buffer.find(b'\r', pos)
+
+        if start:
+            del buffer[:start]
+        self._scan_pos = len(buffer)
+        return events
+
+    def flush(self) -> Optional['Event']:
+        """事件流结束时调用，分发最后一个没有空行结尾的事件"""
+        if self._buffer:
+            self._process_line(self._buffer)
+            self._buffer.clear()
+        self._scan_pos = 0
+        self._pending_cr = False
+        return self._dispatch()
+
+    def _process_line(self, line) -> Optional['Event']:
+        # 空行表示事件结束
+        if not line:
+            return self._dispatch()
+
+        # Lines starting with a separator are comments and are to be
+        # ignored.
+        if line[0] == 0x3A:
+            return None
+
+        line = line.decode(self._char_enc)
+        if not line.strip():
+            return None
+
+        field, sep, value = line.partition(_FIELD_SEPARATOR)
+
+        # Ignore unknown fields.
+        if field not in _FIELDS:
+            logger.debug('Saw invalid field %s while parsing Server Side Event', field)
+            return None
+
+        # From the spec:
+        # "If value starts with a single U+0020 SPACE character,
+        # remove it from value."
+        if value.startswith(' '):
+            value = value[1:]
+
+        # The data field may come over multiple lines and their values
+        # are concatenated with each other.
+        if field == 'data':
+            self._data.append(value)
+        elif field == 'id':
+            self._id = value
+        elif field == 'event':
+            self._event = value
+        else:
+            self._retry = value
+        return None
+
+    def _dispatch(self) -> Optional['Event']:
+        # Events with no data are not dispatched.
+        if not self._data:
+            self._reset()
+            return None
+
+        # Empty event names default to 'message'
+        event = Event(id=self._id, event=self._event or 'message', data='\n'.join(self._data), retry=self._retry)
+        self._reset()
+        return event
 
 
 class SSEClient(object):
@@ -32,34 +164,6 @@ class SSEClient(object):
         self._event_source = event_source
         self._char_enc = char_enc
 
-    def _read_sync(self):
-        data = b''
-        for chunk in self._event_source:
-            for line in chunk.splitlines(True):
-                data += line
-                if data.endswith((b'\r\r', b'\n\n', b'\r\n\r\n')):
-                    yield data
-                    data = b''
-        if data:
-            yield data
-
-    async def _read_async(self):
-        """Read the incoming event source stream and yield event chunks.
-
-        Unfortunately it is possible for some servers to decide to break an
-        event into multiple HTTP chunks in the response. It is thus necessary
-        to correctly stitch together consecutive response chunks and find the
-        SSE delimiter (empty new line) to yield full, correct event chunks."""
-        data = b''
-        async for chunk in self._event_source:
-            for line in chunk.splitlines(True):
-                data += line
-                if data.endswith((b'\r\r', b'\n\n', b'\r\n\r\n')):
-                    yield data
-                    data = b''
-        if data:
-            yield data
-
     def events(self, is_async=True):
         if is_async:
             return self.events_async()
@@ -67,72 +171,27 @@ class SSEClient(object):
             return self.events_sync()
 
     def events_sync(self):
-        for chunk in self._read_sync():
-            event = self._events(chunk)
-            if event is not None:
-                yield event
+        parser = SSEParser(self._char_enc)
+        for chunk in self._event_source:
+            yield from parser.feed(chunk)
+        event = parser.flush()
+        if event is not None:
+            yield event
 
     async def events_async(self):
-        async for chunk in self._read_async():
-            event = self._events(chunk)
-            if event is not None:
-                yield event
+        """Read the incoming event source stream and yield events.
 
-    def _events(self, chunk):
-        event = Event()
-        # Split before decoding so splitlines() only uses \r and \n
-        for line in chunk.splitlines():
-            # Decode the line.
-            line = line.decode(self._char_enc)
-
-            # Lines starting with a separator are comments and are to be
-            # ignored.
-            if not line.strip() or line.startswith(_FIELD_SEPARATOR):
-                continue
-
-            data = line.split(_FIELD_SEPARATOR, 1)
-            field = data[0]
-
-            # Ignore unknown fields.
-            if field not in event.__dict__:
-                self._logger.debug('Saw invalid field %s while parsing '
-                                   'Server Side Event', field)
-                continue
-
-            if len(data) > 1:
-                # From the spec:
-                # "If value starts with a single U+0020 SPACE character,
-                # remove it from value."
-                if data[1].startswith(' '):
-                    value = data[1][1:]
-                else:
-                    value = data[1]
-            else:
-                # If no value is present after the separator,
-                # assume an empty value.
-                value = ''
-
-            # The data field may come over multiple lines and their values
-            # are concatenated with each other.
-            if field == 'data':
-                event.__dict__[field] += value + '\n'
-            else:
-                event.__dict__[field] = value
-
-        # Events with no data are not dispatched.
-        if not event.data:
-            return None
-
-        # If the data field ends with a newline, remove it.
-        if event.data.endswith('\n'):
-            event.data = event.data[0:-1]
-
-        # Empty event names default to 'message'
-        event.event = event.event or 'message'
-
-        # Dispatch the event
-        # self._logger.debug('Dispatching %s...', event)
-        return event
+        Unfortunately it is possible for some servers to decide to break an
+        event into multiple HTTP chunks in the response. The parser stitches
+        consecutive response chunks together and only dispatches an event
+        once its SSE delimiter (empty new line) has been seen."""
+        parser = SSEParser(self._char_enc)
+        async for chunk in self._event_source:
+            for event in parser.feed(chunk):
+                yield event
+        event = parser.flush()
+        if event is not None:
+            yield event
 
     def close(self):
         """Manually close the event source stream."""
@@ -142,6 +201,8 @@ class SSEClient(object):
 class Event(object):
     """Representation of an event from the event stream."""
 
+    __slots__ = ('id', 'event', 'data', 'retry')
+
     def __init__(self, id=None, event='message', data='', retry=None):
         self.id = id
         self.event = event
@@ -9,11 +9,12 @@
 # =====================================================
 
 import asyncio
+import random
 import time
 from functools import wraps
 
 
-def retry(max_retries=3, delay=1, backoff=2, exceptions=(Exception,)):
+def retry(max_retries=3, delay=1, backoff=2, exceptions=(Exception,), jitter=False):
     """
     A decorator that retries the decorated function if it raises specified exceptions.
 
@@ -22,11 +23,15 @@ def retry(max_retries=3, delay=1, backoff=2, exceptions=(Exception,)):
         delay (float): Initial delay between retries in seconds
         backoff (float): Multiplier applied to delay between retries
         exceptions (tuple): Tuple of exceptions to catch and retry on
+        jitter (bool): Sleep a random duration in [0, delay] (full jitter) to avoid synchronized retries
 
     Returns:
         The decorator function
     """
 
+    def sleep_time(cur_delay):
+        return random.uniform(0, cur_delay) if jitter else cur_delay
+
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -42,8 +47,9 @@ def retry(max_retries=3, delay=1, backoff=2, exceptions=(Exception,)):
                     if retries > max_retries:
                         raise e
 
-                    logger.warning(f"Retry {retries}/{max_retries} after {cur_delay}s. Error: {str(e)}")
-                    time.sleep(cur_delay)
+                    wait = sleep_time(cur_delay)
+                    logger.warning(f"Retry {retries}/{max_retries} after {wait:.3f}s. Error: {str(e)}")
+                    time.sleep(wait)
                     cur_delay *= backoff
             return None
 
@@ -61,8 +67,9 @@ def retry(max_retries=3, delay=1, backoff=2, exceptions=(Exception,)):
                     if retries > max_retries:
                         raise e
 
-                    logger.warning(f"Retry {retries}/{max_retries} after {cur_delay}s. Error: {str(e)}")
-                    await asyncio.sleep(cur_delay)
+                    wait = sleep_time(cur_delay)
+                    logger.warning(f"Retry {retries}/{max_retries} after {wait:.3f}s. Error: {str(e)}")
+                    await asyncio.sleep(wait)
                     cur_delay *= backoff
             return None
 
@@ -0,0 +1,27 @@
+"""会话消息序号
+
+Revision ID: 3f1c9a7e5b20
+Revises: ba05b8423844
+Create Date: 2026-10-19 22:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7e5b20'
+down_revision: Union[str, None] = 'ba05b8423844'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('sessions', sa.Column('message_seq', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('sessions') as batch_op:
+        batch_op.drop_column('message_seq')
@@ -0,0 +1,72 @@
+"""增量同步序号
+
+Revision ID: 8d2e4b6c1a93
+Revises: 3f1c9a7e5b20
+Create Date: 2026-10-19 22:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e4b6c1a93'
+down_revision: Union[str, None] = '3f1c9a7e5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('messages', sa.Column('seq', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_messages_agent_id_seq', 'messages', ['agent_id', 'seq'], unique=False)
+    op.add_column('sessions', sa.Column('reset_seq', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('sessions', sa.Column('change_seq', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_sessions_change_seq'), 'sessions', ['change_seq'], unique=False)
+    op.create_table('session_tombstones',
+    sa.Column('agent_id', sa.String(length=64), nullable=False),
+    sa.Column('change_seq', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('agent_id')
+    )
+    op.create_index(op.f('ix_session_tombstones_change_seq'), 'session_tombstones', ['change_seq'], unique=False)
+    op.create_table('sequences',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    # 已有消息按时间编号，会话的 message_seq 不小于其中最大值，新消息的序号在其之后
+    op.execute(
+        "UPDATE messages SET seq = numbered.rn FROM ("
+        " SELECT message_id, ROW_NUMBER() OVER (PARTITION BY agent_id ORDER BY timestamp, message_id) AS rn"
+        " FROM messages"
+        ") AS numbered WHERE messages.message_id = numbered.message_id"
+    )
+    op.execute(
+        "UPDATE sessions SET message_seq = MAX(message_seq, COALESCE("
+        " (SELECT MAX(seq) FROM messages WHERE messages.agent_id = sessions.agent_id), 0))"
+    )
+    # 已有会话按最后活动时间编号
+    op.execute(
+        "UPDATE sessions SET change_seq = numbered.rn FROM ("
+        " SELECT agent_id, ROW_NUMBER() OVER (ORDER BY last_activity, agent_id) AS rn FROM sessions"
+        ") AS numbered WHERE sessions.agent_id = numbered.agent_id"
+    )
+    op.execute(
+        "INSERT INTO sequences (name, value) SELECT 'session_changes', COALESCE(MAX(change_seq), 0) FROM sessions"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sequences')
+    op.drop_index(op.f('ix_session_tombstones_change_seq'), table_name='session_tombstones')
+    op.drop_table('session_tombstones')
+    op.drop_index(op.f('ix_sessions_change_seq'), table_name='sessions')
+    op.drop_index('ix_messages_agent_id_seq', table_name='messages')
+    with op.batch_alter_table('sessions') as batch_op:
+        batch_op.drop_column('change_seq')
+        batch_op.drop_column('reset_seq')
+    with op.batch_alter_table('messages') as batch_op:
+        batch_op.drop_column('seq')
@@ -0,0 +1,72 @@
+"""轮次统计表
+
+Revision ID: c4a7d1e9f305
+Revises: 8d2e4b6c1a93
+Create Date: 2026-10-19 22:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7d1e9f305'
+down_revision: Union[str, None] = '8d2e4b6c1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('rounds',
+    sa.Column('round_id', sa.String(length=64), nullable=False),
+    sa.Column('agent_id', sa.String(length=64), nullable=False),
+    sa.Column('session_id', sa.String(length=64), nullable=True),
+    sa.Column('model', sa.String(length=100), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('ttft_ms', sa.Integer(), nullable=True),
+    sa.Column('duration_ms', sa.Integer(), nullable=True),
+    sa.Column('duration_api_ms', sa.Integer(), nullable=True),
+    sa.Column('num_turns', sa.Integer(), nullable=True),
+    sa.Column('input_tokens', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('output_tokens', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('cache_creation_input_tokens', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('cache_read_input_tokens', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('total_cost_usd', sa.Float(), server_default='0', nullable=False),
+    sa.Column('subtype', sa.String(length=50), nullable=True),
+    sa.Column('is_error', sa.Boolean(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('round_id')
+    )
+    op.create_index('ix_rounds_agent_id_started_at', 'rounds', ['agent_id', 'started_at'], unique=False)
+    op.create_index('ix_rounds_started_at', 'rounds', ['started_at'], unique=False)
+    op.create_index('ix_rounds_model_started_at', 'rounds', ['model', 'started_at'], unique=False)
+
+    # 由已有的 result 消息回填
+    op.execute(
+        "INSERT INTO rounds (round_id, agent_id, session_id, started_at, finished_at, duration_ms, duration_api_ms,"
+        " num_turns, input_tokens, output_tokens, cache_creation_input_tokens, cache_read_input_tokens,"
+        " total_cost_usd, subtype, is_error)"
+        " SELECT r.round_id, r.agent_id, r.session_id,"
+        " (SELECT MIN(m.timestamp) FROM messages m WHERE m.round_id = r.round_id), r.timestamp,"
+        " json_extract(r.message, '$.duration_ms'), json_extract(r.message, '$.duration_api_ms'),"
+        " json_extract(r.message, '$.num_turns'),"
+        " COALESCE(json_extract(r.message, '$.usage.input_tokens'), 0),"
+        " COALESCE(json_extract(r.message, '$.usage.output_tokens'), 0),"
+        " COALESCE(json_extract(r.message, '$.usage.cache_creation_input_tokens'), 0),"
+        " COALESCE(json_extract(r.message, '$.usage.cache_read_input_tokens'), 0),"
+        " COALESCE(json_extract(r.message, '$.total_cost_usd'), 0),"
+        " json_extract(r.message, '$.subtype'), COALESCE(json_extract(r.message, '$.is_error'), 0)"
+        " FROM messages r WHERE r.message_type = 'result'"
+        " AND r.timestamp = (SELECT MAX(x.timestamp) FROM messages x"
+        " WHERE x.round_id = r.round_id AND x.message_type = 'result')"
+        " GROUP BY r.round_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rounds_model_started_at', table_name='rounds')
+    op.drop_index('ix_rounds_started_at', table_name='rounds')
+    op.drop_index('ix_rounds_agent_id_started_at', table_name='rounds')
+    op.drop_table('rounds')
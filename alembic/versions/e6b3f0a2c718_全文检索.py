@@ -0,0 +1,61 @@
+"""全文检索
+
+Revision ID: e6b3f0a2c718
+Revises: c4a7d1e9f305
+Create Date: 2026-10-19 23:40:00.000000
+
+已有消息不在迁移中回填，升级后执行 agent-kit rebuild-search 建立索引。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b3f0a2c718'
+down_revision: Union[str, None] = 'c4a7d1e9f305'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('search_documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('message_id', sa.String(length=64), nullable=False),
+    sa.Column('agent_id', sa.String(length=64), nullable=False),
+    sa.Column('round_id', sa.String(length=64), nullable=False),
+    sa.Column('block_type', sa.String(length=50), nullable=True),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('message_id')
+    )
+    op.create_index('ix_search_documents_agent_id_round_id', 'search_documents', ['agent_id', 'round_id'], unique=False)
+
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+        "content, content='search_documents', content_rowid='id', tokenize='trigram')"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN "
+        "INSERT INTO search_fts(rowid, content) VALUES (new.id, new.content); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+        "INSERT INTO search_fts(search_fts, rowid, content) VALUES ('delete', old.id, old.content); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN "
+        "INSERT INTO search_fts(search_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+        "INSERT INTO search_fts(rowid, content) VALUES (new.id, new.content); END"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS search_documents_au")
+    op.execute("DROP TRIGGER IF EXISTS search_documents_ad")
+    op.execute("DROP TRIGGER IF EXISTS search_documents_ai")
+    op.execute("DROP TABLE IF EXISTS search_fts")
+    op.drop_index('ix_search_documents_agent_id_round_id', table_name='search_documents')
+    op.drop_table('search_documents')
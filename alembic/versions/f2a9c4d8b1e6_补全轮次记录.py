@@ -0,0 +1,32 @@
+"""补全轮次记录
+
+Revision ID: f2a9c4d8b1e6
+Revises: e6b3f0a2c718
+Create Date: 2026-10-20 10:30:00.000000
+
+轮次分页改为读取 rounds 表，为没有 result 消息（未回填）的历史轮次补充记录。
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a9c4d8b1e6'
+down_revision: Union[str, None] = 'e6b3f0a2c718'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "INSERT INTO rounds (round_id, agent_id, session_id, started_at)"
+        " SELECT m.round_id, MIN(m.agent_id), MIN(m.session_id), MIN(m.timestamp)"
+        " FROM messages m WHERE NOT EXISTS (SELECT 1 FROM rounds r WHERE r.round_id = m.round_id)"
+        " GROUP BY m.round_id"
+    )
+
+
+def downgrade() -> None:
+    # 补充的记录没有统计数据，与正常记录无法区分，保留
+    pass
@@ -0,0 +1,146 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：cache_loop_lag_bench
+# @Date   ：2026/10/20 11:30
+# @Author ：leemysw
+
+# 2026/10/20 11:30   Create
+# 并发缓存读写下的事件循环延迟
+# =====================================================
+
+"""并发缓存读写下的事件循环延迟
+
+探针协程每隔 --interval 毫秒 sleep 一次，记录实际唤醒时间比预期晚了多少（事件循环延迟）。
+依次在三种负载下测量：
+
+- idle：无缓存读写，作为基线
+- async：并发调用 FileCache.aset/aget 与 TempFile.asave/aget，I/O 在缓存线程池中执行
+- sync：同样的负载直接调用同步 set/get/save，I/O 阻塞事件循环，作为对照
+
+async 负载的 p99 延迟超过 --max-p99 毫秒时以非 0 退出码结束。
+缓存写入临时目录，运行结束后删除。
+
+用法::
+
+    python benchmarks/cache_loop_lag_bench.py
+    python benchmarks/cache_loop_lag_bench.py --workers 32 --value-kb 512
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 在导入 agent 之前指定缓存目录，避免写入工作目录下的 cache/
+_CACHE_DIR = tempfile.mkdtemp(prefix="agent-kit-bench-")
+os.environ["CACHE_FILE_DIR"] = _CACHE_DIR
+
+from agent.shared.cacher.file_cache import FileCache  # noqa: E402
+from agent.shared.cacher.file_store import TempFile  # noqa: E402
+from agent.shared.cacher.io_executor import shutdown_cache_io_executor  # noqa: E402
+
+
+async def probe(interval: float, stop: asyncio.Event, lags: list) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected) * 1000)
+
+
+async def async_worker(cache: FileCache, store: TempFile, worker_id: int, value, blob: bytes, deadline: float):
+    i = 0
+    while time.monotonic() < deadline:
+        key = f"{worker_id}:{i % 16}"
+        await cache.aset(key, value)
+        await cache.aget(key)
+        file_id = await store.asave(blob, extension="bin")
+        await store.aget(file_id)
+        await store.adelete(file_id)
+        i += 1
+
+
+async def sync_worker(cache: FileCache, store: TempFile, worker_id: int, value, blob: bytes, deadline: float):
+    i = 0
+    while time.monotonic() < deadline:
+        key = f"{worker_id}:{i % 16}"
+        cache.set(key, value)
+        cache.get(key)
+        file_id = store.save(blob, extension="bin")
+        store.get(file_id)
+        store.delete(file_id)
+        i += 1
+        await asyncio.sleep(0)  # 让出一次，模拟请求处理中的其他 await
+
+
+async def measure(mode: str, args, cache: FileCache, store: TempFile) -> list:
+    lags: list = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(args.interval / 1000, stop, lags))
+
+    value = {"items": ["x" * 1024] * args.value_kb}
+    blob = os.urandom(args.value_kb * 1024)
+    deadline = time.monotonic() + args.duration
+    if mode == "idle":
+        await asyncio.sleep(args.duration)
+    else:
+        worker = async_worker if mode == "async" else sync_worker
+        await asyncio.gather(*(worker(cache, store, n, value, blob, deadline) for n in range(args.workers)))
+
+    stop.set()
+    await probe_task
+    return lags
+
+
+def summarize(lags: list) -> dict:
+    ordered = sorted(lags) or [0.0]
+    return {
+        "samples": len(lags),
+        "p50": statistics.median(ordered),
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        "max": ordered[-1],
+    }
+
+
+async def run(args) -> int:
+    # 关闭内存层，每次读取都经过磁盘
+    cache = FileCache(namespace="bench", memory_max_entries=0, inline_cleanup=False)
+    store = TempFile(namespace="bench", inline_cleanup=False)
+
+    print(f"workers={args.workers} value={args.value_kb} KB duration={args.duration}s interval={args.interval}ms")
+    print(f"{'load':>6}  {'samples':>7}  {'p50 ms':>8}  {'p99 ms':>8}  {'max ms':>8}")
+    results = {}
+    for mode in ("idle", "async", "sync"):
+        stat = summarize(await measure(mode, args, cache, store))
+        results[mode] = stat
+        print(f"{mode:>6}  {stat['samples']:>7}  {stat['p50']:>8.2f}  {stat['p99']:>8.2f}  {stat['max']:>8.2f}")
+
+    ok = results["async"]["p99"] <= args.max_p99
+    print(f"async p99 {results['async']['p99']:.2f} ms {'<=' if ok else '>'} {args.max_p99} ms")
+    return 0 if ok else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=16, help="并发读写的协程数")
+    parser.add_argument("--value-kb", type=int, default=256, help="每次写入的值大小(KB)")
+    parser.add_argument("--duration", type=float, default=3.0, help="每种负载的运行时间(秒)")
+    parser.add_argument("--interval", type=float, default=10.0, help="探针 sleep 间隔(毫秒)")
+    parser.add_argument("--max-p99", type=float, default=20.0, help="async 负载允许的 p99 延迟(毫秒)")
+    args = parser.parse_args()
+    try:
+        return asyncio.run(run(args))
+    finally:
+        shutdown_cache_io_executor()
+        shutil.rmtree(_CACHE_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
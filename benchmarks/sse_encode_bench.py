@@ -0,0 +1,107 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：sse_encode_bench
+# @Date   ：2026/10/20 12:00
+# @Author ：leemysw
+
+# 2026/10/20 12:00   Create
+# SSE 编码基准：单行 / 多行 data 事件，ping 缓存开启 / 关闭
+# =====================================================
+
+"""SSE 编码基准
+
+- encode：ServerSentEvent.encode 的吞吐，单行 data 事件走快速路径，多行 data 事件按行切分，
+  两者 data 长度相同
+- ping：EventSourceResponse 的 ping 循环（ping 间隔为 0）每秒发送的 ping 数，
+  cache_ping=True 时只编码一次并复用 bytes
+
+单行事件的吞吐低于多行事件的 --min-speedup 倍，或开启 ping 缓存后吞吐低于关闭时的
+--min-speedup 倍时以非 0 退出码结束。
+
+用法::
+
+    python benchmarks/sse_encode_bench.py
+    python benchmarks/sse_encode_bench.py --data-len 2048 --pings 50000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.shared.server.common.sse import EventSourceResponse, ServerSentEvent  # noqa: E402
+
+
+def build_data(length: int, lines: int) -> str:
+    """长度为 length、共 lines 行的 data，内容包含多字节 UTF-8 字符"""
+    unit = '{"text": "流式输出 token"}'
+    text = (unit * (length // len(unit) + 1))[:length]
+    step = max(1, length // lines)
+    return "\n".join(text[offset:offset + step] for offset in range(0, length, step))
+
+
+def bench_encode(data: str, min_seconds: float) -> float:
+    """重复编码直到累计耗时超过 min_seconds，返回每秒编码的事件数"""
+    event = ServerSentEvent(data)
+    event.encode()  # 预热
+    count, total = 0, 0.0
+    batch = 10000
+    while total < min_seconds:
+        start = time.perf_counter()
+        for _ in range(batch):
+            event.encode()
+        total += time.perf_counter() - start
+        count += batch
+    return count / total
+
+
+async def run_ping(cache_ping: bool, pings: int) -> float:
+    """驱动 EventSourceResponse 的 ping 循环发送 pings 次，返回每秒发送的 ping 数"""
+    response = EventSourceResponse(iter(()), ping=0, cache_ping=cache_ping)
+    sent = 0
+
+    async def send(message) -> None:
+        nonlocal sent
+        sent += 1
+        if sent >= pings:
+            response.active = False
+
+    start = time.perf_counter()
+    await response._ping(send)
+    return sent / (time.perf_counter() - start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-len", type=int, default=256, help="每个事件 data 的字符数")
+    parser.add_argument("--lines", type=int, default=4, help="多行事件的 data 行数")
+    parser.add_argument("--pings", type=int, default=20000, help="每种配置发送的 ping 数")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="每种事件最少运行时间(秒)")
+    parser.add_argument("--min-speedup", type=float, default=1.0,
+                        help="单行 / 多行、缓存 / 不缓存吞吐比的下限")
+    args = parser.parse_args()
+
+    print(f"data length: {args.data_len} chars, multi-line: {args.lines} lines")
+    print(f"{'case':>14}  {'ops/s':>12}")
+    single = bench_encode(build_data(args.data_len, 1), args.min_seconds)
+    print(f"{'single-line':>14}  {single:>12,.0f}")
+    multi = bench_encode(build_data(args.data_len, args.lines), args.min_seconds)
+    print(f"{'multi-line':>14}  {multi:>12,.0f}")
+    ping_cached = asyncio.run(run_ping(True, args.pings))
+    print(f"{'ping cached':>14}  {ping_cached:>12,.0f}")
+    ping_uncached = asyncio.run(run_ping(False, args.pings))
+    print(f"{'ping uncached':>14}  {ping_uncached:>12,.0f}")
+
+    encode_ratio = single / multi
+    ping_ratio = ping_cached / ping_uncached
+    print(f"single / multi-line: {encode_ratio:.2f}x, ping cached / uncached: {ping_ratio:.2f}x "
+          f"(min {args.min_speedup})")
+    return 0 if encode_ratio >= args.min_speedup and ping_ratio >= args.min_speedup else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
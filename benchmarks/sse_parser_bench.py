@@ -0,0 +1,91 @@
+# !/usr/bin/env python
+# -*- coding: utf-8 -*-
+# =====================================================
+# @File   ：sse_parser_bench
+# @Date   ：2026/10/20 11:00
+# @Author ：leemysw
+
+# 2026/10/20 11:00   Create
+# SSEParser 吞吐基准：1 KB / 100 KB / 10 MB 单事件
+# =====================================================
+
+"""SSEParser 吞吐基准
+
+按网络读取的方式把事件切成固定大小的 chunk 逐块 feed，统计每种事件大小的吞吐。
+解析开销与数据长度成线性关系时，各档吞吐应当接近；最大一档的吞吐低于最小一档的
+--min-ratio 倍时以非 0 退出码结束，可用于 CI。
+
+用法::
+
+    python benchmarks/sse_parser_bench.py
+    python benchmarks/sse_parser_bench.py --chunk-size 4096 --min-ratio 0.2
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.shared.server.common.sse_client import SSEParser  # noqa: E402
+
+SIZES = (("1 KB", 1024), ("100 KB", 100 * 1024), ("10 MB", 10 * 1024 * 1024))
+
+
+def build_event(size: int) -> bytes:
+    """一个 data 行长度为 size 的事件，内容包含多字节 UTF-8 字符"""
+    unit = '{"text": "工具结果 tool result"}, '.encode('utf-8')
+    payload = (unit * (size // len(unit) + 1))[:size]
+    # 截断可能落在多字节字符中间，回退到完整字符边界
+    payload = payload.decode('utf-8', errors='ignore').encode('utf-8')
+    return b"event: message\ndata: " + payload + b"\n\n"
+
+
+def run_once(stream: bytes, chunk_size: int) -> float:
+    parser = SSEParser()
+    count = 0
+    start = time.perf_counter()
+    for offset in range(0, len(stream), chunk_size):
+        count += len(parser.feed(stream[offset:offset + chunk_size]))
+    elapsed = time.perf_counter() - start
+    if count != 1:
+        raise AssertionError(f"expected 1 event, got {count}")
+    return elapsed
+
+
+def bench(size: int, chunk_size: int, min_seconds: float) -> float:
+    """重复解析直到累计耗时超过 min_seconds，返回最好一次的吞吐(MB/s)"""
+    stream = build_event(size)
+    run_once(stream, chunk_size)  # 预热
+    best, total = float("inf"), 0.0
+    while total < min_seconds:
+        elapsed = run_once(stream, chunk_size)
+        best = min(best, elapsed)
+        total += elapsed
+    return len(stream) / best / (1024 * 1024)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=16 * 1024, help="每次 feed 的字节数")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="每档最少运行时间(秒)")
+    parser.add_argument("--min-ratio", type=float, default=0.25,
+                        help="最大一档吞吐 / 最小一档吞吐的下限，低于该值视为非线性")
+    args = parser.parse_args()
+
+    print(f"chunk size: {args.chunk_size} bytes")
+    print(f"{'event':>8}  {'MB/s':>10}")
+    results = []
+    for label, size in SIZES:
+        throughput = bench(size, args.chunk_size, args.min_seconds)
+        results.append(throughput)
+        print(f"{label:>8}  {throughput:>10.1f}")
+
+    ratio = results[-1] / results[0]
+    print(f"10 MB / 1 KB throughput ratio: {ratio:.2f} (min {args.min_ratio})")
+    return 0 if ratio >= args.min_ratio else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())